@@ -7,6 +7,28 @@ const API_BASE_URL = window.CONFIG?.API_BASE_URL || (
 
 // API Client
 class API {
+    // ETag -> body cache for conditional GETs, keyed by URL
+    static etagCache = new Map();
+
+    // GET with If-None-Match; a 304 reuses the cached body instead of re-downloading
+    static async cachedGet(url) {
+        const cached = this.etagCache.get(url);
+        const headers = cached ? { 'If-None-Match': cached.etag } : {};
+        const response = await fetch(url, {
+            headers,
+            credentials: 'include'
+        });
+        if (response.status === 304 && cached) {
+            return cached.data;
+        }
+        const data = await this.handleResponse(response);
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            this.etagCache.set(url, { etag, data });
+        }
+        return data;
+    }
+
     // Auth endpoints
     static async register(username, email, password, fullName) {
         const response = await fetch(`${API_BASE_URL}/api/auth/register`, {
@@ -34,6 +56,7 @@ class API {
     }
 
     static async logout() {
+        this.etagCache.clear();
         const response = await fetch(`${API_BASE_URL}/api/auth/logout`, {
             method: 'POST',
             credentials: 'include'
@@ -50,19 +73,13 @@ class API {
 
     // Life Areas
     static async getLifeAreas() {
-        const response = await fetch(`${API_BASE_URL}/api/areas/`, {
-            credentials: 'include'
-        });
-        return this.handleResponse(response);
+        return this.cachedGet(`${API_BASE_URL}/api/areas/`);
     }
 
     // Goals
     static async getGoals(filters = {}) {
         const params = new URLSearchParams(filters);
-        const response = await fetch(`${API_BASE_URL}/api/goals/?${params}`, {
-            credentials: 'include'
-        });
-        return this.handleResponse(response);
+        return this.cachedGet(`${API_BASE_URL}/api/goals/?${params}`);
     }
 
     static async createGoal(data) {
@@ -75,10 +92,11 @@ class API {
         return this.handleResponse(response);
     }
 
-    static async updateGoal(id, data) {
+    // Pass the version from the last read to fail with 412 instead of overwriting newer changes
+    static async updateGoal(id, data, version = null) {
         const response = await fetch(`${API_BASE_URL}/api/goals/${id}`, {
             method: 'PUT',
-            headers: { 'Content-Type': 'application/json' },
+            headers: this.writeHeaders(version),
             credentials: 'include',
             body: JSON.stringify(data)
         });
@@ -97,10 +115,7 @@ class API {
     // Habits
     static async getHabits(filters = {}) {
         const params = new URLSearchParams(filters);
-        const response = await fetch(`${API_BASE_URL}/api/habits/?${params}`, {
-            credentials: 'include'
-        });
-        return this.handleResponse(response);
+        return this.cachedGet(`${API_BASE_URL}/api/habits/?${params}`);
     }
 
     static async createHabit(data) {
@@ -135,10 +150,7 @@ class API {
     // Tasks
     static async getTasks(filters = {}) {
         const params = new URLSearchParams(filters);
-        const response = await fetch(`${API_BASE_URL}/api/tasks/?${params}`, {
-            credentials: 'include'
-        });
-        return this.handleResponse(response);
+        return this.cachedGet(`${API_BASE_URL}/api/tasks/?${params}`);
     }
 
     static async createTask(data) {
@@ -151,10 +163,11 @@ class API {
         return this.handleResponse(response);
     }
 
-    static async updateTask(id, data) {
+    // Pass the version from the last read to fail with 412 instead of overwriting newer changes
+    static async updateTask(id, data, version = null) {
         const response = await fetch(`${API_BASE_URL}/api/tasks/${id}`, {
             method: 'PUT',
-            headers: { 'Content-Type': 'application/json' },
+            headers: this.writeHeaders(version),
             credentials: 'include',
             body: JSON.stringify(data)
         });
@@ -173,10 +186,7 @@ class API {
     // Contacts
     static async getContacts(filters = {}) {
         const params = new URLSearchParams(filters);
-        const response = await fetch(`${API_BASE_URL}/api/contacts/?${params}`, {
-            credentials: 'include'
-        });
-        return this.handleResponse(response);
+        return this.cachedGet(`${API_BASE_URL}/api/contacts/?${params}`);
     }
 
     static async createContact(data) {
@@ -205,6 +215,28 @@ class API {
         return this.handleResponse(response);
     }
 
+    // Batch operations
+    // resource: goals, habits, tasks, entries, contacts, references, health, finance
+    // operations: [{ op: 'create'|'update'|'delete', id, data }]
+    static async batch(resource, operations, atomic = true) {
+        const response = await fetch(`${API_BASE_URL}/api/${resource}:batch`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            credentials: 'include',
+            body: JSON.stringify({ operations, atomic })
+        });
+        return this.handleResponse(response);
+    }
+
+    // JSON headers, plus If-Match when the caller knows the row version it last read
+    static writeHeaders(version = null) {
+        const headers = { 'Content-Type': 'application/json' };
+        if (version !== null && version !== undefined) {
+            headers['If-Match'] = `"v${version}"`;
+        }
+        return headers;
+    }
+
     // Helper method to handle responses
     static async handleResponse(response) {
         if (!response.ok) {
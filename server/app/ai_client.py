@@ -0,0 +1,336 @@
+"""
+LLM-backed AI content with a persistent cache, request coalescing and a latency budget.
+
+ai_stub.py keeps the static verses and insights; they are what the endpoints
+answer with when no provider answers in time. For GET /api/ai/verse and
+/api/ai/insight:
+
+1. The request is keyed by kind, life area and a hash of the user context
+   (for insights: the user's goal, habit and task figures in that area).
+2. A fresh row in ai_responses (AI_CACHE_TTL) answers it without a provider call.
+3. Otherwise one generation per key runs at a time: concurrent identical
+   requests await the same task instead of calling the provider again.
+4. Callers wait at most AI_TIMEOUT_SECONDS, then get the static content. The
+   generation keeps running (up to AI_PROVIDER_TIMEOUT) and stores its
+   answer, so the next request for that key is a cache hit.
+
+Providers (AI_PROVIDER): "local", a deterministic stand-in that needs no
+network; "openai", any OpenAI-compatible chat completions API at
+LLM_BASE_URL (hosted, or a local server); "anthropic". The HTTP providers
+need httpx and LLM_MODEL.
+"""
+from sqlalchemy import case, delete, func, insert, select
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, timedelta
+from typing import Dict, NamedTuple, Optional, Tuple
+import asyncio
+import hashlib
+import os
+
+import orjson
+
+from .db import engine
+from .models import (
+    AIResponse, Goal, GoalAreaLink, GoalStatus, Habit, HabitAreaLink, LifeArea, LifeAreaEnum, Task, TaskStatus, User
+)
+from .ai_stub import generate_bible_verse, generate_insight
+from .metrics import AI_RESPONSES
+from .scheduler import scheduled_job
+from .streaks import local_today
+
+try:
+    import httpx
+except ImportError:  # only needed for AI_PROVIDER=openai or anthropic
+    httpx = None
+
+# Where content comes from: "local" (deterministic stand-in), "openai" or "anthropic"
+AI_PROVIDER = os.getenv("AI_PROVIDER", "local")
+LLM_MODEL = os.getenv("LLM_MODEL") or None
+# Base URL for AI_PROVIDER=openai; any server speaking the same chat completions API works
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.openai.com/v1")
+
+# Longest a request waits for a generation before answering with static content
+AI_TIMEOUT_SECONDS = float(os.getenv("AI_TIMEOUT_SECONDS", "2"))
+# Hard limit on one provider call (it keeps running after the request gave up, to fill the cache)
+AI_PROVIDER_TIMEOUT = float(os.getenv("AI_PROVIDER_TIMEOUT", "30"))
+# How long a generated answer is reused for the same area and context
+AI_CACHE_TTL = int(os.getenv("AI_CACHE_TTL", "86400"))
+# Simulated provider latency for AI_PROVIDER=local (milliseconds)
+AI_LOCAL_LATENCY_MS = float(os.getenv("AI_LOCAL_LATENCY_MS", "0"))
+
+# Part of every cache key: bump it when the prompts change so old answers stop matching
+PROMPT_VERSION = 1
+MAX_TOKENS = 300
+
+AREAS = {area.value for area in LifeAreaEnum}
+
+
+class AIRequest(NamedTuple):
+    kind: str  # "verse" or "insight"
+    area: str
+    context: dict
+
+    def context_hash(self) -> str:
+        return hashlib.sha256(orjson.dumps(self.context, option=orjson.OPT_SORT_KEYS)).hexdigest()[:16]
+
+
+# ==================== PROMPTS ====================
+
+def build_prompt(request: AIRequest) -> str:
+    label = request.area.replace("_", " ")
+    if request.kind == "verse":
+        return (
+            f"Suggest one Bible verse to encourage someone working on the '{label}' area of their life. "
+            'Answer with JSON only: {"reference": "Book chapter:verse", "text": "the verse"}'
+        )
+    facts = "; ".join(f"{name.replace('_', ' ')}: {value}" for name, value in sorted(request.context.items()))
+    return (
+        f"Give one practical, encouraging tip (one or two sentences) for the '{label}' area of someone's life. "
+        f"Their current figures in this area: {facts or 'none yet'}. Answer with the tip only."
+    )
+
+
+def parse_content(kind: str, text: str):
+    """A verse dict or an insight string from the provider's answer; ValueError if unusable"""
+    text = text.strip()
+    if kind == "insight":
+        if not text:
+            raise ValueError("Empty insight")
+        return text
+    start, end = text.find("{"), text.rfind("}")
+    verse = orjson.loads(text[start:end + 1]) if start != -1 else None
+    if not isinstance(verse, dict) or not verse.get("reference") or not verse.get("text"):
+        raise ValueError("Verse answer is not {reference, text} JSON")
+    return {"reference": str(verse["reference"]), "text": str(verse["text"])}
+
+
+# ==================== PROVIDERS ====================
+
+class LocalProvider:
+    """Deterministic stand-in: the static content, with insights built around the user's figures"""
+    name = "local"
+    model = "static"
+
+    async def generate(self, request: AIRequest, prompt: str) -> str:
+        if AI_LOCAL_LATENCY_MS:
+            await asyncio.sleep(AI_LOCAL_LATENCY_MS / 1000)
+        if request.kind == "verse":
+            return orjson.dumps(generate_bible_verse(request.area)).decode()
+        tip = generate_insight(request.area)
+        context = request.context
+        if context.get("overdue_tasks"):
+            return f"You have {context['overdue_tasks']} overdue task(s) here; finishing one today builds momentum. {tip}"
+        if context.get("best_streak"):
+            return f"Your best streak here is {context['best_streak']} days; protect it with one small step today. {tip}"
+        if context.get("active_goals"):
+            return f"Your {context['active_goals']} open goal(s) here average {context['average_progress']}% done. {tip}"
+        return tip
+
+    async def aclose(self):
+        pass
+
+
+class OpenAIProvider:
+    """Chat completions over HTTP (OpenAI or a compatible local server)"""
+    name = "openai"
+
+    def __init__(self, base_url: str, model: str, api_key: Optional[str] = None):
+        self.model = model
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = httpx.AsyncClient(base_url=base_url, headers=headers, timeout=AI_PROVIDER_TIMEOUT)
+
+    async def generate(self, request: AIRequest, prompt: str) -> str:
+        response = await self.client.post("/chat/completions", json={
+            "model": self.model, "max_tokens": MAX_TOKENS, "messages": [{"role": "user", "content": prompt}],
+        })
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class AnthropicProvider:
+    """The Anthropic Messages API"""
+    name = "anthropic"
+
+    def __init__(self, model: str, api_key: str):
+        self.model = model
+        self.client = httpx.AsyncClient(
+            base_url="https://api.anthropic.com",
+            headers={"x-api-key": api_key, "anthropic-version": "2023-06-01"},
+            timeout=AI_PROVIDER_TIMEOUT,
+        )
+
+    async def generate(self, request: AIRequest, prompt: str) -> str:
+        response = await self.client.post("/v1/messages", json={
+            "model": self.model, "max_tokens": MAX_TOKENS, "messages": [{"role": "user", "content": prompt}],
+        })
+        response.raise_for_status()
+        return response.json()["content"][0]["text"]
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def build_provider(name: str = AI_PROVIDER):
+    """The provider selected by AI_PROVIDER"""
+    if name == "local":
+        return LocalProvider()
+    if name not in ("openai", "anthropic"):
+        raise RuntimeError(f"Unknown AI_PROVIDER {name!r} (expected local, openai or anthropic)")
+    if httpx is None:
+        raise RuntimeError(f"AI_PROVIDER={name} needs the httpx package (pip install httpx)")
+    if LLM_MODEL is None:
+        raise RuntimeError(f"AI_PROVIDER={name} needs LLM_MODEL")
+    if name == "openai":
+        return OpenAIProvider(LLM_BASE_URL, LLM_MODEL, os.getenv("OPENAI_API_KEY"))
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise RuntimeError("AI_PROVIDER=anthropic needs ANTHROPIC_API_KEY")
+    return AnthropicProvider(LLM_MODEL, api_key)
+
+
+# ==================== CACHE ====================
+
+def load_cached(key: str):
+    with engine.connect() as connection:
+        content = connection.execute(
+            select(AIResponse.content).where(AIResponse.cache_key == key, AIResponse.expires_at > datetime.utcnow())
+        ).scalar()
+    return None if content is None else orjson.loads(content)
+
+
+def store_cached(key: str, request: AIRequest, provider: str, content, ttl: int = AI_CACHE_TTL):
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(delete(AIResponse).where(AIResponse.cache_key == key))
+        connection.execute(insert(AIResponse).values(
+            cache_key=key, kind=request.kind, area=request.area, provider=provider,
+            content=orjson.dumps(content).decode(), created_at=now, expires_at=now + timedelta(seconds=ttl),
+        ))
+
+
+@scheduled_job("ai_cache_purge", "@daily")
+def purge_expired() -> int:
+    """Delete expired cached answers; returns rows removed"""
+    with engine.begin() as connection:
+        return connection.execute(delete(AIResponse).where(AIResponse.expires_at <= datetime.utcnow())).rowcount
+
+
+# ==================== CONTEXT ====================
+
+def insight_context(user_id: int, area: str) -> dict:
+    """
+    The user's figures for one area, as the insight prompt sees them.
+
+    Progress is rounded to tens so small changes keep hitting the same cache entry.
+    """
+    with Session(engine) as session:
+        user_timezone = session.execute(select(User.timezone).where(User.id == user_id)).scalar()
+        today = local_today(user_timezone)
+        area_id = select(LifeArea.id).where(LifeArea.name == LifeAreaEnum(area)).scalar_subquery()
+        goals, progress = session.execute(
+            select(func.count(), func.avg(Goal.progress_percentage))
+            .join(GoalAreaLink, GoalAreaLink.goal_id == Goal.id)
+            .where(
+                Goal.user_id == user_id, GoalAreaLink.area_id == area_id,
+                Goal.status.in_([GoalStatus.NOT_STARTED, GoalStatus.IN_PROGRESS]),
+            )
+        ).one()
+        habits, best_streak = session.execute(
+            select(func.count(), func.max(Habit.current_streak))
+            .join(HabitAreaLink, HabitAreaLink.habit_id == Habit.id)
+            .where(Habit.user_id == user_id, HabitAreaLink.area_id == area_id)
+        ).one()
+        tasks, overdue = session.execute(
+            select(func.count(), func.sum(case((Task.due_date < today, 1), else_=0)))
+            .where(
+                Task.user_id == user_id, Task.area_id == area_id, Task.status != TaskStatus.DONE,
+                Task.recurrence.is_(None),
+            )
+        ).one()
+    return {
+        "active_goals": goals,
+        "average_progress": int(round((progress or 0) / 10) * 10),
+        "habits": habits,
+        "best_streak": best_streak or 0,
+        "open_tasks": tasks,
+        "overdue_tasks": overdue or 0,
+    }
+
+
+# ==================== CLIENT ====================
+
+class AIClient:
+    """Cache, coalescing and timeout around a provider; use from the event loop"""
+
+    def __init__(self, provider, timeout: float = AI_TIMEOUT_SECONDS, ttl: int = AI_CACHE_TTL):
+        self.provider = provider
+        self.timeout = timeout
+        self.ttl = ttl
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def cache_key(self, request: AIRequest) -> str:
+        parts = (PROMPT_VERSION, self.provider.name, self.provider.model, request.kind, request.area, request.context_hash())
+        return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()
+
+    async def _generate(self, key: str, request: AIRequest):
+        text = await asyncio.wait_for(self.provider.generate(request, build_prompt(request)), AI_PROVIDER_TIMEOUT)
+        content = parse_content(request.kind, text)
+        await run_in_threadpool(store_cached, key, request, self.provider.name, content, self.ttl)
+        return content
+
+    def _finished(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[AI] Generation failed: {task.exception()!r}")
+
+    async def get(self, request: AIRequest) -> Tuple[object, str]:
+        """
+        (content, source) for a request; content is None when the caller should
+        use the static fallback. Source is cache, provider, coalesced or fallback.
+        """
+        key = self.cache_key(request)
+        cached = await run_in_threadpool(load_cached, key)
+        if cached is not None:
+            return cached, "cache"
+
+        task = self._inflight.get(key)
+        source = "coalesced" if task is not None else "provider"
+        if task is None:
+            task = asyncio.create_task(self._generate(key, request))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        try:
+            # shield: a caller giving up must not cancel the generation other callers share
+            return await asyncio.wait_for(asyncio.shield(task), self.timeout), source
+        except asyncio.TimeoutError:
+            print(f"[AI] {request.kind} for {request.area} took over {self.timeout}s; answered with static content")
+        except Exception:
+            pass  # logged once by _finished
+        return None, "fallback"
+
+    async def verse(self, area: str) -> Tuple[Dict[str, str], str]:
+        """A verse for the area (the same for every user until the cache entry expires)"""
+        content, source = (None, "fallback")
+        if area in AREAS:
+            content, source = await self.get(AIRequest("verse", area, {}))
+        AI_RESPONSES.inc(("verse", source))
+        return content or generate_bible_verse(area), source
+
+    async def insight(self, area: str, user_id: Optional[int] = None) -> Tuple[str, str]:
+        """An insight for the area, personalized with the user's figures when there is a user"""
+        content, source = (None, "fallback")
+        if area in AREAS:
+            context = await run_in_threadpool(insight_context, user_id, area) if user_id else {}
+            content, source = await self.get(AIRequest("insight", area, context))
+        AI_RESPONSES.inc(("insight", source))
+        return content or generate_insight(area), source
+
+    async def aclose(self):
+        await self.provider.aclose()
+
+
+ai_client = AIClient(build_provider())
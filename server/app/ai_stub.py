@@ -1,4 +1,4 @@
-"""AI content stub module - Placeholder responses for MVP"""
+"""AI content stub module - Static fallback content (and the local provider's data, see ai_client.py)"""
 from typing import Dict
 
 # Static Bible verses for each life area
@@ -68,8 +68,8 @@ def generate_bible_verse(area: str) -> Dict[str, str]:
     Returns:
         Dict with 'reference' and 'text' keys
 
-    Note: In MVP, this returns static content. In Phase 2, this will
-    call OpenAI/Anthropic/local LLM to generate dynamic verses.
+    Note: This is the fallback when no provider answers in time; generated
+    verses come from ai_client.py.
     """
     return BIBLE_VERSES.get(area, DEFAULT_VERSE)
 
@@ -84,8 +84,8 @@ def generate_insight(area: str) -> str:
     Returns:
         Insight string (1-2 sentences)
 
-    Note: In MVP, this returns static content. In Phase 2, this will
-    call an AI API to generate personalized insights based on user data.
+    Note: This is the fallback when no provider answers in time; personalized
+    insights come from ai_client.py.
     """
     return INSIGHTS.get(area, DEFAULT_INSIGHT)
 
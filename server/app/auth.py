@@ -3,12 +3,18 @@ from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status, Request
 from sqlmodel import Session, select
 from typing import Optional
+import os
 from .models import User
 from .db import get_session
+from .metrics import timed_phase
+from .sessions import session_store
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Usernames allowed to use admin endpoints (comma-separated)
+ADMIN_USERNAMES = {name.strip() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()}
+
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
@@ -20,7 +26,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def create_user(session: Session, username: str, password: str, email: Optional[str] = None, full_name: Optional[str] = None) -> User:
+def create_user(
+    session: Session,
+    username: str,
+    password: str,
+    email: Optional[str] = None,
+    full_name: Optional[str] = None,
+    timezone: str = "UTC"
+) -> User:
     """
     Create a new user with hashed password.
 
@@ -30,6 +43,7 @@ def create_user(session: Session, username: str, password: str, email: Optional[
         password: Plain text password (will be hashed)
         email: Optional email
         full_name: Optional full name
+        timezone: IANA timezone name
 
     Returns:
         Created User object
@@ -47,7 +61,8 @@ def create_user(session: Session, username: str, password: str, email: Optional[
         username=username,
         hashed_password=hash_password(password),
         email=email,
-        full_name=full_name
+        full_name=full_name,
+        timezone=timezone
     )
     session.add(user)
     session.commit()
@@ -91,29 +106,50 @@ def get_current_user(request: Request, session: Session = Depends(get_session))
     Raises:
         HTTPException: 401 if not authenticated or user not found
     """
-    # Get user_id from session
-    user_id = request.session.get("user_id")
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required"
-        )
-
-    # Load user from database
-    user = session.get(User, user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
+    with timed_phase("auth"):
+        # Get user_id from session
+        user_id = request.session.get("user_id")
+        if not user_id:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required"
+            )
+
+        # Load user from database
+        user = session.get(User, user_id)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+
+        if not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User account is inactive"
+            )
+
+        return user
+
+
+def is_admin(user: User) -> bool:
+    """Check whether a user is listed in ADMIN_USERNAMES"""
+    return user.username in ADMIN_USERNAMES
+
+
+def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Dependency that only lets admins through.
 
-    if not user.is_active:
+    Raises:
+        HTTPException: 403 if the current user is not an admin
+    """
+    if not is_admin(current_user):
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User account is inactive"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
         )
-
-    return user
+    return current_user
 
 
 def create_session(request: Request, user: User):
@@ -136,3 +172,19 @@ def destroy_session(request: Request):
         request: FastAPI request object
     """
     request.session.clear()
+
+
+def destroy_all_sessions(request: Request, user: User) -> int:
+    """
+    Log a user out everywhere: revoke every session they hold, this one included.
+
+    Args:
+        request: FastAPI request object
+        user: User whose sessions are revoked
+
+    Returns:
+        Number of sessions revoked
+    """
+    revoked = session_store.revoke_user(user.id)
+    request.session.clear()
+    return revoked
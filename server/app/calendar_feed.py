@@ -0,0 +1,260 @@
+"""
+Per-user ICS calendar feed (RFC 5545) for calendar apps that poll.
+
+The calendar is built from four sources, each rendered into its own section:
+dated tasks (recurring series as RRULEs), goal deadlines, liability due dates
+and contact birthdays (yearly). Sections are stored on the user's
+calendar_feeds row together with the resource versions (see etags.py) they
+were built from, so a poll costs two small queries while nothing changed, and
+a change re-renders only the sections whose source moved.
+
+The ETag is a hash of the calendar itself: a write that does not change
+what the feed shows (a contact's phone number, a new task occurrence)
+leaves the ETag and Last-Modified alone, and pollers keep getting 304s.
+"""
+from sqlalchemy import select, update
+from sqlmodel import Session
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterator, NamedTuple, Optional
+import hashlib
+import secrets
+
+import orjson
+
+from .models import (
+    CalendarFeed, Contact, FinancialAccount, FinancialAccountType, Goal, GoalStatus, ResourceVersion, Task, TaskStatus
+)
+
+PRODID = "-//Life Management App//Calendar Feed//EN"
+UID_DOMAIN = "life-management"
+
+# Octets per content line before folding, as RFC 5545 requires
+LINE_LIMIT = 75
+
+
+def new_feed_token() -> str:
+    """A random token for the feed URL"""
+    return secrets.token_urlsafe(32)
+
+
+def hash_feed_token(token: str) -> str:
+    """What is stored for a token; tokens are random, so an unkeyed hash is enough"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# ==================== ICS ENCODING ====================
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT value"""
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Fold a content line at 75 octets without splitting a UTF-8 character"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= LINE_LIMIT:
+        return line
+    parts = []
+    limit = LINE_LIMIT
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = LINE_LIMIT - 1  # continuation lines start with a space
+    return "\r\n ".join(parts)
+
+
+def _event(
+    uid: str,
+    stamp: datetime,
+    day: date,
+    summary: str,
+    category: str,
+    description: Optional[str] = None,
+    rrule: Optional[str] = None,
+) -> str:
+    """
+    One all-day VEVENT, CRLF-terminated.
+
+    DTSTAMP is the row's creation time rather than its last update, so that
+    edits the feed does not show leave the event text, and the ETag, unchanged.
+    """
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@{UID_DOMAIN}",
+        f"DTSTAMP:{stamp.strftime('%Y%m%dT%H%M%SZ')}",
+        f"DTSTART;VALUE=DATE:{day.strftime('%Y%m%d')}",
+        f"DTEND;VALUE=DATE:{(day + timedelta(days=1)).strftime('%Y%m%d')}",
+        f"SUMMARY:{escape_text(summary)}",
+        f"CATEGORIES:{category}",
+    ]
+    if rrule:
+        lines.append(f"RRULE:{rrule}")
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) + "\r\n" for line in lines)
+
+
+# ==================== SECTIONS ====================
+
+def _task_events(session: Session, user_id: int) -> Iterator[str]:
+    """Open dated tasks; a recurring series is one event with its RRULE (its occurrences are skipped)"""
+    rows = session.execute(
+        select(Task.id, Task.title, Task.description, Task.due_date, Task.recurrence, Task.created_at)
+        .where(
+            Task.user_id == user_id, Task.due_date.is_not(None), Task.recurrence_id.is_(None),
+            Task.status != TaskStatus.DONE,
+        )
+        .order_by(Task.due_date, Task.id)
+    )
+    for row in rows:
+        yield _event(f"task-{row.id}", row.created_at, row.due_date, row.title, "Task", row.description, row.recurrence)
+
+
+def _goal_events(session: Session, user_id: int) -> Iterator[str]:
+    rows = session.execute(
+        select(Goal.id, Goal.title, Goal.description, Goal.due_date, Goal.created_at)
+        .where(
+            Goal.user_id == user_id, Goal.due_date.is_not(None),
+            Goal.status.not_in([GoalStatus.COMPLETED, GoalStatus.ABANDONED]),
+        )
+        .order_by(Goal.due_date, Goal.id)
+    )
+    for row in rows:
+        yield _event(f"goal-{row.id}", row.created_at, row.due_date, f"Goal deadline: {row.title}", "Goal", row.description)
+
+
+def _liability_events(session: Session, user_id: int) -> Iterator[str]:
+    rows = session.execute(
+        select(FinancialAccount.id, FinancialAccount.name, FinancialAccount.due_date, FinancialAccount.created_at)
+        .where(
+            FinancialAccount.user_id == user_id, FinancialAccount.due_date.is_not(None),
+            FinancialAccount.account_type == FinancialAccountType.LIABILITY,
+        )
+        .order_by(FinancialAccount.due_date, FinancialAccount.id)
+    )
+    for row in rows:
+        yield _event(f"liability-{row.id}", row.created_at, row.due_date, f"Payment due: {row.name}", "Liability")
+
+
+def _birthday_events(session: Session, user_id: int) -> Iterator[str]:
+    rows = session.execute(
+        select(Contact.id, Contact.name, Contact.birthday, Contact.created_at)
+        .where(Contact.user_id == user_id, Contact.birthday.is_not(None))
+        .order_by(Contact.id)
+    )
+    for row in rows:
+        yield _event(f"birthday-{row.id}", row.created_at, row.birthday, f"{row.name}'s birthday", "Birthday",
+                     rrule="FREQ=YEARLY")
+
+
+# Section renderers keyed by the resource (table) whose version invalidates them
+FEED_SOURCES: Dict[str, Callable[[Session, int], Iterator[str]]] = {
+    "tasks": _task_events,
+    "goals": _goal_events,
+    "financial_accounts": _liability_events,
+    "contacts": _birthday_events,
+}
+
+
+# ==================== FEED ====================
+
+class FeedResult(NamedTuple):
+    """What GET /api/calendar.ics needs; body is None when the caller only asked for validators"""
+    etag: str
+    last_modified: datetime
+    body: Optional[bytes]
+
+
+def _source_versions(session: Session, user_id: int) -> str:
+    """Current versions of every source, as one comparable string"""
+    versions = dict(session.execute(
+        select(ResourceVersion.resource, ResourceVersion.version).where(
+            ResourceVersion.user_id == user_id, ResourceVersion.resource.in_(list(FEED_SOURCES))
+        )
+    ).all())
+    return ",".join(f"{name}:{versions.get(name, 0)}" for name in FEED_SOURCES)
+
+
+def assemble(sections: Dict[str, str]) -> bytes:
+    """The full VCALENDAR document"""
+    header = (
+        "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+        f"PRODID:{PRODID}\r\n"
+        "CALSCALE:GREGORIAN\r\nMETHOD:PUBLISH\r\n"
+        "X-WR-CALNAME:Life Management\r\n"
+    )
+    return (header + "".join(sections.get(name, "") for name in FEED_SOURCES) + "END:VCALENDAR\r\n").encode("utf-8")
+
+
+def load_feed(session: Session, token: str, need_body: Callable[[str, datetime], bool]) -> Optional[FeedResult]:
+    """
+    Resolve a feed token and bring its calendar up to date.
+
+    Returns None for an unknown token. `need_body(etag, last_modified)` is
+    asked once the validators are known; when it answers False (the client
+    already has this version) the stored sections are not even decoded.
+    """
+    feed = session.execute(
+        select(
+            CalendarFeed.user_id, CalendarFeed.source_versions, CalendarFeed.etag, CalendarFeed.generated_at
+        ).where(CalendarFeed.token_hash == hash_feed_token(token))
+    ).first()
+    if feed is None:
+        return None
+
+    current = _source_versions(session, feed.user_id)
+    if current == feed.source_versions and feed.etag is not None:
+        if not need_body(feed.etag, feed.generated_at):
+            return FeedResult(feed.etag, feed.generated_at, None)
+        sections = orjson.loads(session.execute(
+            select(CalendarFeed.sections).where(CalendarFeed.user_id == feed.user_id)
+        ).scalar())
+        return FeedResult(feed.etag, feed.generated_at, assemble(sections))
+
+    # Something changed: re-render only the sections whose resource version moved
+    stale = set(FEED_SOURCES)
+    sections: Dict[str, str] = {}
+    if feed.etag is not None:
+        before = dict(item.split(":") for item in feed.source_versions.split(",") if item)
+        now_versions = dict(item.split(":") for item in current.split(","))
+        stale = {name for name in FEED_SOURCES if before.get(name) != now_versions[name]}
+        sections = orjson.loads(session.execute(
+            select(CalendarFeed.sections).where(CalendarFeed.user_id == feed.user_id)
+        ).scalar() or "{}")
+    for name in stale:
+        sections[name] = "".join(FEED_SOURCES[name](session, feed.user_id))
+
+    body = assemble(sections)
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    generated_at = feed.generated_at if etag == feed.etag else datetime.utcnow().replace(microsecond=0)
+    session.execute(
+        update(CalendarFeed.__table__)
+        .where(CalendarFeed.user_id == feed.user_id)
+        .values(source_versions=current, sections=orjson.dumps(sections).decode(), etag=etag, generated_at=generated_at)
+    )
+    session.commit()
+    if etag != feed.etag:
+        print(f"[CALENDAR] Rebuilt feed for user {feed.user_id} ({', '.join(sorted(stale))})")
+    return FeedResult(etag, generated_at, body)
+
+
+def rotate_feed_token(session: Session, user_id: int) -> str:
+    """Create the user's feed, or give it a new token (the old URL stops working); commits"""
+    token = new_feed_token()
+    table = CalendarFeed.__table__
+    exists = session.execute(select(table.c.user_id).where(table.c.user_id == user_id)).first()
+    if exists:
+        session.execute(update(table).where(table.c.user_id == user_id).values(token_hash=hash_feed_token(token)))
+    else:
+        session.execute(table.insert().values(
+            user_id=user_id, token_hash=hash_feed_token(token), source_versions="", created_at=datetime.utcnow()
+        ))
+    session.commit()
+    return token
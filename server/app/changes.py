@@ -0,0 +1,69 @@
+"""Change tracking for delta sync: updated_at stamping, tombstones and sync tokens"""
+from sqlalchemy import delete, event
+from sqlmodel import Session
+from datetime import datetime, timedelta
+from typing import Optional
+import base64
+import os
+
+from .db import engine
+from .models import HabitCheckin, Tombstone
+from .scheduler import scheduled_job
+
+# Tombstones older than this are pruned (tombstone_purge job); clients syncing
+# from further back get a full reset (see routers/sync.py)
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("TOMBSTONE_RETENTION_DAYS", "90"))
+
+# Re-send rows this close to the previous token to cover transactions that were
+# still in flight when it was issued. Clients upsert by id, so overlap is harmless.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def encode_sync_token(moment: datetime) -> str:
+    """Encode a sync high-water mark as an opaque token"""
+    return base64.urlsafe_b64encode(f"v1:{moment.isoformat()}".encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> Optional[datetime]:
+    """Decode a sync token back to its high-water mark, or None if it is malformed"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        version, _, value = base64.urlsafe_b64decode(padded.encode()).decode().partition(":")
+        if version != "v1":
+            return None
+        return datetime.fromisoformat(value)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _owner_id(instance) -> Optional[int]:
+    """The user a row belongs to; check-ins have no user_id and belong to their habit's user"""
+    if isinstance(instance, HabitCheckin):
+        return instance.habit.user_id if instance.habit is not None else None
+    return getattr(instance, "user_id", None)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_changes_before_flush(session, flush_context, instances):
+    """Stamp updated_at on modified rows and leave a tombstone for deleted user-owned rows"""
+    now = datetime.utcnow()
+    for instance in session.dirty:
+        if hasattr(instance, "updated_at") and session.is_modified(instance):
+            instance.updated_at = now
+
+    for instance in session.deleted:
+        user_id = _owner_id(instance)
+        resource = getattr(instance, "__tablename__", None)
+        row_id = getattr(instance, "id", None)
+        if user_id is None or row_id is None or isinstance(instance, Tombstone):
+            continue
+        session.add(Tombstone(user_id=user_id, resource=resource, row_id=row_id, deleted_at=now))
+
+
+@scheduled_job("tombstone_purge", "@daily")
+def purge_tombstones(now: Optional[datetime] = None) -> int:
+    """Delete tombstones past the retention window; returns rows removed"""
+    # Tokens inside the window still read back SYNC_OVERLAP before themselves
+    cutoff = (now or datetime.utcnow()) - timedelta(days=TOMBSTONE_RETENTION_DAYS) - SYNC_OVERLAP
+    with engine.begin() as connection:
+        return connection.execute(delete(Tombstone).where(Tombstone.deleted_at < cutoff)).rowcount
@@ -0,0 +1,84 @@
+"""Transparent compression for large text columns (journal entry content)"""
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+from typing import Optional
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always available
+    zstandard = None
+
+# Text shorter than this (UTF-8 bytes) is stored as-is; below it compression saves little
+TEXT_COMPRESSION_MIN_BYTES = int(os.getenv("TEXT_COMPRESSION_MIN_BYTES", "1024"))
+
+# Codec for newly written values: "zlib" or "zstd" (needs `pip install zstandard`).
+# Values already stored with either codec stay readable after switching.
+TEXT_COMPRESSION = os.getenv("TEXT_COMPRESSION", "zlib")
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# A stored value is plain UTF-8, or MARKER + codec byte + compressed UTF-8.
+# 0xFF never occurs in UTF-8, so the two cannot be confused.
+MARKER = b"\xff"
+ZLIB = b"z"
+ZSTD = b"s"
+
+if TEXT_COMPRESSION not in ("zlib", "zstd"):
+    raise RuntimeError(f"Unknown TEXT_COMPRESSION {TEXT_COMPRESSION!r} (expected zlib or zstd)")
+if TEXT_COMPRESSION == "zstd" and zstandard is None:
+    raise RuntimeError("TEXT_COMPRESSION=zstd needs the zstandard package (pip install zstandard)")
+
+
+def compress_text(text: str, min_bytes: int = TEXT_COMPRESSION_MIN_BYTES, codec: str = TEXT_COMPRESSION) -> bytes:
+    """Encode text for storage, compressing it when it is large and compresses well"""
+    raw = text.encode("utf-8")
+    if len(raw) < min_bytes:
+        return raw
+    if codec == "zstd":
+        packed = MARKER + ZSTD + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    else:
+        packed = MARKER + ZLIB + zlib.compress(raw, ZLIB_LEVEL)
+    return packed if len(packed) < len(raw) else raw
+
+
+def decompress_text(stored) -> str:
+    """Decode a stored value back to text"""
+    if isinstance(stored, str):
+        # Written before the column held bytes
+        return stored
+    stored = bytes(stored)
+    if not stored.startswith(MARKER):
+        return stored.decode("utf-8")
+    codec, payload = stored[1:2], stored[2:]
+    if codec == ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Found zstd-compressed text but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    raise ValueError(f"Unknown text codec {codec!r}")
+
+
+class CompressedText(TypeDecorator):
+    """
+    A text column stored as bytes, compressed above TEXT_COMPRESSION_MIN_BYTES.
+
+    Reads and writes see plain str; SQL string functions and LIKE do not work
+    on the stored value.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return str
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[bytes]:
+        return None if value is None else compress_text(value)
+
+    def process_result_value(self, value, dialect) -> Optional[str]:
+        return None if value is None else decompress_text(value)
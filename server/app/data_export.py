@@ -0,0 +1,176 @@
+"""Streaming full-account export (NDJSON, sectioned CSV, or a zip of CSVs)"""
+from sqlmodel import Session, select
+from typing import Iterator, List, Tuple
+from datetime import date, datetime
+from enum import Enum
+import csv
+import io
+import zipfile
+
+import orjson
+
+from .db import engine
+from .models import (
+    Goal, GoalAreaLink, Habit, HabitAreaLink, HabitCheckin, Task, Contact, ContactAreaLink,
+    Reference, ReferenceAreaLink, HealthCatalogItem, FinancialAccount, Entry, ConflictTopic
+)
+
+# Bump when the layout of exported records changes
+EXPORT_FORMAT_VERSION = 1
+
+# Rows fetched per round trip; the cursor is streamed so memory stays flat
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_tables(user_id: int) -> List[Tuple[str, object]]:
+    """
+    Return (table name, select statement) for every table holding this user's data.
+
+    Parents come before children so an importer can replay the stream in order.
+    """
+    def owned(model):
+        return select(model.__table__).where(model.user_id == user_id).order_by(model.id)
+
+    def linked(link_model, link_column, parent):
+        parent_ids = select(parent.id).where(parent.user_id == user_id)
+        return select(link_model.__table__).where(getattr(link_model, link_column).in_(parent_ids))
+
+    return [
+        ("contacts", owned(Contact)),
+        ("contact_area_links", linked(ContactAreaLink, "contact_id", Contact)),
+        ("goals", owned(Goal)),
+        ("goal_area_links", linked(GoalAreaLink, "goal_id", Goal)),
+        ("habits", owned(Habit)),
+        ("habit_area_links", linked(HabitAreaLink, "habit_id", Habit)),
+        ("habit_checkins", linked(HabitCheckin, "habit_id", Habit).order_by(HabitCheckin.id)),
+        ("tasks", owned(Task)),
+        ("references", owned(Reference)),
+        ("reference_area_links", linked(ReferenceAreaLink, "reference_id", Reference)),
+        ("health_catalog_items", owned(HealthCatalogItem)),
+        ("financial_accounts", owned(FinancialAccount)),
+        ("entries", owned(Entry)),
+        ("conflict_topics", owned(ConflictTopic)),
+    ]
+
+
+def _plain(value):
+    """Convert a column value to something CSV can write unambiguously"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def iter_table_rows(session: Session, statement) -> Iterator[dict]:
+    """Stream rows as dicts using a server-side cursor"""
+    result = session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for row in result:
+        yield dict(row._mapping)
+
+
+def _header(user) -> dict:
+    """Metadata describing the export"""
+    return {
+        "format_version": EXPORT_FORMAT_VERSION,
+        "user_id": user.id,
+        "username": user.username,
+        "exported_at": datetime.utcnow(),
+    }
+
+
+def ndjson_stream(user) -> Iterator[bytes]:
+    """Yield the export as NDJSON: one {"type", "data"} object per line, header first"""
+    yield orjson.dumps({"type": "export", "data": _header(user)}) + b"\n"
+
+    with Session(engine) as session:
+        for name, statement in export_tables(user.id):
+            chunk = []
+            for row in iter_table_rows(session, statement):
+                chunk.append(orjson.dumps({"type": name, "data": row}))
+                if len(chunk) >= EXPORT_BATCH_SIZE:
+                    yield b"\n".join(chunk) + b"\n"
+                    chunk = []
+            if chunk:
+                yield b"\n".join(chunk) + b"\n"
+
+
+def _write_csv_table(writer, session: Session, statement, flush) -> Iterator[bytes]:
+    """Write one table (header row, then rows) and yield output every batch"""
+    columns = [column.name for column in statement.selected_columns]
+    writer.writerow(columns)
+    written = 0
+    for row in iter_table_rows(session, statement):
+        writer.writerow([_plain(row[column]) for column in columns])
+        written += 1
+        if written % EXPORT_BATCH_SIZE == 0:
+            yield flush()
+    yield flush()
+
+
+def csv_stream(user) -> Iterator[bytes]:
+    """
+    Yield the export as one CSV document split into sections.
+
+    Each section starts with a "# <table>" line and a header row, and ends
+    with a blank line.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    buffer.write(f"# export format_version={EXPORT_FORMAT_VERSION} user={user.username}\r\n\r\n")
+    with Session(engine) as session:
+        for name, statement in export_tables(user.id):
+            buffer.write(f"# {name}\r\n")
+            yield from _write_csv_table(writer, session, statement, flush)
+            buffer.write("\r\n")
+    yield flush()
+
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable sink that collects what zipfile writes so it can be yielded"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def zip_stream(user) -> Iterator[bytes]:
+    """Yield a zip archive with one CSV per table plus a manifest, without buffering it"""
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("manifest.json", orjson.dumps(_header(user), option=orjson.OPT_INDENT_2))
+        yield sink.drain()
+
+        with Session(engine) as session:
+            for name, statement in export_tables(user.id):
+                with archive.open(f"{name}.csv", mode="w", force_zip64=True) as member:
+                    text = io.TextIOWrapper(member, encoding="utf-8", newline="")
+                    writer = csv.writer(text)
+
+                    def flush() -> bytes:
+                        text.flush()
+                        return sink.drain()
+
+                    yield from _write_csv_table(writer, session, statement, flush)
+                    text.flush()
+                    text.detach()
+                yield sink.drain()
+    yield sink.drain()
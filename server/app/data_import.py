@@ -0,0 +1,764 @@
+"""
+Streaming bulk import for seed fixtures, typed CSV rows and account exports.
+
+Supported inputs:
+    - seed/fixtures.json style documents ({"goals": [...], "tasks": [...], ...})
+    - seed/sample.csv style typed rows (type,area,name,description,value1..value4)
+    - the export formats from data_export.py (NDJSON, sectioned CSV, zip of CSVs)
+
+Records are read one at a time, life area names and contact names are resolved
+from in-memory maps, and rows are written with Core executemany inserts in
+chunked transactions. Every imported row is recorded in import_keys under a
+hash of its source record, so re-running the same import skips what is
+already there.
+
+Usage:
+    python -m server.app.data_import seed/fixtures.json --user test_user
+    python -m server.app.data_import seed/sample.csv export.ndjson --user alice --password secret123
+"""
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, SQLModel, select
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Type
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+import argparse
+import csv
+import hashlib
+import io
+import json
+import zipfile
+
+import orjson
+
+from .db import engine, ensure_schema
+from .models import (
+    User, LifeArea, LifeAreaEnum, Goal, GoalAreaLink, Habit, HabitAreaLink, HabitCheckin, Task,
+    Contact, ContactAreaLink, Reference, ReferenceAreaLink, HealthCatalogItem, FinancialAccount,
+    Entry, ConflictTopic, ImportKey, TaskStatus, count_words, make_excerpt
+)
+from .auth import create_user
+from .etags import bump_resource_versions
+
+# Rows written per transaction
+IMPORT_CHUNK_SIZE = 1000
+
+# Stop collecting error messages after this many (they are still counted)
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportTable(NamedTuple):
+    """How one destination table is imported"""
+    model: Type[SQLModel]
+    link_model: Optional[Type[SQLModel]] = None
+    link_column: Optional[str] = None
+    parent: Optional[str] = None
+
+
+# Keyed by table name, which is also the record type used by every source format
+IMPORT_TABLES: Dict[str, ImportTable] = {
+    "contacts": ImportTable(Contact, ContactAreaLink, "contact_id"),
+    "goals": ImportTable(Goal, GoalAreaLink, "goal_id"),
+    "habits": ImportTable(Habit, HabitAreaLink, "habit_id"),
+    "habit_checkins": ImportTable(HabitCheckin, parent="habits"),
+    "tasks": ImportTable(Task),
+    "references": ImportTable(Reference, ReferenceAreaLink, "reference_id"),
+    "health_catalog_items": ImportTable(HealthCatalogItem),
+    "financial_accounts": ImportTable(FinancialAccount),
+    "entries": ImportTable(Entry),
+    "conflict_topics": ImportTable(ConflictTopic),
+}
+
+# Link tables as they appear in exports: name -> parent table
+LINK_TABLES: Dict[str, str] = {
+    spec.link_model.__tablename__: name for name, spec in IMPORT_TABLES.items() if spec.link_model is not None
+}
+
+# Foreign keys that point at rows created by the same import (export records carry source IDs)
+REMAPPED_COLUMNS: Dict[str, str] = {
+    "contact_id": "contacts",
+    "goal_id": "goals",
+    "habit_id": "habits",
+    "reference_id": "references",
+}
+
+# Columns the importer always sets itself
+MANAGED_COLUMNS = {"id", "user_id", "version", "updated_at", "word_count", "excerpt", "materialized_until"}
+
+
+class ImportFailed(Exception):
+    """Raised when an import cannot continue (unknown user, unreadable source)"""
+
+
+class SourceRecord(NamedTuple):
+    """
+    One record read from a source, before coercion.
+
+    - **table**: Destination table name (or "life_areas", "users", a link table)
+    - **values**: Raw column values; may also hold "areas" (names or IDs) and "contact" (a name)
+    - **location**: Where the record came from, for error messages
+    """
+    table: str
+    values: Dict[str, Any]
+    location: str
+
+
+class ImportResult:
+    """Per-table counters collected during an import"""
+
+    def __init__(self):
+        self.inserted = Counter()
+        self.skipped = Counter()
+        self.failed = 0
+        self.errors: List[str] = []
+
+    def error(self, location: str, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"{location}: {message}")
+
+    @property
+    def total_inserted(self) -> int:
+        return sum(self.inserted.values())
+
+    @property
+    def total_skipped(self) -> int:
+        return sum(self.skipped.values())
+
+
+# ==================== SOURCES ====================
+
+def _blank_to_none(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: (None if value == "" else value) for key, value in values.items()}
+
+
+def read_fixtures(path: Path) -> Iterator[SourceRecord]:
+    """
+    Read a fixtures.json document.
+
+    A single JSON document cannot be parsed incrementally with the standard
+    library, so it is loaded whole; use NDJSON or CSV for large imports.
+    """
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+
+    for key, items in document.items():
+        table = "health_catalog_items" if key == "health_catalog" else key
+        for index, item in enumerate(items):
+            values = dict(item)
+            if "area" in values:
+                values["areas"] = [values.pop("area")]
+            yield SourceRecord(table, values, f"{path.name}:{key}[{index}]")
+
+
+def _typed_life_area(row: List[str]) -> Dict[str, Any]:
+    return {"name": row[1], "display_name": row[2], "description": row[3], "icon": row[4]}
+
+
+def _typed_reference(row: List[str]) -> Dict[str, Any]:
+    values = {"title": row[2], "notes": row[3], "type": row[4], "content": row[7]}
+    if row[4] == "law":
+        values["law_level"] = row[5]
+    else:
+        values["url"] = row[5]
+    return values
+
+
+# Which column holds the type-specific detail in value2
+_HEALTH_DETAIL_COLUMNS = {
+    "supplement": "supplement_dosage",
+    "medication": "medication_dosage",
+    "motion": "motion_duration",
+    "doctor": "doctor_specialty",
+    "food": "notes",
+}
+
+
+def _typed_health(row: List[str]) -> Dict[str, Any]:
+    values = {"name": row[2], "description": row[3], "catalog_type": row[4], "frequency_description": row[6]}
+    values[_HEALTH_DETAIL_COLUMNS.get(row[4], "notes")] = row[5]
+    if row[4] == "medication":
+        values["medication_frequency"] = row[6]
+    return values
+
+
+def _typed_finance(row: List[str]) -> Dict[str, Any]:
+    account_type, balance, extra, detail = row[4], row[5], row[6], row[7]
+    values = {"name": row[2], "notes": row[3], "account_type": account_type, "current_balance": balance}
+    notes = []
+    if extra:
+        if account_type == "liability":
+            values["interest_rate"] = extra
+        else:
+            notes.append(f"{detail}: {extra}" if detail else extra)
+            detail = ""
+    if detail:
+        try:
+            values["due_date"] = date.fromisoformat(detail).isoformat()
+        except ValueError:
+            digits = "".join(ch for ch in detail if ch.isdigit())
+            if detail.startswith("...") and len(digits) == 4:
+                values["account_number_last4"] = digits
+            else:
+                notes.append(detail)
+    if notes:
+        values["notes"] = " | ".join([row[3]] + notes) if row[3] else " | ".join(notes)
+    return values
+
+
+def _positional(*columns: Optional[str]) -> Callable[[List[str]], Dict[str, Any]]:
+    """Map name, description, value1..value4 onto columns (None skips a position)"""
+    def convert(row: List[str]) -> Dict[str, Any]:
+        return {column: value for column, value in zip(columns, row[2:]) if column}
+    return convert
+
+
+# type column -> (table, row converter)
+TYPED_CSV_ROWS: Dict[str, tuple] = {
+    "life_area": ("life_areas", _typed_life_area),
+    "goal": ("goals", _positional("title", "description", "timeframe", "status", "progress_percentage", "due_date")),
+    "habit": ("habits", _positional("name", "description", "habit_type", "frequency_description", "current_streak", "longest_streak")),
+    "contact": ("contacts", _positional("name", "role", "phone", "email", "birthday", "notes")),
+    "task": ("tasks", _positional("title", "description", "status", "priority", "due_date", "contact")),
+    "reference": ("references", _typed_reference),
+    "health": ("health_catalog_items", _typed_health),
+    "finance": ("financial_accounts", _typed_finance),
+    "conflict": ("conflict_topics", _positional("topic", "description", "resolution_strategy", "progress_notes")),
+    "entry": ("entries", _positional("title", "content", None, "entry_date")),
+}
+
+
+def read_typed_csv(lines: Iterable[str], name: str) -> Iterator[SourceRecord]:
+    """Read sample.csv style rows: type,area,name,description,value1,value2,value3,value4"""
+    reader = csv.reader(lines)
+    next(reader, None)  # header
+    for row in reader:
+        if not row:
+            continue
+        location = f"{name}:{reader.line_num}"
+        row = (row + [""] * 8)[:8]
+        kind = row[0].strip()
+        if kind not in TYPED_CSV_ROWS:
+            yield SourceRecord(kind, {}, location)
+            continue
+        table, convert = TYPED_CSV_ROWS[kind]
+        values = _blank_to_none(convert(row))
+        if table != "life_areas":
+            values["areas"] = [row[1]] if row[1] else []
+        yield SourceRecord(table, values, location)
+
+
+def read_export_csv(lines: Iterable[str], name: str) -> Iterator[SourceRecord]:
+    """Read a sectioned export CSV ("# <table>" line, header row, rows, blank line)"""
+    table = None
+    header = None
+    reader = csv.reader(lines)
+    for row in reader:
+        if not row:
+            table = header = None
+            continue
+        if row[0].startswith("#"):
+            if not row[0].startswith("# export"):
+                table = row[0][1:].strip()
+            continue
+        if table is None:
+            continue
+        if header is None:
+            header = row
+            continue
+        yield SourceRecord(table, _blank_to_none(dict(zip(header, row))), f"{name}:{reader.line_num}")
+
+
+def read_ndjson(path: Path) -> Iterator[SourceRecord]:
+    """Read an NDJSON export one line at a time"""
+    with open(path, "rb") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            yield SourceRecord(record.get("type", ""), record.get("data") or {}, f"{path.name}:{line_number}")
+
+
+def read_export_zip(path: Path) -> Iterator[SourceRecord]:
+    """Read a zip export, one CSV member per table"""
+    with zipfile.ZipFile(path) as archive:
+        for member in archive.namelist():
+            if not member.endswith(".csv"):
+                continue
+            table = member[:-len(".csv")]
+            with archive.open(member) as raw:
+                reader = csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8", newline=""))
+                for row in reader:
+                    yield SourceRecord(table, _blank_to_none(row), f"{member}:{reader.line_num}")
+
+
+def read_source(path: Path) -> Iterator[SourceRecord]:
+    """Pick a reader from the file extension (and, for CSV, the first line)"""
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        return read_fixtures(path)
+    if suffix in (".ndjson", ".jsonl"):
+        return read_ndjson(path)
+    if suffix == ".zip":
+        return read_export_zip(path)
+    if suffix == ".csv":
+        return _read_csv(path)
+    raise ImportFailed(f"Unsupported file type: {path.name}")
+
+
+def _read_csv(path: Path) -> Iterator[SourceRecord]:
+    with open(path, encoding="utf-8", newline="") as f:
+        first = f.readline()
+        f.seek(0)
+        reader = read_export_csv if first.startswith("# export") else read_typed_csv
+        yield from reader(f, path.name)
+
+
+# ==================== COERCION ====================
+
+def _enum_converter(enum_class: Type[Enum]) -> Callable[[Any], Enum]:
+    def convert(value):
+        if isinstance(value, enum_class):
+            return value
+        try:
+            return enum_class(value)
+        except ValueError:
+            try:
+                return enum_class[value]
+            except KeyError:
+                raise ValueError(f"'{value}' is not a valid {enum_class.__name__}") from None
+    return convert
+
+
+def _bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+def _date(value) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _datetime(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def _converter(column) -> Callable[[Any], Any]:
+    """Return a function turning a raw source value into the column's Python type"""
+    enum_class = getattr(column.type, "enum_class", None)
+    if enum_class is not None:
+        return _enum_converter(enum_class)
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        # sqlmodel's AutoString does not declare one
+        python_type = str
+    if python_type is bool:
+        return _bool
+    if python_type is datetime:
+        return _datetime
+    if python_type is date:
+        return _date
+    return python_type
+
+
+class TableWriter:
+    """Coerces records for one model and fills defaults so every row has the same keys"""
+
+    def __init__(self, model: Type[SQLModel]):
+        self.table = model.__table__
+        self.converters = {}
+        self.defaults = {}
+        self.required = []
+        for column in self.table.columns:
+            if column.name in ("id",):
+                continue
+            self.converters[column.name] = _converter(column)
+            field = model.model_fields.get(column.name)
+            if field is not None and field.default_factory is not None:
+                self.defaults[column.name] = field.default_factory
+            elif field is not None and not field.is_required():
+                self.defaults[column.name] = field.default
+            elif column.name not in MANAGED_COLUMNS:
+                self.required.append(column.name)
+
+    def row(self, values: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Build a complete insert row; raises ValueError for bad or missing values"""
+        row = {}
+        for name, convert in self.converters.items():
+            value = values.get(name)
+            if value is None:
+                default = self.defaults.get(name)
+                value = default() if callable(default) else default
+            else:
+                try:
+                    value = convert(value)
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"{name}: {e}") from None
+            row[name] = value
+        missing = [name for name in self.required if row.get(name) is None]
+        if missing:
+            raise ValueError(f"missing required field(s): {', '.join(missing)}")
+        if "updated_at" in row:
+            row["updated_at"] = now
+        if "version" in row:
+            row["version"] = 1
+        if "word_count" in row:
+            row["word_count"] = count_words(row.get("content"))
+        if "excerpt" in row:
+            row["excerpt"] = make_excerpt(row.get("content"))
+        if "materialized_until" in row:
+            # Imported series build their occurrences on first use
+            row["materialized_until"] = None
+        return row
+
+
+def record_key(record: SourceRecord) -> str:
+    """Stable hash of a source record, used to recognise it on a re-run"""
+    payload = orjson.dumps([record.table, record.values], option=orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+# ==================== ENGINE ====================
+
+class _Pending(NamedTuple):
+    key: str
+    row: Dict[str, Any]
+    source_id: Any
+    area_ids: List[int]
+
+
+class Importer:
+    """
+    Load records for one user in chunked transactions.
+
+    Usage:
+        with Session(engine) as session:
+            result = Importer(session, "alice").run(read_source(Path("seed/sample.csv")))
+    """
+
+    def __init__(self, session: Session, username: str, password: Optional[str] = None, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.session = session
+        self.username = username
+        self.password = password
+        self.chunk_size = chunk_size
+        self.result = ImportResult()
+        self.writers = {name: TableWriter(spec.model) for name, spec in IMPORT_TABLES.items()}
+
+        self.user = session.exec(select(User).where(User.username == username)).first()
+        if self.user is None and password:
+            self.user = create_user(session, username, password)
+
+        # In-memory lookups: area name -> id, contact name -> id, (table, source id) -> new id
+        self.area_ids: Dict[str, int] = {}
+        self.known_area_ids = set()
+        for area_id, name in session.exec(select(LifeArea.id, LifeArea.name)).all():
+            self._remember_area(area_id, name)
+        self.contact_ids: Dict[str, int] = {}
+        if self.user is not None:
+            self._load_contacts()
+        self.id_map: Dict[tuple, int] = {}
+
+        self._table: Optional[str] = None
+        self._pending: List[_Pending] = []
+        dialect = session.connection().dialect
+        self._bulk_returning = bool(getattr(dialect, "insert_executemany_returning_sort_by_parameter_order", False))
+
+    def _remember_area(self, area_id: int, name):
+        name = name.value if isinstance(name, Enum) else name
+        self.area_ids[name] = area_id
+        self.known_area_ids.add(area_id)
+
+    def _load_contacts(self):
+        rows = self.session.exec(
+            select(Contact.id, Contact.name).where(Contact.user_id == self.user.id).order_by(Contact.id)
+        ).all()
+        self.contact_ids = {name: contact_id for contact_id, name in rows}
+
+    def run(self, records: Iterable[SourceRecord]) -> ImportResult:
+        """Import every record and commit; returns the counters"""
+        for record in records:
+            try:
+                self.add(record)
+            except ValueError as e:
+                self.result.error(record.location, str(e))
+        self.flush()
+        return self.result
+
+    def add(self, record: SourceRecord):
+        """Queue one record, flushing the current chunk when the table changes or it is full"""
+        table = record.table
+        if table != self._table:
+            self.flush()
+            self._table = table
+
+        if table == "export":
+            return
+        if table == "users":
+            self._add_user(record)
+            return
+        if table == "life_areas":
+            self._add_life_area(record)
+            return
+
+        if self.user is None:
+            raise ImportFailed(f"User '{self.username}' does not exist; pass a password to create it")
+
+        if table in LINK_TABLES:
+            self._add_link(record)
+        elif table in IMPORT_TABLES:
+            self._add_row(record)
+        else:
+            raise ValueError(f"unknown record type '{table}'")
+
+        if len(self._pending) >= self.chunk_size:
+            self.flush()
+
+    def _add_user(self, record: SourceRecord):
+        values = record.values
+        if values.get("username") != self.username:
+            self.result.skipped["users"] += 1
+            return
+        if self.user is not None:
+            self.result.skipped["users"] += 1
+            return
+        password = self.password or values.get("password_plaintext")
+        if not password:
+            raise ValueError("user record has no password")
+        self.user = create_user(
+            self.session, self.username, password,
+            email=values.get("email"), full_name=values.get("full_name")
+        )
+        self._load_contacts()
+        self.result.inserted["users"] += 1
+
+    def _add_life_area(self, record: SourceRecord):
+        """Life areas are global; create any that are missing, matched by name"""
+        name = _enum_converter(LifeAreaEnum)(record.values.get("name"))
+        if name.value in self.area_ids:
+            self.result.skipped["life_areas"] += 1
+            return
+        area = LifeArea(
+            name=name,
+            display_name=record.values.get("display_name") or name.value,
+            description=record.values.get("description"),
+            icon=record.values.get("icon"),
+        )
+        self.session.add(area)
+        self.session.commit()
+        self._remember_area(area.id, name)
+        self.result.inserted["life_areas"] += 1
+
+    def _resolve_areas(self, values: Dict[str, Any]) -> List[int]:
+        area_ids = []
+        areas = values.get("areas") or []
+        if values.get("area_id") is not None:
+            areas = [values["area_id"]] + list(areas)
+        for area in areas:
+            if isinstance(area, str) and not area.isdigit():
+                if area not in self.area_ids:
+                    raise ValueError(f"unknown life area '{area}'")
+                area_ids.append(self.area_ids[area])
+            else:
+                if int(area) not in self.known_area_ids:
+                    raise ValueError(f"unknown life area id {area}")
+                area_ids.append(int(area))
+        return area_ids
+
+    def _remap(self, values: Dict[str, Any], column: str):
+        """Translate a source foreign key into the ID of the row this import created"""
+        source_id = values.get(column)
+        if source_id is None:
+            return None
+        new_id = self.id_map.get((REMAPPED_COLUMNS[column], str(source_id)))
+        if new_id is None:
+            raise ValueError(f"{column} {source_id} does not match an imported row")
+        return new_id
+
+    def _add_row(self, record: SourceRecord):
+        table = record.table
+        spec = IMPORT_TABLES[table]
+        values = dict(record.values)
+        columns = self.writers[table].converters
+
+        if table == "tasks" and values.get("recurrence_id") is not None:
+            # Occurrences are regenerated from their imported series; finished ones stay as plain tasks
+            if values.get("status") != TaskStatus.DONE.value:
+                self.result.skipped[table] += 1
+                return
+            values["recurrence_id"] = None
+
+        for column in REMAPPED_COLUMNS:
+            if column in values and column in columns:
+                values[column] = self._remap(values, column)
+
+        contact_name = values.pop("contact", None)
+        if contact_name:
+            if contact_name not in self.contact_ids:
+                raise ValueError(f"unknown contact '{contact_name}'")
+            values["contact_id"] = self.contact_ids[contact_name]
+
+        area_ids = self._resolve_areas(values) if ("areas" in values or "area_id" in values) else []
+        if "area_id" in columns:
+            if not area_ids:
+                raise ValueError("missing life area")
+            values["area_id"] = area_ids[0]
+            area_ids = []
+        elif spec.link_model is None:
+            area_ids = []
+
+        row = self.writers[table].row(values, datetime.utcnow())
+        if "user_id" in row:
+            row["user_id"] = self.user.id
+        source_id = record.values.get("id")
+        self._pending.append(_Pending(record_key(record), row, source_id, area_ids))
+
+    def _add_link(self, record: SourceRecord):
+        parent = LINK_TABLES[record.table]
+        link_column = IMPORT_TABLES[parent].link_column
+        parent_id = self._remap(record.values, link_column)
+        if parent_id is None:
+            raise ValueError(f"missing {link_column}")
+        area_ids = self._resolve_areas({"area_id": record.values.get("area_id")})
+        self._pending.append(_Pending("", {link_column: parent_id, "area_id": area_ids[0]}, None, []))
+
+    def flush(self):
+        """Write the pending chunk in one transaction"""
+        if not self._pending:
+            return
+        table, pending = self._table, self._pending
+        self._pending = []
+        if table in LINK_TABLES:
+            spec = IMPORT_TABLES[LINK_TABLES[table]]
+            inserted = self._insert_links(spec.link_model, [item.row for item in pending])
+            if inserted:
+                self.result.inserted[table] += inserted
+            if inserted < len(pending):
+                self.result.skipped[table] += len(pending) - inserted
+            self.session.commit()
+            return
+
+        spec = IMPORT_TABLES[table]
+        connection = self.session.connection()
+
+        # Drop rows already imported by an earlier run (or repeated within this chunk)
+        unique: Dict[str, _Pending] = {}
+        source_ids: Dict[str, List[Any]] = {}
+        for item in pending:
+            if item.key in unique:
+                self.result.skipped[table] += 1
+            else:
+                unique[item.key] = item
+            source_ids.setdefault(item.key, []).append(item.source_id)
+        existing = dict(connection.execute(
+            select(ImportKey.key, ImportKey.row_id).where(
+                ImportKey.user_id == self.user.id,
+                ImportKey.resource == table,
+                ImportKey.key.in_(list(unique))
+            )
+        ).all())
+        new_items = []
+        for key, item in unique.items():
+            if key in existing:
+                self._map_sources(table, source_ids[key], existing[key])
+                self.result.skipped[table] += 1
+            else:
+                new_items.append(item)
+
+        if new_items:
+            new_ids = self._insert_rows(spec.model.__table__, [item.row for item in new_items])
+            connection.execute(ImportKey.__table__.insert(), [
+                {"user_id": self.user.id, "resource": table, "key": item.key, "row_id": row_id}
+                for item, row_id in zip(new_items, new_ids)
+            ])
+            links = []
+            for item, row_id in zip(new_items, new_ids):
+                self._map_sources(table, source_ids[item.key], row_id)
+                if table == "contacts":
+                    self.contact_ids.setdefault(item.row["name"], row_id)
+                links.extend({spec.link_column: row_id, "area_id": area_id} for area_id in item.area_ids)
+            if links:
+                self._insert_links(spec.link_model, links)
+            bump_resource_versions(self.session, [(self.user.id, spec.parent or table)])
+            self.result.inserted[table] += len(new_items)
+
+        self.session.commit()
+
+    def _map_sources(self, table: str, source_ids: List[Any], row_id: Optional[int]):
+        """Remember which row each source ID became, for tables other records point at"""
+        if row_id is None or table not in REMAPPED_COLUMNS.values():
+            return
+        for source_id in source_ids:
+            if source_id is not None:
+                self.id_map[(table, str(source_id))] = row_id
+
+    def _insert_rows(self, table, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert rows and return their new IDs in order"""
+        connection = self.session.connection()
+        if self._bulk_returning:
+            statement = table.insert().returning(table.c.id, sort_by_parameter_order=True)
+            return list(connection.execute(statement, rows).scalars())
+        # Databases without multi-row RETURNING get one round trip per row
+        return [connection.execute(table.insert(), row).inserted_primary_key[0] for row in rows]
+
+    def _insert_links(self, link_model: Type[SQLModel], rows: List[Dict[str, Any]]) -> int:
+        """Insert link rows, ignoring ones that already exist; returns how many were new"""
+        connection = self.session.connection()
+        dialect = connection.dialect.name
+        now = datetime.utcnow()
+        rows = [{**row, "created_at": row.get("created_at") or now} for row in rows]
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            result = connection.execute(insert(link_model).on_conflict_do_nothing(), rows)
+            return max(result.rowcount, 0)
+
+        columns = [column for column in link_model.__table__.primary_key.columns]
+        inserted = 0
+        for row in rows:
+            exists = connection.execute(
+                select(*columns).where(*[column == row[column.name] for column in columns])
+            ).first()
+            if exists is None:
+                connection.execute(link_model.__table__.insert(), row)
+                inserted += 1
+        return inserted
+
+
+def import_files(paths: Iterable[Path], username: str, password: Optional[str] = None, chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportResult:
+    """Import one or more files for a user, in order, in a single session"""
+    with Session(engine) as session:
+        importer = Importer(session, username, password, chunk_size)
+        for path in paths:
+            importer.run(read_source(Path(path)))
+        return importer.result
+
+
+# ==================== CLI ====================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import fixtures, typed CSV rows or an account export")
+    parser.add_argument("paths", nargs="+", type=Path, help="Files to import, in order (.json, .csv, .ndjson, .zip)")
+    parser.add_argument("--user", required=True, help="Username that owns the imported rows")
+    parser.add_argument("--password", help="Create the user with this password if it does not exist")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Rows per transaction")
+    args = parser.parse_args(argv)
+
+    ensure_schema()
+    try:
+        result = import_files(args.paths, args.user, args.password, args.chunk_size)
+    except ImportFailed as e:
+        print(f"[IMPORT] {e}")
+        return 1
+
+    for table in sorted(set(result.inserted) | set(result.skipped)):
+        print(f"[IMPORT] {table}: {result.inserted[table]} inserted, {result.skipped[table]} already present")
+    for message in result.errors:
+        print(f"[IMPORT] error {message}")
+    print(f"[IMPORT] {result.total_inserted} inserted, {result.total_skipped} skipped, {result.failed} failed")
+    return 0 if result.failed == 0 else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
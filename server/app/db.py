@@ -1,6 +1,8 @@
 """Database connection and session management"""
 from sqlmodel import create_engine, Session, SQLModel
-from typing import Generator
+from sqlalchemy import inspect
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from typing import Generator, Optional
 import os
 from pathlib import Path
 from urllib.parse import urlparse
@@ -89,8 +91,24 @@ engine = create_engine(
 )
 
 
+# Alembic revision the code expects (the newest file in server/migrations/versions).
+# Bump it together with every new migration; ensure_schema() refuses to start if they disagree.
+SCHEMA_REVISION = "0013"
+
+# Revision that matches databases created by create_all() before migrations existed
+BASELINE_REVISION = "0001"
+
+# Tables created by BASELINE_REVISION; an adopted database gets whichever of these it lacks
+BASELINE_TABLES = (
+    "users", "life_areas", "goals", "goal_area_links", "habits", "habit_area_links", "habit_checkins",
+    "tasks", "contacts", "contact_area_links", "references", "reference_area_links",
+    "health_catalog_items", "financial_accounts", "entries", "conflict_topics",
+    "resource_versions", "tombstones", "import_keys",
+)
+
+
 def create_db_and_tables():
-    """Create all database tables"""
+    """Create all database tables straight from the models (scratch databases only; see ensure_schema)"""
     print("[DB] Creating database tables...")
     # Import all models to register them with SQLModel.metadata
     from . import models  # noqa: F401
@@ -98,6 +116,67 @@ def create_db_and_tables():
     print("[DB] Database tables created successfully!")
 
 
+def stored_schema_revision(connection) -> Optional[str]:
+    """The revision recorded in alembic_version, or None if migrations never ran"""
+    try:
+        return connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalar()
+    except (OperationalError, ProgrammingError):
+        return None
+
+
+def alembic_config():
+    """Alembic config for server/migrations, pointed at this process's database"""
+    from alembic.config import Config
+
+    config = Config(str(SERVER_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(SERVER_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+    # "app" when started from server/, "server.app" from the repository root; migrations
+    # import app code under the same name so the models are not registered twice
+    config.attributes["app_package"] = __package__
+    return config
+
+
+def ensure_schema() -> bool:
+    """
+    Bring the database schema up to SCHEMA_REVISION.
+
+    The common case is a single SELECT on alembic_version and no DDL; Alembic
+    is only imported when the stored revision differs. A database created by
+    the old create_all() startup is adopted: missing baseline tables are created
+    and it is stamped with BASELINE_REVISION before upgrading.
+
+    Returns True if migrations ran.
+    """
+    with engine.connect() as connection:
+        revision = stored_schema_revision(connection)
+    if revision == SCHEMA_REVISION:
+        return False
+
+    from alembic import command
+    from . import models  # noqa: F401
+
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        if revision is None and inspect(connection).has_table("users"):
+            print(f"[DB] Adopting existing database at revision {BASELINE_REVISION}")
+            baseline_tables = [SQLModel.metadata.tables[name] for name in BASELINE_TABLES]
+            SQLModel.metadata.create_all(connection, tables=baseline_tables)
+            command.stamp(config, BASELINE_REVISION)
+        print(f"[DB] Migrating schema from {revision or 'empty'} to head...")
+        command.upgrade(config, "head")
+        revision = stored_schema_revision(connection)
+
+    if revision != SCHEMA_REVISION:
+        raise RuntimeError(
+            f"Migrations ended at revision {revision} but the code expects {SCHEMA_REVISION}; "
+            "update SCHEMA_REVISION in app/db.py"
+        )
+    print(f"[DB] Schema at revision {revision}")
+    return True
+
+
 def get_session() -> Generator[Session, None, None]:
     """
     Dependency for getting database sessions.
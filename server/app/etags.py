@@ -0,0 +1,178 @@
+"""ETag and conditional GET support backed by per-user resource version counters"""
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import Select, event, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from itertools import chain
+from typing import Iterable, Optional
+
+from .db import get_session
+from .models import ResourceVersion, Tombstone, User
+from .auth import get_current_user
+
+
+def get_resource_version(session: Session, user_id: int, resource: str) -> int:
+    """Return the current version counter for a user's resource (0 if never written)"""
+    version = session.exec(
+        select(ResourceVersion.version).where(
+            ResourceVersion.user_id == user_id,
+            ResourceVersion.resource == resource
+        )
+    ).first()
+    return version or 0
+
+
+def make_etag(resource: str, user_id: int, version: int) -> str:
+    """Build a weak ETag for one user's view of a resource"""
+    return f'W/"{resource}-u{user_id}-v{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def check_not_modified(request: Request, response: Response, etag: str, cache_control: str = "private, no-cache"):
+    """
+    Answer with 304 if the client already holds this ETag, otherwise tag the response.
+
+    Raising from a dependency means the endpoint never runs, so neither the
+    row tables nor the serializer are touched for a 304.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Cookie"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+
+def conditional_get(resource: str):
+    """
+    Dependency factory for conditional GETs on a user-owned resource.
+
+    Usage:
+        @router.get("/", dependencies=[Depends(conditional_get("tasks"))])
+    """
+    def dependency(
+        request: Request,
+        response: Response,
+        session: Session = Depends(get_session),
+        current_user: User = Depends(get_current_user)
+    ) -> str:
+        version = get_resource_version(session, current_user.id, resource)
+        etag = make_etag(resource, current_user.id, version)
+        check_not_modified(request, response, etag)
+        return etag
+
+    return dependency
+
+
+def row_etag(row) -> str:
+    """Build a strong ETag from a row's version column"""
+    return f'"v{row.version}"'
+
+
+def check_if_match(if_match: Optional[str], row):
+    """
+    Reject a write with 412 if the client's If-Match does not name the row's current version.
+
+    A missing header keeps the old last-writer-wins behaviour. The ORM still
+    issues the UPDATE with "WHERE version = ?", so a write that races past this
+    check fails with StaleDataError (also mapped to 412 in main.py).
+    """
+    if not if_match or if_match.strip() == "*":
+        return
+    current = row_etag(row)
+    if current not in (candidate.strip() for candidate in if_match.split(",")):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Resource has been modified since it was read",
+            headers={"ETag": current}
+        )
+
+
+def static_conditional_get(etag: str, cache_control: str = "public, max-age=86400"):
+    """Dependency factory for conditional GETs on content that only changes with a deploy"""
+    def dependency(request: Request, response: Response) -> str:
+        check_not_modified(request, response, etag, cache_control)
+        return etag
+
+    return dependency
+
+
+def bump_resource_versions(session: Session, keys: Iterable[tuple]):
+    """Increment the version counter for each (user_id, resource) pair"""
+    connection = session.connection()
+    dialect = connection.dialect.name
+    for user_id, resource in keys:
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            statement = insert(ResourceVersion).values(user_id=user_id, resource=resource, version=1)
+            statement = statement.on_conflict_do_update(
+                index_elements=["user_id", "resource"],
+                set_={"version": ResourceVersion.version + 1}
+            )
+            connection.execute(statement)
+            continue
+
+        result = connection.execute(
+            ResourceVersion.__table__.update()
+            .where(ResourceVersion.user_id == user_id, ResourceVersion.resource == resource)
+            .values(version=ResourceVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            connection.execute(
+                ResourceVersion.__table__.insert().values(user_id=user_id, resource=resource, version=1)
+            )
+
+
+def bump_resource_versions_for(session: Session, resource: str, user_ids: Select):
+    """
+    Increment `resource` for every user id the SELECT returns, in one statement.
+
+    For set-based Core writes touching many users at once; run it before the
+    write, with the same WHERE clause.
+    """
+    connection = session.connection()
+    dialect = connection.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        bump_resource_versions(session, [(user_id, resource) for user_id in connection.execute(user_ids).scalars()])
+        return
+
+    insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+    # DISTINCT: one upsert may not touch the same row twice
+    rows = user_ids.distinct().add_columns(literal(resource), literal(1))
+    statement = insert(ResourceVersion).from_select(["user_id", "resource", "version"], rows)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=["user_id", "resource"],
+        set_={"version": ResourceVersion.version + 1}
+    ))
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_versions_after_flush(session, flush_context):
+    """Bump version counters for every user-owned table touched by this flush"""
+    touched = set()
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, (ResourceVersion, Tombstone)):
+            continue
+        user_id = getattr(instance, "user_id", None)
+        resource = getattr(instance, "__tablename__", None)
+        if user_id is None or resource is None:
+            continue
+        if instance in session.dirty and not session.is_modified(instance):
+            continue
+        touched.add((user_id, resource))
+
+    if touched:
+        bump_resource_versions(session, sorted(touched))
@@ -0,0 +1,40 @@
+"""Opt-in fast JSON path for large list responses"""
+from fastapi import Response
+from sqlmodel import Session, select
+from typing import Dict
+import os
+
+import orjson
+
+from .models import LifeArea
+from .schemas import LifeAreaResponse
+
+# Set FAST_JSON_LISTS=true to serve large lists straight from row tuples via orjson,
+# bypassing per-row ORM instances and Pydantic response models.
+FAST_JSON_LISTS = os.getenv("FAST_JSON_LISTS", "false").lower() in ("1", "true", "yes")
+
+# Life areas are static reference data, so serialize them once per process
+_area_cache: Dict[int, dict] = {}
+
+
+def area_lookup(session: Session) -> Dict[int, dict]:
+    """Return life areas keyed by id, already shaped like LifeAreaResponse"""
+    if not _area_cache:
+        for area in session.exec(select(LifeArea)).all():
+            _area_cache[area.id] = LifeAreaResponse.model_validate(area).model_dump(mode="json")
+    return _area_cache
+
+
+def fast_json_response(content, response: Response = None) -> Response:
+    """
+    Encode content with orjson and return it as a ready-made response.
+
+    Handlers that return a Response bypass FastAPI's header merging, so headers
+    set on the injected response (ETag, Cache-Control) are copied over here.
+    """
+    fast = Response(content=orjson.dumps(content), media_type="application/json")
+    if response is not None:
+        for key, value in response.headers.items():
+            if key.lower() not in ("content-length", "content-type"):
+                fast.headers[key] = value
+    return fast
@@ -1,15 +1,25 @@
 """Main FastAPI application entry point"""
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from starlette.middleware.sessions import SessionMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import os
 import secrets
 from pathlib import Path
 from dotenv import load_dotenv
-
-from .db import create_db_and_tables
+from sqlalchemy.orm.exc import StaleDataError
+
+from .db import ensure_schema
+from .ai_client import ai_client
+from .compression import CompressionMiddleware, PrecompressedStaticFiles
+from .metrics import MetricsMiddleware, flush_metrics, instrument_routes
+from .profiling import ProfilerMiddleware
+from . import recurrence  # noqa: F401  (registers the recurrence_roll job)
+from .scheduler import SCHEDULER_ENABLED, run_scheduler
+from .sessions import ServerSessionMiddleware, session_store
+from . import querylog  # noqa: F401  (registers the SQL timing hooks)
+from .static_build import DIST_DIR, is_fingerprinted, load_manifest
 
 # Load environment variables
 load_dotenv()
@@ -19,12 +29,23 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     """Lifespan events - runs on startup and shutdown"""
     # Startup
-    print("Creating database tables...")
-    create_db_and_tables()
-    print("Database ready!")
+    if os.getenv("DB_SCHEMA_READY"):
+        # Checked and migrated once by the process manager before the workers started (see server/gunicorn.conf.py)
+        print("Database schema already prepared")
+    else:
+        # One SELECT when the schema is current; Alembic migrations otherwise
+        ensure_schema()
+        print("Database ready!")
+    # Periodic jobs (scheduler.py); every worker polls, a lease in the database picks one to run each job
+    scheduler = asyncio.create_task(run_scheduler()) if SCHEDULER_ENABLED else None
     yield
     # Shutdown
     print("Shutting down...")
+    if scheduler is not None:
+        scheduler.cancel()
+    await ai_client.aclose()
+    session_store.flush()
+    flush_metrics()
 
 
 # Create FastAPI app
@@ -49,15 +70,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing", "X-Request-ID"],
 )
 
+# Admin-only ?profile=1 sampling profiler (inside the session middleware, which it reads)
+app.add_middleware(ProfilerMiddleware)
+
 
 def _get_app_secret() -> str:
-    """Return configured APP_SECRET or generate a temporary one."""
+    """Return configured APP_SECRET or generate a temporary one (single-process only)."""
     configured = os.getenv("APP_SECRET")
     if configured:
         return configured
 
+    # uvicorn reads --workers from WEB_CONCURRENCY; per-worker secrets would break sessions
+    if int(os.getenv("WEB_CONCURRENCY") or 1) > 1:
+        raise RuntimeError(
+            "APP_SECRET must be set when running more than one worker "
+            "(each worker would otherwise key sessions with its own secret)"
+        )
+
     generated = secrets.token_urlsafe(32)
     print(
         "[SECURITY] APP_SECRET not provided. Generated a temporary secret for this runtime. "
@@ -66,20 +98,36 @@ def _get_app_secret() -> str:
     return generated
 
 
-# Add session middleware for authentication
+# Add session middleware for authentication: the cookie carries an opaque token,
+# the session itself lives server-side (SESSION_BACKEND) behind an in-process LRU
 APP_SECRET = _get_app_secret()
 
 app.add_middleware(
-    SessionMiddleware,
+    ServerSessionMiddleware,
+    store=session_store,
     secret_key=APP_SECRET,
     session_cookie="session_id",
-    max_age=86400,  # 24 hours
     same_site="lax",
     https_only=False,  # Set to True in production with HTTPS
-    # httponly is set by default in SessionMiddleware
 )
 
 
+# Compress JSON and other text responses (gzip, or brotli when installed) above a size threshold
+app.add_middleware(CompressionMiddleware)
+
+# Outermost, so latency and response sizes cover everything above (sizes are after compression)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    """A conditional UPDATE ... WHERE version = ? matched no row: someone else wrote first"""
+    return JSONResponse(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        content={"detail": "Resource has been modified since it was read"}
+    )
+
+
 # Root endpoint
 @app.get("/")
 def read_root():
@@ -114,7 +162,8 @@ def health_check():
 
 
 # Include routers
-from .routers import auth, areas, ai, goals, habits, tasks, contacts, references, health, finance, entries, one_on_one
+from .routers import auth, areas, ai, goals, habits, tasks, contacts, references, health, finance, entries, one_on_one, batch, sync, export, admin, agenda, calendar, notifications
+from . import metrics
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(areas.router, prefix="/api/areas", tags=["Life Areas"])
@@ -128,15 +177,30 @@ app.include_router(health.router, prefix="/api/health", tags=["Health Catalog"])
 app.include_router(finance.router, prefix="/api/finance", tags=["Finance"])
 app.include_router(entries.router, prefix="/api/entries", tags=["Entries"])
 app.include_router(one_on_one.router, prefix="/api/one-on-one", tags=["One-on-One"])
+app.include_router(batch.router, prefix="/api", tags=["Batch"])
+app.include_router(sync.router, prefix="/api/sync", tags=["Sync"])
+app.include_router(export.router, prefix="/api/export", tags=["Export"])
+app.include_router(agenda.router, prefix="/api/agenda", tags=["Agenda"])
+app.include_router(calendar.router, prefix="/api", tags=["Calendar"])
+app.include_router(notifications.router, prefix="/api/notifications", tags=["Notifications"])
+app.include_router(metrics.router, tags=["Metrics"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+
+# Time endpoint bodies for the Server-Timing header (after every route is registered)
+instrument_routes(app)
 
 # Serve frontend static files
 # Find the frontend directory (it's next to server/)
 server_dir = Path(__file__).resolve().parent.parent
 frontend_dir = server_dir.parent / "frontend"
 
-if frontend_dir.exists():
+if load_manifest(DIST_DIR) is not None:
+    # Built by `python -m server.app.static_build`: hashed names, .br/.gz siblings, long-lived caching
+    app.mount("/static", PrecompressedStaticFiles(directory=str(DIST_DIR), fingerprinted=is_fingerprinted), name="static")
+    print(f"[FRONTEND] Serving built frontend from: {DIST_DIR}")
+elif frontend_dir.exists():
     # Mount static files for CSS and JS
-    app.mount("/static", StaticFiles(directory=str(frontend_dir)), name="static")
+    app.mount("/static", PrecompressedStaticFiles(directory=str(frontend_dir)), name="static")
     print(f"[FRONTEND] Serving frontend from: {frontend_dir}")
 else:
     print(f"[FRONTEND] Frontend directory not found at: {frontend_dir}")
@@ -0,0 +1,420 @@
+"""
+Request metrics in Prometheus text format.
+
+Every worker keeps plain in-process counters. They are only mutated from the
+event loop thread (DB statement timings gathered in threadpool threads are
+folded in when the request finishes), so no locks are needed. With several
+worker processes, set METRICS_DIR: each worker then writes a snapshot of its
+counters there at most every METRICS_FLUSH_SECONDS, and a scrape sums the
+snapshots of all live workers.
+"""
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from fastapi.routing import APIRoute
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import functools
+import os
+import time
+import uuid
+
+import orjson
+
+# Shared directory for per-worker snapshots (unset = single process, nothing written)
+METRICS_DIR = os.getenv("METRICS_DIR") or None
+
+# How often a worker refreshes its snapshot file
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# Snapshots older than this belong to workers that have exited
+METRICS_STALE_SECONDS = float(os.getenv("METRICS_STALE_SECONDS", "300"))
+
+# Optional bearer token required to scrape /metrics
+METRICS_TOKEN = os.getenv("METRICS_TOKEN") or None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+# ==================== METRIC TYPES ====================
+
+class Counter:
+    """Monotonic counter keyed by label values"""
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1.0):
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def snapshot(self) -> list:
+        return [[list(labels), value] for labels, value in self.values.items()]
+
+
+class Gauge(Counter):
+    """Value that goes up and down (summed across workers)"""
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1.0):
+        self.inc(labels, -amount)
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by label values; stored as per-bucket counts + sum + count"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values: Dict[tuple, List[float]] = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def snapshot(self) -> list:
+        return [[list(labels), list(series)] for labels, series in self.values.items()]
+
+
+# ==================== REGISTRY ====================
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+LATENCY = Histogram("http_request_duration_seconds", "Request latency", ("method", "route"), LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "Response body size", ("method", "route"), SIZE_BUCKETS)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled")
+DB_STATEMENTS = Histogram("http_request_db_statements", "SQL statements executed per request", ("method", "route"), STATEMENT_BUCKETS)
+DB_TIME = Histogram("http_request_db_duration_seconds", "Time spent in SQL per request", ("method", "route"), LATENCY_BUCKETS)
+JOB_RUNS = Counter("scheduler_job_runs_total", "Scheduled job runs by outcome", ("job", "status"))
+JOB_DURATION = Histogram("scheduler_job_duration_seconds", "Scheduled job run time", ("job",), JOB_BUCKETS)
+JOB_LAG = Histogram("scheduler_job_lag_seconds", "Delay between a job's scheduled time and its start", ("job",), JOB_BUCKETS)
+AI_RESPONSES = Counter("ai_responses_total", "AI verse/insight answers by where they came from", ("kind", "source"))
+
+METRICS = (
+    REQUESTS, LATENCY, RESPONSE_SIZE, IN_FLIGHT, DB_STATEMENTS, DB_TIME, JOB_RUNS, JOB_DURATION, JOB_LAG, AI_RESPONSES,
+)
+
+
+class RequestStats:
+    """
+    Per-request accumulator shared with the SQL hooks in querylog.py and the phase timers below.
+
+    The hooks add to it from whichever thread runs the query.
+    """
+    __slots__ = (
+        "scope", "request_id", "started", "db_statements", "db_seconds", "fingerprints",
+        "phases", "handler_finished",
+    )
+
+    def __init__(self, scope: Scope, request_id: str):
+        self.scope = scope
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.db_statements = 0
+        self.db_seconds = 0.0
+        self.fingerprints: Dict[str, int] = {}
+        self.phases: Dict[str, float] = {}
+        self.handler_finished: Optional[float] = None
+
+    @property
+    def route(self) -> str:
+        return route_label(self.scope)
+
+    def server_timing(self, now: float) -> str:
+        """
+        Server-Timing header value, in milliseconds.
+
+        auth covers get_current_user (including its user lookup), db all SQL,
+        app the endpoint body, serialize everything between the endpoint
+        returning and the response headers going out (response model
+        validation, JSON encoding), and total the whole request so far.
+        Phases overlap: db time is also counted inside auth and app.
+        """
+        entries = []
+        if "auth" in self.phases:
+            entries.append(_timing_entry("auth", self.phases["auth"]))
+        if self.db_statements:
+            entries.append(_timing_entry("db", self.db_seconds, f"{self.db_statements} queries"))
+        if "app" in self.phases:
+            entries.append(_timing_entry("app", self.phases["app"]))
+        if self.handler_finished is not None:
+            entries.append(_timing_entry("serialize", now - self.handler_finished))
+        entries.append(_timing_entry("total", now - self.started))
+        return ", ".join(entries)
+
+
+def _timing_entry(name: str, seconds: float, description: Optional[str] = None) -> str:
+    entry = f"{name};dur={seconds * 1000:.2f}"
+    return entry + f';desc="{description}"' if description else entry
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def route_label(scope: Scope) -> str:
+    """The route template ("/api/entries/{entry_id}"), so label cardinality stays bounded"""
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", "unmatched")
+    if scope.get("endpoint") is not None and scope.get("root_path"):
+        # Mounted sub-application such as /static
+        return scope["root_path"][len(scope.get("app_root_path", "")):] or scope["root_path"]
+    return "unmatched"
+
+
+# ==================== MIDDLEWARE ====================
+
+_last_flush = 0.0
+
+
+class MetricsMiddleware:
+    """
+    Record latency, size, status and DB usage for every HTTP request.
+
+    Also tags each request with an ID (the client's X-Request-ID, or a new one)
+    that is echoed in the response and attached to slow-query log lines, and
+    adds a Server-Timing header breaking the request down into phases.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or uuid.uuid4().hex[:16]
+        stats = RequestStats(scope, request_id[:64])
+        token = current_request_stats.set(stats)
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = stats.request_id
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter()))
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            current_request_stats.reset(token)
+            elapsed = time.perf_counter() - stats.started
+            labels = (scope["method"], route_label(scope))
+            REQUESTS.inc(labels + (str(status_code),))
+            LATENCY.observe(labels, elapsed)
+            RESPONSE_SIZE.observe(labels, size)
+            DB_STATEMENTS.observe(labels, stats.db_statements)
+            DB_TIME.observe(labels, stats.db_seconds)
+            _maybe_flush()
+
+
+# ==================== PHASE TIMING ====================
+
+@contextmanager
+def timed_phase(name: str):
+    """
+    Add the time spent in the block to the current request's Server-Timing phase `name`.
+
+    Usage:
+        with timed_phase("auth"):
+            user = load_user()
+    """
+    stats = current_request_stats.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.phases[name] = stats.phases.get(name, 0.0) + time.perf_counter() - started
+
+
+def _timed_endpoint(call: Callable) -> Callable:
+    """Wrap an endpoint so its body is timed as the "app" phase and its return marks the start of serialization"""
+    def finished(stats: Optional[RequestStats]):
+        if stats is not None:
+            stats.handler_finished = time.perf_counter()
+
+    # FastAPI decides between awaiting and the threadpool from the callable itself, so keep its kind
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def timed(**values):
+            try:
+                with timed_phase("app"):
+                    return await call(**values)
+            finally:
+                finished(current_request_stats.get())
+    else:
+        @functools.wraps(call)
+        def timed(**values):
+            try:
+                with timed_phase("app"):
+                    return call(**values)
+            finally:
+                finished(current_request_stats.get())
+
+    timed.timed_endpoint = True
+    return timed
+
+
+def instrument_routes(app) -> None:
+    """Time the endpoint body of every API route (call after all routers are included)"""
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not getattr(route.dependant.call, "timed_endpoint", False):
+            route.dependant.call = _timed_endpoint(route.dependant.call)
+
+
+# ==================== SCHEDULED JOBS ====================
+
+def record_job_run(job: str, outcome: str, duration: float, lag: float):
+    """Count a finished scheduler run (called on the event loop thread, like the middleware)"""
+    JOB_RUNS.inc((job, outcome))
+    JOB_DURATION.observe((job,), duration)
+    JOB_LAG.observe((job,), lag)
+    _maybe_flush()
+
+
+# ==================== MULTI-WORKER SNAPSHOTS ====================
+
+def snapshot() -> dict:
+    """This worker's metrics as plain data"""
+    return {metric.name: metric.snapshot() for metric in METRICS}
+
+
+def _snapshot_path() -> Path:
+    return Path(METRICS_DIR) / f"worker-{os.getpid()}.json"
+
+
+def flush_metrics():
+    """Write this worker's snapshot now (called on shutdown so its last counts are kept)"""
+    _maybe_flush(force=True)
+
+
+def _maybe_flush(force: bool = False):
+    """Write this worker's snapshot if METRICS_DIR is set and the last write is old enough"""
+    global _last_flush
+    if METRICS_DIR is None:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < METRICS_FLUSH_SECONDS:
+        return
+    _last_flush = now
+    path = _snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(".tmp")
+    temporary.write_bytes(orjson.dumps(snapshot()))
+    os.replace(temporary, path)
+
+
+def collect() -> Dict[str, Dict[tuple, object]]:
+    """Sum this worker's live counters with the other workers' latest snapshots"""
+    snapshots = [snapshot()]
+    if METRICS_DIR is not None and Path(METRICS_DIR).is_dir():
+        own = _snapshot_path()
+        cutoff = time.time() - METRICS_STALE_SECONDS
+        for path in Path(METRICS_DIR).glob("worker-*.json"):
+            if path == own:
+                continue
+            try:
+                if path.stat().st_mtime < cutoff:
+                    continue
+                snapshots.append(orjson.loads(path.read_bytes()))
+            except (OSError, orjson.JSONDecodeError):
+                continue
+
+    merged: Dict[str, Dict[tuple, object]] = {metric.name: {} for metric in METRICS}
+    for data in snapshots:
+        for name, samples in data.items():
+            if name not in merged:
+                continue
+            series = merged[name]
+            for labels, value in samples:
+                key = tuple(labels)
+                if isinstance(value, list):
+                    existing = series.get(key)
+                    series[key] = value if existing is None else [a + b for a, b in zip(existing, value)]
+                else:
+                    series[key] = series.get(key, 0.0) + value
+    return merged
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render() -> str:
+    """Render all metrics in Prometheus text exposition format (version 0.0.4)"""
+    merged = collect()
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for labels, value in sorted(merged[metric.name].items()):
+            if metric.kind != "histogram":
+                lines.append(f"{metric.name}{_format_labels(metric.labelnames, labels)} {_format_value(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets + (float("inf"),), value[:-2]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{metric.name}_bucket{_format_labels(metric.labelnames, labels, ('le', le))} {int(cumulative)}")
+            lines.append(f"{metric.name}_sum{_format_labels(metric.labelnames, labels)} {_format_value(value[-2])}")
+            lines.append(f"{metric.name}_count{_format_labels(metric.labelnames, labels)} {int(value[-1])}")
+    return "\n".join(lines) + "\n"
+
+
+# ==================== ENDPOINT ====================
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """
+    Prometheus scrape endpoint.
+
+    When METRICS_TOKEN is set, requests must send `Authorization: Bearer <token>`.
+    Runs on the event loop thread, the only thread that mutates the counters.
+    """
+    if METRICS_TOKEN is not None and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return Response(content=render(), media_type="text/plain; version=0.0.4")
@@ -1,9 +1,13 @@
 """SQLModel database models for Life Management Application"""
 from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import Column, ForeignKey, Index, Integer, event, inspect, text
+from sqlalchemy.orm import declared_attr
 from typing import Optional, List
 from datetime import datetime, date
 from enum import Enum
 
+from .compressed_text import CompressedText
+
 
 # ==================== ENUMS ====================
 
@@ -87,6 +91,11 @@ class FinancialAccountType(str, Enum):
 
 # ==================== CORE MODELS ====================
 
+def _version_mapper_args(cls):
+    """Use the version column for optimistic concurrency (UPDATE ... WHERE version = ?)"""
+    return {"version_id_col": cls.__table__.c.version}
+
+
 class User(SQLModel, table=True):
     """User account"""
     __tablename__ = "users"
@@ -96,6 +105,10 @@ class User(SQLModel, table=True):
     email: Optional[str] = Field(default=None, max_length=100)
     hashed_password: str = Field(max_length=255)
     full_name: Optional[str] = Field(default=None, max_length=100)
+    # IANA name; decides when the user's day ends (habit streak rollover, check-in dates)
+    timezone: str = Field(default="UTC", max_length=64, index=True)
+    # Local date of the last reminder digest (notifications.py); one per day at most
+    last_digest_date: Optional[date] = None
     is_active: bool = Field(default=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -138,6 +151,11 @@ class GoalAreaLink(SQLModel, table=True):
 class Goal(SQLModel, table=True):
     """User goals with progress tracking"""
     __tablename__ = "goals"
+    __table_args__ = (
+        Index("ix_goals_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_goals_user_id_due_date", "user_id", "due_date"),
+    )
+    __mapper_args__ = declared_attr(_version_mapper_args)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -150,6 +168,7 @@ class Goal(SQLModel, table=True):
     contact_id: Optional[int] = Field(default=None, foreign_key="contacts.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1)
 
     # Relationships
     user: User = Relationship(back_populates="goals")
@@ -170,6 +189,15 @@ class HabitAreaLink(SQLModel, table=True):
 class Habit(SQLModel, table=True):
     """User habits with streak tracking"""
     __tablename__ = "habits"
+    __table_args__ = (
+        Index("ix_habits_user_id_updated_at", "user_id", "updated_at"),
+        # Live streaks only, so the rollover's range scan skips habits with nothing to reset
+        Index(
+            "ix_habits_live_streak_last_checkin", "habit_type", "last_checkin_date",
+            sqlite_where=text("current_streak > 0"), postgresql_where=text("current_streak > 0"),
+        ),
+    )
+    __mapper_args__ = declared_attr(_version_mapper_args)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -182,22 +210,29 @@ class Habit(SQLModel, table=True):
     last_checkin_date: Optional[date] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1)
 
     # Relationships
     user: User = Relationship(back_populates="habits")
     areas: List[LifeArea] = Relationship(link_model=HabitAreaLink)
-    checkins: List["HabitCheckin"] = Relationship(back_populates="habit")
+    # Deleted with the habit (through the ORM, so each leaves a tombstone for delta sync)
+    checkins: List["HabitCheckin"] = Relationship(
+        back_populates="habit", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+    )
 
 
 class HabitCheckin(SQLModel, table=True):
     """Individual habit check-ins for streak calculation"""
     __tablename__ = "habit_checkins"
+    # Delta sync reads check-ins changed since a token, per habit
+    __table_args__ = (Index("ix_habit_checkins_habit_id_updated_at", "habit_id", "updated_at"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     habit_id: int = Field(foreign_key="habits.id", index=True)
     checkin_date: date = Field(index=True)
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     # Relationships
     habit: Habit = Relationship(back_populates="checkins")
@@ -208,6 +243,18 @@ class HabitCheckin(SQLModel, table=True):
 class Task(SQLModel, table=True):
     """User tasks/todos"""
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_tasks_user_id_due_date", "user_id", "due_date"),
+        # Only recurring series, so finding the ones to extend never scans ordinary tasks
+        Index(
+            "ix_tasks_series_materialized_until", "user_id", "materialized_until",
+            sqlite_where=text("recurrence IS NOT NULL"), postgresql_where=text("recurrence IS NOT NULL"),
+        ),
+        # One occurrence per series and day
+        Index("ix_tasks_recurrence_id_due_date", "recurrence_id", "due_date", unique=True),
+    )
+    __mapper_args__ = declared_attr(_version_mapper_args)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -220,13 +267,35 @@ class Task(SQLModel, table=True):
     contact_id: Optional[int] = Field(default=None, foreign_key="contacts.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1)
     completed_at: Optional[datetime] = None
+    # A recurring series has an RRULE and due_date as its first day; its occurrences are
+    # ordinary tasks pointing back at it, created up to materialized_until (see recurrence.py)
+    recurrence: Optional[str] = Field(default=None, max_length=200)
+    recurrence_id: Optional[int] = Field(
+        default=None, sa_column=Column(Integer, ForeignKey("tasks.id", ondelete="SET NULL", name="fk_tasks_recurrence_id_tasks"), nullable=True)
+    )
+    materialized_until: Optional[date] = None
 
     # Relationships
     user: User = Relationship(back_populates="tasks")
     area: LifeArea = Relationship()
 
 
+# Editing any of these on a series regenerates its upcoming occurrences
+TASK_SERIES_FIELDS = ("recurrence", "due_date", "title", "description", "priority", "area_id", "contact_id", "status")
+
+
+@event.listens_for(Task, "before_update")
+def _reschedule_series(mapper, connection, task: Task):
+    """Mark an edited series for rebuilding, whichever endpoint (single or batch) edited it"""
+    state = inspect(task)
+    if task.recurrence is None and not state.attrs.recurrence.history.has_changes():
+        return
+    if any(state.attrs[name].history.has_changes() for name in TASK_SERIES_FIELDS):
+        task.materialized_until = None
+
+
 # ==================== CONTACT SYSTEM ====================
 
 class ContactAreaLink(SQLModel, table=True):
@@ -241,6 +310,8 @@ class ContactAreaLink(SQLModel, table=True):
 class Contact(SQLModel, table=True):
     """Contacts across all life areas"""
     __tablename__ = "contacts"
+    __table_args__ = (Index("ix_contacts_user_id_updated_at", "user_id", "updated_at"),)
+    __mapper_args__ = declared_attr(_version_mapper_args)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -253,6 +324,7 @@ class Contact(SQLModel, table=True):
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1)
 
     # Relationships
     user: User = Relationship(back_populates="contacts")
@@ -273,6 +345,8 @@ class ReferenceAreaLink(SQLModel, table=True):
 class Reference(SQLModel, table=True):
     """References (websites, scriptures, laws, notes)"""
     __tablename__ = "references"
+    __table_args__ = (Index("ix_references_user_id_updated_at", "user_id", "updated_at"),)
+    __mapper_args__ = declared_attr(_version_mapper_args)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -285,6 +359,7 @@ class Reference(SQLModel, table=True):
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1)
 
     # Relationships
     user: User = Relationship(back_populates="references")
@@ -296,6 +371,8 @@ class Reference(SQLModel, table=True):
 class HealthCatalogItem(SQLModel, table=True):
     """Polymorphic health catalog (doctors, food, supplements, meds, motion)"""
     __tablename__ = "health_catalog_items"
+    __table_args__ = (Index("ix_health_catalog_items_user_id_updated_at", "user_id", "updated_at"),)
+    __mapper_args__ = declared_attr(_version_mapper_args)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -320,6 +397,7 @@ class HealthCatalogItem(SQLModel, table=True):
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1)
 
     # Relationships
     user: User = Relationship(back_populates="health_items")
@@ -330,6 +408,11 @@ class HealthCatalogItem(SQLModel, table=True):
 class FinancialAccount(SQLModel, table=True):
     """Financial accounts (banking, assets, liabilities)"""
     __tablename__ = "financial_accounts"
+    __table_args__ = (
+        Index("ix_financial_accounts_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_financial_accounts_user_id_due_date", "user_id", "due_date"),
+    )
+    __mapper_args__ = declared_attr(_version_mapper_args)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -343,6 +426,7 @@ class FinancialAccount(SQLModel, table=True):
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1)
 
     # Relationships
     user: User = Relationship(back_populates="financial_accounts")
@@ -350,29 +434,74 @@ class FinancialAccount(SQLModel, table=True):
 
 # ==================== ENTRY SYSTEM ====================
 
+# Characters of content kept in Entry.excerpt (lists return it instead of the content)
+ENTRY_EXCERPT_LENGTH = 200
+
+
 class Entry(SQLModel, table=True):
     """Journal entries per life area"""
     __tablename__ = "entries"
+    __table_args__ = (
+        Index("ix_entries_user_id_updated_at", "user_id", "updated_at"),
+        # Covers GET /api/entries/stats, so aggregating years of entries never reads their content
+        Index("ix_entries_user_id_entry_date_stats", "user_id", "entry_date", "area_id", "word_count"),
+    )
+    __mapper_args__ = declared_attr(_version_mapper_args)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
     area_id: int = Field(foreign_key="life_areas.id", index=True)
     title: Optional[str] = Field(default=None, max_length=200)
-    content: str
+    # Stored compressed above a size threshold; only loaded for single-entry reads, sync and export
+    content: str = Field(sa_column=Column(CompressedText, nullable=False))
+    excerpt: str = Field(default="", max_length=ENTRY_EXCERPT_LENGTH + 1)
+    word_count: int = Field(default=0)
+    # excerpt and word_count are kept in step with content on every write (see _summarize_content)
     entry_date: date = Field(default_factory=date.today, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1)
 
     # Relationships
     user: User = Relationship(back_populates="entries")
     area: LifeArea = Relationship()
 
 
+def count_words(text: Optional[str]) -> int:
+    """Whitespace-separated words, as stored in Entry.word_count"""
+    return len(text.split()) if text else 0
+
+
+def make_excerpt(text: Optional[str], length: int = ENTRY_EXCERPT_LENGTH) -> str:
+    """The start of the text on one line, cut at a word boundary when there is one nearby"""
+    flat = " ".join(text.split()) if text else ""
+    if len(flat) <= length:
+        return flat
+    cut = flat[:length]
+    space = cut.rfind(" ")
+    if space > length // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "\u2026"
+
+
+@event.listens_for(Entry, "before_insert")
+@event.listens_for(Entry, "before_update")
+def _summarize_content(mapper, connection, entry: Entry):
+    """ORM writes; bulk Core inserts (import, synthetic data) call count_words/make_excerpt themselves"""
+    state = inspect(entry)
+    if state.persistent and not state.attrs.content.history.has_changes():
+        return
+    entry.word_count = count_words(entry.content)
+    entry.excerpt = make_excerpt(entry.content)
+
+
 # ==================== ONE-ON-ONE SPECIFIC ====================
 
 class ConflictTopic(SQLModel, table=True):
     """Conflict topics for One-on-One relationship (max 3)"""
     __tablename__ = "conflict_topics"
+    __table_args__ = (Index("ix_conflict_topics_user_id_updated_at", "user_id", "updated_at"),)
+    __mapper_args__ = declared_attr(_version_mapper_args)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -382,6 +511,123 @@ class ConflictTopic(SQLModel, table=True):
     progress_notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1)
 
     # Relationships
     user: User = Relationship(back_populates="conflict_topics")
+
+
+# ==================== CACHE VALIDATION ====================
+
+class ResourceVersion(SQLModel, table=True):
+    """Per-user, per-resource version counter bumped on every write (drives ETags)"""
+    __tablename__ = "resource_versions"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    resource: str = Field(max_length=50, primary_key=True)
+    version: int = Field(default=0)
+
+
+# ==================== SYNC ====================
+
+class Tombstone(SQLModel, table=True):
+    """Record of a deleted row so delta sync can tell clients to drop it"""
+    __tablename__ = "tombstones"
+    __table_args__ = (Index("ix_tombstones_user_id_deleted_at", "user_id", "deleted_at"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    resource: str = Field(max_length=50)
+    row_id: int
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# ==================== IMPORT ====================
+
+class ImportKey(SQLModel, table=True):
+    """Content hash of an imported record, so re-running an import skips rows already loaded"""
+    __tablename__ = "import_keys"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    resource: str = Field(max_length=50, primary_key=True)
+    key: str = Field(max_length=32, primary_key=True)
+    row_id: Optional[int] = None
+
+
+# ==================== SESSIONS ====================
+
+class UserSession(SQLModel, table=True):
+    """Server-side login session; the cookie carries an opaque token and `id` is its keyed hash"""
+    __tablename__ = "user_sessions"
+
+    id: str = Field(primary_key=True, max_length=64)
+    user_id: Optional[int] = Field(default=None, foreign_key="users.id", index=True)
+    data: str = Field(default="{}")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
+
+
+# ==================== CALENDAR FEED ====================
+
+class CalendarFeed(SQLModel, table=True):
+    """
+    A user's ICS feed: the secret token calendar apps poll with, and the last
+    generated calendar, kept per source with the resource versions it was built from.
+    """
+    __tablename__ = "calendar_feeds"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    token_hash: str = Field(max_length=64, unique=True)
+    source_versions: str = Field(default="", max_length=200)
+    sections: Optional[str] = Field(default=None, sa_column=Column(CompressedText, nullable=True))
+    etag: Optional[str] = Field(default=None, max_length=40)
+    generated_at: Optional[datetime] = None  # last time the calendar's content changed
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# ==================== RATE LIMITING ====================
+
+class RateLimitBucket(SQLModel, table=True):
+    """Token bucket shared across workers (RATE_LIMIT_BACKEND=db), stored as the moment it is full again"""
+    __tablename__ = "rate_limit_buckets"
+
+    key: str = Field(primary_key=True, max_length=255)
+    full_at: float = Field(index=True)
+
+
+# ==================== SCHEDULED JOBS ====================
+
+class ScheduledJob(SQLModel, table=True):
+    """
+    One periodic job (see scheduler.py): when it runs next, which worker holds
+    its lease while it runs, and how the last run went.
+    """
+    __tablename__ = "scheduled_jobs"
+
+    name: str = Field(primary_key=True, max_length=100)
+    schedule: str = Field(max_length=100)
+    next_run_at: datetime = Field(index=True)
+    lease_owner: Optional[str] = Field(default=None, max_length=100)
+    lease_expires_at: Optional[datetime] = None
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_status: Optional[str] = Field(default=None, max_length=20)
+    last_error: Optional[str] = Field(default=None, max_length=500)
+    last_duration_ms: Optional[float] = None
+    run_count: int = Field(default=0)
+    failure_count: int = Field(default=0)
+
+
+# ==================== AI CONTENT CACHE ====================
+
+class AIResponse(SQLModel, table=True):
+    """A generated verse or insight, kept until expires_at (see ai_client.py)"""
+    __tablename__ = "ai_responses"
+
+    cache_key: str = Field(primary_key=True, max_length=64)
+    kind: str = Field(max_length=20)
+    area: str = Field(max_length=50)
+    provider: str = Field(max_length=50)
+    content: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
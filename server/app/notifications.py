@@ -0,0 +1,340 @@
+"""
+Daily reminder digests: upcoming birthdays, due and overdue tasks, and habits waiting for a check-in.
+
+The reminder_digest job (DIGEST_SCHEDULE) sends each user at most one digest
+per local day, once their clock has passed DIGEST_HOUR. Users are handled in
+batches of DIGEST_BATCH_USERS: each kind of reminder is one set-based query
+over the whole batch (window functions cap the items per user), the
+non-empty digests go to the sink in one call, and one UPDATE records
+users.last_digest_date for the batch. Nothing is queried per user.
+
+A batch is recorded only after the sink accepted it, so a failure, or a
+worker dying mid-run, resends that batch when the scheduler retries:
+delivery is at least once per user and day.
+
+Sinks (NOTIFY_SINK):
+- file: appends one JSON digest per line to NOTIFY_FILE (local development)
+- smtp: one plain-text email per user with an address, via SMTP_HOST:SMTP_PORT
+  (a local stand-in such as `python -m aiosmtpd -n -l localhost:1025` will do)
+- webhook: POSTs each batch as JSON to NOTIFY_WEBHOOK_URL, signed with
+  NOTIFY_WEBHOOK_SECRET in X-Signature (sha256=<hex HMAC of the body>)
+With NOTIFY_SINK unset no digests are sent and the job is not registered.
+"""
+from sqlalchemy import extract, func, or_, select, update
+from datetime import date, datetime, timedelta
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import calendar
+import hashlib
+import hmac
+import os
+import smtplib
+import urllib.request
+
+import orjson
+
+from .db import SERVER_DIR, engine
+from .models import Contact, Habit, HabitType, Task, TaskStatus, User
+from .scheduler import scheduled_job
+from .streaks import local_now
+
+# When the job looks for users due a digest (UTC cron); each user gets theirs
+# on the first run after DIGEST_HOUR in their own timezone
+DIGEST_SCHEDULE = os.getenv("DIGEST_SCHEDULE", "*/15 * * * *")
+DIGEST_HOUR = int(os.getenv("DIGEST_HOUR", "7"))
+
+# Birthdays from today through this many days ahead are listed
+DIGEST_BIRTHDAY_DAYS = int(os.getenv("DIGEST_BIRTHDAY_DAYS", "7"))
+
+# Items listed per section; the digest still carries the full count
+DIGEST_MAX_ITEMS = int(os.getenv("DIGEST_MAX_ITEMS", "10"))
+
+# Users per batch: one round of queries, one sink call, one UPDATE.
+# Batches are bound as IN lists, so keep it under SQLite's 32766 parameters.
+DIGEST_BATCH_USERS = int(os.getenv("DIGEST_BATCH_USERS", "1000"))
+
+# Where digests go: "file", "smtp", "webhook", or empty for nowhere
+NOTIFY_SINK = os.getenv("NOTIFY_SINK", "")
+NOTIFY_FILE = os.getenv("NOTIFY_FILE") or str(SERVER_DIR / "data" / "digests.ndjson")
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "1025"))
+NOTIFY_FROM = os.getenv("NOTIFY_FROM", "reminders@localhost")
+NOTIFY_WEBHOOK_URL = os.getenv("NOTIFY_WEBHOOK_URL") or None
+NOTIFY_WEBHOOK_SECRET = os.getenv("NOTIFY_WEBHOOK_SECRET") or None
+
+# Seconds to wait on the SMTP server or webhook before the batch counts as failed
+SINK_TIMEOUT = 30
+
+
+# ==================== REMINDER QUERIES ====================
+
+def _birthday_window(today: date, days: int) -> Dict[int, date]:
+    """month * 100 + day for each day of the window, mapped to that day"""
+    window = {}
+    for offset in range(days):
+        day = today + timedelta(days=offset)
+        window[day.month * 100 + day.day] = day
+        if (day.month, day.day) == (2, 28) and not calendar.isleap(day.year):
+            # 29 February birthdays are remembered on the 28th in common years
+            window[229] = day
+    return window
+
+
+def _birthdays(connection, user_ids: List[int], today: date) -> Dict[int, List[dict]]:
+    window = _birthday_window(today, DIGEST_BIRTHDAY_DAYS)
+    code = extract("month", Contact.birthday) * 100 + extract("day", Contact.birthday)
+    rows = connection.execute(
+        select(Contact.user_id, Contact.id, Contact.name, Contact.birthday, code.label("code"))
+        .where(Contact.user_id.in_(user_ids), Contact.birthday.is_not(None), code.in_(list(window)))
+    )
+    found: Dict[int, List[dict]] = {}
+    for row in rows:
+        day = window[row.code]
+        found.setdefault(row.user_id, []).append({
+            "contact_id": row.id, "name": row.name, "date": day, "turns": day.year - row.birthday.year,
+        })
+    for items in found.values():
+        items.sort(key=lambda item: (item["date"], item["name"]))
+        del items[DIGEST_MAX_ITEMS:]
+    return found
+
+
+def _ranked(connection, statement, partition, order_by) -> Tuple[Dict[int, List], Dict[int, int]]:
+    """The first DIGEST_MAX_ITEMS rows per user of `statement`, and each user's total"""
+    ranked = statement.add_columns(
+        func.row_number().over(partition_by=partition, order_by=order_by).label("rank"),
+        func.count().over(partition_by=partition).label("total"),
+    ).subquery()
+    items: Dict[int, List] = {}
+    totals: Dict[int, int] = {}
+    for row in connection.execute(
+        select(ranked).where(ranked.c.rank <= DIGEST_MAX_ITEMS).order_by(ranked.c.user_id, ranked.c.rank)
+    ):
+        items.setdefault(row.user_id, []).append(row)
+        totals[row.user_id] = row.total
+    return items, totals
+
+
+def _tasks(connection, user_ids: List[int], today: date) -> Tuple[Dict[int, List[dict]], Dict[int, int]]:
+    """Open tasks due today or earlier, oldest first (series rows excluded; their occurrences count)"""
+    rows, totals = _ranked(
+        connection,
+        select(Task.user_id, Task.id, Task.title, Task.due_date).where(
+            Task.user_id.in_(user_ids), Task.due_date <= today, Task.status != TaskStatus.DONE,
+            Task.recurrence.is_(None),
+        ),
+        Task.user_id, (Task.due_date, Task.id),
+    )
+    items = {
+        user_id: [
+            {"id": row.id, "title": row.title, "due_date": row.due_date, "overdue": row.due_date < today}
+            for row in user_rows
+        ]
+        for user_id, user_rows in rows.items()
+    }
+    return items, totals
+
+
+def _habits(connection, user_ids: List[int], today: date) -> Tuple[Dict[int, List[dict]], Dict[int, int]]:
+    """Habits to build (gain) not checked in today, longest running streak first"""
+    rows, totals = _ranked(
+        connection,
+        select(Habit.user_id, Habit.id, Habit.name, Habit.current_streak).where(
+            Habit.user_id.in_(user_ids), Habit.habit_type == HabitType.GAIN,
+            or_(Habit.last_checkin_date.is_(None), Habit.last_checkin_date < today),
+        ),
+        Habit.user_id, (Habit.current_streak.desc(), Habit.id),
+    )
+    items = {
+        user_id: [{"id": row.id, "name": row.name, "current_streak": row.current_streak} for row in user_rows]
+        for user_id, user_rows in rows.items()
+    }
+    return items, totals
+
+
+def build_digests(connection, users: List, today: date) -> List[dict]:
+    """One digest per user (id, username, email rows), from three queries whatever the batch size"""
+    user_ids = [user.id for user in users]
+    birthdays = _birthdays(connection, user_ids, today)
+    tasks, task_counts = _tasks(connection, user_ids, today)
+    habits, habit_counts = _habits(connection, user_ids, today)
+    return [
+        {
+            "user_id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "date": today,
+            "birthdays": birthdays.get(user.id, []),
+            "tasks": tasks.get(user.id, []),
+            "task_count": task_counts.get(user.id, 0),
+            "habits": habits.get(user.id, []),
+            "habit_count": habit_counts.get(user.id, 0),
+        }
+        for user in users
+    ]
+
+
+def is_empty(digest: dict) -> bool:
+    return not (digest["birthdays"] or digest["tasks"] or digest["habits"])
+
+
+def render_text(digest: dict) -> str:
+    """Plain-text body of a digest"""
+    lines = [f"Your reminders for {digest['date']:%A, %B} {digest['date'].day}", ""]
+    if digest["birthdays"]:
+        lines.append("Birthdays")
+        for item in digest["birthdays"]:
+            when = "today" if item["date"] == digest["date"] else f"{item['date']:%a %b} {item['date'].day}"
+            lines.append(f"  - {item['name']} turns {item['turns']} ({when})")
+        lines.append("")
+    if digest["tasks"]:
+        lines.append(f"Tasks due ({digest['task_count']})")
+        for item in digest["tasks"]:
+            lines.append(f"  - {item['title']}" + (f" (overdue since {item['due_date']})" if item["overdue"] else ""))
+        lines.append("")
+    if digest["habits"]:
+        lines.append(f"Habits to check in ({digest['habit_count']})")
+        for item in digest["habits"]:
+            streak = f" ({item['current_streak']}-day streak)" if item["current_streak"] else ""
+            lines.append(f"  - {item['name']}{streak}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+# ==================== SINKS ====================
+
+class FileSink:
+    """Appends each digest as one JSON line"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def send(self, digests: List[dict]) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(b"".join(orjson.dumps(digest) + b"\n" for digest in digests))
+        return len(digests)
+
+
+class SMTPSink:
+    """One email per digest over a single SMTP connection per batch; users without an email are skipped"""
+
+    def __init__(self, host: str, port: int, sender: str):
+        self.host = host
+        self.port = port
+        self.sender = sender
+
+    def send(self, digests: List[dict]) -> int:
+        addressed = [digest for digest in digests if digest["email"]]
+        if not addressed:
+            return 0
+        with smtplib.SMTP(self.host, self.port, timeout=SINK_TIMEOUT) as smtp:
+            for digest in addressed:
+                message = EmailMessage()
+                message["From"] = self.sender
+                message["To"] = digest["email"]
+                message["Subject"] = f"Your reminders for {digest['date']:%b} {digest['date'].day}"
+                message.set_content(render_text(digest))
+                smtp.send_message(message)
+        return len(addressed)
+
+
+class WebhookSink:
+    """POSTs a batch as {"digests": [...]}; any non-2xx answer fails the batch"""
+
+    def __init__(self, url: str, secret: Optional[str] = None):
+        self.url = url
+        self.secret = secret
+
+    def send(self, digests: List[dict]) -> int:
+        body = orjson.dumps({"digests": digests})
+        headers = {"Content-Type": "application/json"}
+        if self.secret:
+            signature = hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+            headers["X-Signature"] = f"sha256={signature}"
+        request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+        with urllib.request.urlopen(request, timeout=SINK_TIMEOUT) as response:
+            response.read()
+        return len(digests)
+
+
+def build_sink(name: str = NOTIFY_SINK):
+    """The sink selected by NOTIFY_SINK"""
+    if name == "file":
+        return FileSink(NOTIFY_FILE)
+    if name == "smtp":
+        return SMTPSink(SMTP_HOST, SMTP_PORT, NOTIFY_FROM)
+    if name == "webhook":
+        if NOTIFY_WEBHOOK_URL is None:
+            raise RuntimeError("NOTIFY_SINK=webhook needs NOTIFY_WEBHOOK_URL")
+        return WebhookSink(NOTIFY_WEBHOOK_URL, NOTIFY_WEBHOOK_SECRET)
+    raise RuntimeError(f"Unknown NOTIFY_SINK {name!r} (expected file, smtp or webhook)")
+
+
+# ==================== PIPELINE ====================
+
+def digest_buckets(connection, now: Optional[datetime] = None, hour: int = DIGEST_HOUR) -> Dict[date, List[str]]:
+    """Timezones already past `hour` locally, grouped by their local date"""
+    buckets: Dict[date, List[str]] = {}
+    for name in connection.execute(select(User.timezone).distinct()).scalars():
+        moment = local_now(name, now)
+        if moment.hour >= hour:
+            buckets.setdefault(moment.date(), []).append(name)
+    return buckets
+
+
+def send_digests(
+    sink,
+    now: Optional[datetime] = None,
+    batch_size: int = DIGEST_BATCH_USERS,
+    hour: int = DIGEST_HOUR,
+) -> Tuple[int, int]:
+    """
+    Send today's digest to every user who is due one; returns (users processed, digests sent).
+
+    Users with nothing to remind them of are marked done without a message.
+    """
+    processed = sent = 0
+    with engine.connect() as connection:
+        buckets = digest_buckets(connection, now, hour)
+    for today, zones in sorted(buckets.items()):
+        after_id = 0
+        while True:
+            with engine.begin() as connection:
+                users = connection.execute(
+                    select(User.id, User.username, User.email)
+                    .where(
+                        User.timezone.in_(zones), User.is_active.is_(True), User.id > after_id,
+                        or_(User.last_digest_date.is_(None), User.last_digest_date < today),
+                    )
+                    .order_by(User.id)
+                    .limit(batch_size)
+                ).all()
+                if not users:
+                    break
+                digests = [digest for digest in build_digests(connection, users, today) if not is_empty(digest)]
+                if digests:
+                    sent += sink.send(digests)
+                connection.execute(
+                    update(User.__table__)
+                    .where(User.id.in_([user.id for user in users]))
+                    .values(last_digest_date=today)
+                )
+            processed += len(users)
+            after_id = users[-1].id
+    return processed, sent
+
+
+def digest_for_user(connection, user: User, now: Optional[datetime] = None) -> dict:
+    """Today's digest for one user, whether or not it was sent (GET /api/notifications/digest)"""
+    return build_digests(connection, [user], local_now(user.timezone, now).date())[0]
+
+
+if NOTIFY_SINK:
+    _sink = build_sink()
+
+    @scheduled_job("reminder_digest", DIGEST_SCHEDULE)
+    def reminder_digest() -> str:
+        processed, sent = send_digests(_sink)
+        return f"{sent} digests for {processed} users" if processed else ""
@@ -0,0 +1,173 @@
+"""
+Opt-in sampling profiler for single requests.
+
+An admin adds `?profile=1` to any URL. The request runs normally while a
+background thread samples the stacks of every busy thread in the worker (the
+event loop plus the threadpool threads running auth, the endpoint and response
+validation) every PROFILE_INTERVAL_MS. Other requests handled by the same
+worker at that moment show up too, so profile on a quiet worker. The original response is discarded and replaced by the
+samples in collapsed-stack format ("frame;frame;frame count" per line), which
+flamegraph.pl, inferno and speedscope load directly.
+
+Without the flag the only cost is one substring check on the query string.
+"""
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import parse_qs
+import os
+import sys
+import sysconfig
+import threading
+
+from .auth import ADMIN_USERNAMES
+
+# Time between stack samples
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+
+PROFILE_FLAG = "profile"
+
+# Leaf frames of threads that are waiting rather than working on the request
+IDLE_FRAMES = {("selectors.py", "select"), ("threading.py", "wait")}
+
+_PATH_PREFIXES = sorted(
+    {sysconfig.get_paths()["purelib"], sysconfig.get_paths()["stdlib"], os.path.dirname(os.path.dirname(__file__))},
+    key=len,
+    reverse=True,
+)
+
+
+@lru_cache(maxsize=8192)
+def _frame_label(code) -> str:
+    """Label a frame as "function (path:line)" with site-packages, stdlib and repo prefixes trimmed"""
+    filename = code.co_filename
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):].lstrip(os.sep)
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all other threads from a background thread, skipping idle ones.
+
+    Usage:
+        profiler = SamplingProfiler()
+        profiler.start()
+        ...
+        profiler.stop()
+        print(profiler.collapsed())
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # The sampler needs the GIL to take a sample, and by default a busy thread keeps
+    # it for 5ms, so the switch interval is shortened while any profiler runs
+    _active = 0
+    _active_lock = threading.Lock()
+    _default_switch_interval = sys.getswitchinterval()
+
+    def start(self):
+        with SamplingProfiler._active_lock:
+            if SamplingProfiler._active == 0:
+                SamplingProfiler._default_switch_interval = sys.getswitchinterval()
+            SamplingProfiler._active += 1
+            sys.setswitchinterval(min(sys.getswitchinterval(), self.interval / 2))
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            with SamplingProfiler._active_lock:
+                SamplingProfiler._active -= 1
+                if SamplingProfiler._active == 0:
+                    sys.setswitchinterval(SamplingProfiler._default_switch_interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            own = threading.get_ident()
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.samples.values())
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack format, heaviest stacks first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _profile_requested(scope: Scope) -> bool:
+    query_string = scope.get("query_string", b"")
+    if b"profile=" not in query_string:
+        return False
+    value = parse_qs(query_string.decode("latin-1")).get(PROFILE_FLAG, [""])[-1]
+    return value.lower() in ("1", "true", "yes")
+
+
+class ProfilerMiddleware:
+    """
+    Replace the response with a sampling profile when an admin asks for `?profile=1`.
+
+    Must sit inside the session middleware: admin status comes from the
+    session, so non-admins are refused before any profiling starts.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if scope.get("session", {}).get("username") not in ADMIN_USERNAMES:
+            response = JSONResponse({"detail": "Admin access required"}, status_code=403)
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def discard(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        print(f"[PROFILE] {scope['method']} {scope['path']} -> {status_code}, {profiler.sample_count} samples")
+        response = PlainTextResponse(
+            profiler.collapsed(),
+            headers={
+                "X-Profile-Samples": str(profiler.sample_count),
+                "X-Profile-Interval-Ms": str(profiler.interval * 1000),
+                "X-Profiled-Status": str(status_code),
+                "Content-Disposition": 'inline; filename="profile.folded"',
+            },
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,180 @@
+"""
+SQL statement instrumentation: timing, fingerprints, slow-query and repeated-query logs.
+
+Every statement is timed with engine cursor events and normalized into a
+fingerprint (literals and IN lists collapsed), so "SELECT ... WHERE id = 1"
+and "... WHERE id = 2" count as the same query. Inside a request the timing is
+also added to the request's metrics and tagged with its route and request ID.
+
+Per-fingerprint totals are kept per worker process and exposed through
+GET /api/admin/queries.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from functools import lru_cache
+from typing import Dict, List, Optional
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+
+import orjson
+
+from .metrics import current_request_stats
+
+# Statements slower than this are written to the slow-query log
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# A fingerprint executed more often than this within one request is logged as a likely N+1
+REPEATED_QUERY_THRESHOLD = int(os.getenv("REPEATED_QUERY_THRESHOLD", "20"))
+
+# Cap on distinct fingerprints tracked per process; later ones are folded into one bucket
+MAX_FINGERPRINTS = 2000
+OVERFLOW_FINGERPRINT = "(other)"
+
+# Slow and repeated queries are logged here as one JSON object per line
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+|__\[POSTCOMPILE_\w+\])(?:\s*,\s*(?:\?|%s|:\w+))*\s*\)")
+_POSTCOMPILE = re.compile(r"__\[POSTCOMPILE_\w+\]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """
+    Normalize SQL so statements that differ only in literal values share a fingerprint.
+
+    Usage:
+        fingerprint("SELECT * FROM tasks WHERE id IN (?, ?, ?)")
+        # -> "SELECT * FROM tasks WHERE id IN (...)"
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _POSTCOMPILE.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def fingerprint_id(fp: str) -> str:
+    """Short stable ID for a fingerprint, for log lines and URLs"""
+    return hashlib.blake2b(fp.encode("utf-8"), digest_size=6).hexdigest()
+
+
+class QueryStats:
+    """Running totals for one fingerprint"""
+    __slots__ = ("fingerprint", "count", "total_seconds", "max_seconds", "slow_count", "routes", "last_seen")
+
+    def __init__(self, fp: str):
+        self.fingerprint = fp
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.slow_count = 0
+        self.routes: Dict[str, int] = {}
+        self.last_seen = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "id": fingerprint_id(self.fingerprint),
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "mean_ms": round(self.total_seconds * 1000 / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "slow_count": self.slow_count,
+            "routes": dict(sorted(self.routes.items(), key=lambda item: -item[1])[:5]),
+            "last_seen": self.last_seen,
+        }
+
+
+# Statements run in threadpool threads, so the shared table is guarded by a lock
+_lock = threading.Lock()
+_stats: Dict[str, QueryStats] = {}
+
+
+def _log(kind: str, **fields):
+    slow_query_logger.warning(orjson.dumps({"event": kind, **fields}).decode())
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    record_statement(statement, elapsed, executemany)
+
+
+def record_statement(statement: str, elapsed: float, executemany: bool = False):
+    """Fold one executed statement into the request's metrics and the fingerprint table"""
+    fp = fingerprint(statement)
+    request = current_request_stats.get()
+    route = request.route if request is not None else None
+
+    if request is not None:
+        request.db_statements += 1
+        request.db_seconds += elapsed
+        seen = request.fingerprints.get(fp, 0) + 1
+        request.fingerprints[fp] = seen
+        if seen == REPEATED_QUERY_THRESHOLD + 1:
+            _log(
+                "repeated_query", fingerprint_id=fingerprint_id(fp), fingerprint=fp,
+                route=route, request_id=request.request_id, count=seen
+            )
+
+    slow = elapsed * 1000 >= SLOW_QUERY_MS
+    with _lock:
+        stats = _stats.get(fp)
+        if stats is None:
+            key = fp if len(_stats) < MAX_FINGERPRINTS else OVERFLOW_FINGERPRINT
+            stats = _stats.get(key)
+            if stats is None:
+                stats = _stats[key] = QueryStats(key)
+        stats.count += 1
+        stats.total_seconds += elapsed
+        stats.max_seconds = max(stats.max_seconds, elapsed)
+        stats.last_seen = time.time()
+        if slow:
+            stats.slow_count += 1
+        route_key = route or "(background)"
+        stats.routes[route_key] = stats.routes.get(route_key, 0) + 1
+
+    if slow:
+        _log(
+            "slow_query", duration_ms=round(elapsed * 1000, 3), fingerprint_id=fingerprint_id(fp),
+            fingerprint=fp, executemany=executemany, route=route,
+            request_id=request.request_id if request is not None else None
+        )
+
+
+# Sort keys accepted by top_queries()
+QUERY_ORDERINGS = {
+    "total": lambda stats: stats.total_seconds,
+    "mean": lambda stats: stats.total_seconds / stats.count if stats.count else 0.0,
+    "max": lambda stats: stats.max_seconds,
+    "count": lambda stats: stats.count,
+}
+
+
+def top_queries(limit: int = 20, order: str = "total", route: Optional[str] = None) -> List[dict]:
+    """Return the top fingerprints by the chosen ordering, optionally only those seen on a route"""
+    with _lock:
+        rows = [stats for stats in _stats.values() if route is None or route in stats.routes]
+        rows.sort(key=QUERY_ORDERINGS[order], reverse=True)
+        return [stats.as_dict() for stats in rows[:limit]]
+
+
+def reset_query_stats():
+    """Forget all per-fingerprint totals"""
+    with _lock:
+        _stats.clear()
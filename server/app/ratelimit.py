@@ -0,0 +1,246 @@
+"""Token-bucket rate limiting, applied as a FastAPI dependency before any expensive work"""
+from fastapi import HTTPException, Request, status
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+import math
+import os
+import threading
+import time
+
+from .db import engine
+from .models import RateLimitBucket
+
+# "memory": per-process buckets (each worker enforces its own limit);
+# "db": shared rate_limit_buckets table, so the limit holds across workers
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+
+# Buckets kept per process; the least recently used are forgotten beyond this
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# Login and registration limits: attempts allowed per window (seconds), refilled evenly
+LOGIN_ATTEMPTS_PER_USER_IP = int(os.getenv("LOGIN_ATTEMPTS_PER_USER_IP", "10"))
+LOGIN_ATTEMPTS_PER_IP = int(os.getenv("LOGIN_ATTEMPTS_PER_IP", "50"))
+LOGIN_RATE_WINDOW = int(os.getenv("LOGIN_RATE_WINDOW", "900"))
+REGISTER_ATTEMPTS_PER_IP = int(os.getenv("REGISTER_ATTEMPTS_PER_IP", "10"))
+REGISTER_RATE_WINDOW = 3600
+
+# How often the database backend deletes buckets that have refilled completely (seconds)
+RATE_LIMIT_PURGE_INTERVAL = 3600
+
+
+def spend(full_at: Optional[float], now: float, capacity: int, interval: float):
+    """
+    Take one token from a bucket.
+
+    A bucket is stored as the single moment it will be full again, which
+    makes each key one float and lets the shared backend update it with one
+    conditional UPDATE. `interval` is the time one token takes to refill.
+
+    Returns (new full_at, 0.0) if allowed, or (full_at unchanged, seconds to wait).
+    """
+    new_full_at = max(full_at or now, now) + interval
+    overdraft = new_full_at - now - capacity * interval
+    if overdraft > 1e-9:
+        return full_at, overdraft
+    return new_full_at, 0.0
+
+
+# ==================== BACKENDS ====================
+
+class MemoryBucketBackend:
+    """Buckets in an LRU dict: O(1) per key, bounded by max_keys"""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, capacity: int, interval: float, now: float) -> float:
+        with self._lock:
+            full_at, retry_after = spend(self._buckets.get(key), now, capacity, interval)
+            self._buckets[key] = full_at
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                # An evicted bucket starts over full; only the least recently used go
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def reset(self, key: str):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class DatabaseBucketBackend:
+    """Buckets in the rate_limit_buckets table, shared by every worker on the database"""
+
+    blocking = True
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.table = RateLimitBucket.__table__
+        self._last_purge = 0.0
+
+    def hit(self, key: str, capacity: int, interval: float, now: float) -> float:
+        table = self.table
+        base = case((table.c.full_at > now, table.c.full_at), else_=now)
+        # Allowed iff the bucket has a token left: spend it in the same statement
+        take = (
+            update(table)
+            .where(table.c.key == key, base + interval - now <= capacity * interval + 1e-9)
+            .values(full_at=base + interval)
+        )
+        self._maybe_purge(now)
+        with self.engine.begin() as connection:
+            if connection.execute(take).rowcount:
+                return 0.0
+            full_at = connection.execute(select(table.c.full_at).where(table.c.key == key)).scalar()
+        if full_at is not None:
+            return spend(full_at, now, capacity, interval)[1]
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(insert(table).values(key=key, full_at=now + interval))
+            return 0.0
+        except IntegrityError:
+            # Another worker created it first; go round again against its row
+            return self.hit(key, capacity, interval, now)
+
+    def reset(self, key: str):
+        with self.engine.begin() as connection:
+            connection.execute(delete(self.table).where(self.table.c.key == key))
+
+    def _maybe_purge(self, now: float):
+        if now - self._last_purge < RATE_LIMIT_PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        with self.engine.begin() as connection:
+            connection.execute(delete(self.table).where(self.table.c.full_at < now))
+
+
+def build_backend(name: str = RATE_LIMIT_BACKEND):
+    """The backend selected by RATE_LIMIT_BACKEND"""
+    if name == "memory":
+        return MemoryBucketBackend()
+    if name == "db":
+        return DatabaseBucketBackend(engine)
+    raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND {name!r} (expected memory or db)")
+
+
+class RateLimiter:
+    """
+    Front for a bucket backend.
+
+    Keys found empty are remembered locally until they could next succeed, so
+    a flood against one key is turned away without touching a shared backend.
+    """
+
+    def __init__(self, backend, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.backend = backend
+        self.max_keys = max_keys
+        self._blocked: "OrderedDict[str, float]" = OrderedDict()  # key -> time.time() it may retry
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, capacity: int, interval: float) -> float:
+        """Spend one token for `key`; returns 0 if allowed, else seconds until it would be"""
+        now = time.time()
+        blocked_until = self._blocked.get(key)
+        if blocked_until is not None and now < blocked_until:
+            return blocked_until - now
+
+        if self.backend.blocking:
+            retry_after = await run_in_threadpool(self.backend.hit, key, capacity, interval, now)
+        else:
+            retry_after = self.backend.hit(key, capacity, interval, now)
+
+        if retry_after:
+            # Reached at most once per blocked period per key and process
+            print(f"[RATE LIMIT] {key} blocked for {retry_after:.0f}s")
+            with self._lock:
+                self._blocked[key] = now + retry_after
+                self._blocked.move_to_end(key)
+                if len(self._blocked) > self.max_keys:
+                    self._blocked.popitem(last=False)
+        elif blocked_until is not None:
+            with self._lock:
+                self._blocked.pop(key, None)
+        return retry_after
+
+    def reset(self, key: str):
+        """Forget a key's history (blocking with the db backend)"""
+        with self._lock:
+            self._blocked.pop(key, None)
+        self.backend.reset(key)
+
+
+rate_limiter = RateLimiter(build_backend())
+
+
+# ==================== DEPENDENCY ====================
+
+async def client_ip(request: Request) -> Optional[str]:
+    """
+    The client address as the server sees it.
+
+    Behind a proxy, set FORWARDED_ALLOW_IPS so uvicorn takes it from
+    X-Forwarded-For; the header is not trusted here.
+    """
+    return request.client.host if request.client else "unknown"
+
+
+async def username_and_client_ip(request: Request) -> Optional[str]:
+    """The username from a JSON login body, with the client address"""
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None
+    username = body.get("username") if isinstance(body, dict) else None
+    if not isinstance(username, str):
+        # Fails validation anyway, before any password work
+        return None
+    # Usernames are at most 50 characters; case variants share a bucket
+    return f"{username.strip().lower()[:50]}|{await client_ip(request)}"
+
+
+class RateLimit:
+    """
+    Token-bucket limit as a FastAPI dependency: `attempts` per `window` seconds,
+    refilled evenly, with bursts of up to `attempts`.
+
+    Runs before the endpoint body, so rejected requests cost no password
+    hashing or queries. Usable on one route or a whole router:
+
+        @router.post("/login", dependencies=[Depends(RateLimit("login", 10, 900, key=username_and_client_ip))])
+        router = APIRouter(dependencies=[Depends(RateLimit("export", 30, 3600))])
+
+    `key` returns the bucket key for a request (None skips the limit).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        attempts: int,
+        window: float,
+        key: Callable[[Request], Awaitable[Optional[str]]] = client_ip,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        self.name = name
+        self.capacity = attempts
+        self.interval = window / attempts
+        self.key = key
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, request: Request):
+        key = await self.key(request)
+        if key is None:
+            return
+        retry_after = await self.limiter.hit(f"{self.name}:{key}", self.capacity, self.interval)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
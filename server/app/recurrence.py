@@ -0,0 +1,483 @@
+"""
+Recurring tasks: an RRULE subset, occurrence expansion and bounded materialization.
+
+A series is a Task with a `recurrence` rule; its due_date is the first day
+(DTSTART). Occurrences are ordinary tasks with `recurrence_id` pointing at the
+series, created only up to RECURRENCE_WINDOW_DAYS ahead. The series records
+how far it got in `materialized_until`, so extending it is a matter of
+creating the days past that mark:
+
+- lazily, before GET /api/tasks/ computes its ETag (materialize_tasks)
+- in the background, once per RECURRENCE_ROLL_INTERVAL (the recurrence_roll
+  scheduled job, see scheduler.py)
+
+Each extension is claimed with a conditional UPDATE on materialized_until,
+so a background roll and requests listing tasks at the same time never
+create the same day twice.
+
+Occurrences are created and removed with Core statements, which skip the ORM
+flush hooks in changes.py and etags.py, so this module writes their
+tombstones and bumps the task list ETags itself.
+"""
+from fastapi import Depends
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlmodel import Session
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, NamedTuple, Optional, Set, Tuple
+import calendar
+import os
+import re
+
+from .db import engine, get_session
+from .models import Task, TaskStatus, Tombstone, User
+from .auth import get_current_user
+from .etags import bump_resource_versions
+from .scheduler import scheduled_job
+
+# Occurrences exist from today up to this many days ahead
+RECURRENCE_WINDOW_DAYS = int(os.getenv("RECURRENCE_WINDOW_DAYS", "60"))
+
+# How often the recurrence_roll job extends every series as the window moves (seconds, 0 = only lazily)
+RECURRENCE_ROLL_INTERVAL = int(os.getenv("RECURRENCE_ROLL_INTERVAL", "3600"))
+
+# Series extended per transaction by the background roller
+RECURRENCE_ROLL_BATCH = 500
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+MAX_INTERVAL = 1000
+MAX_COUNT = 10000
+
+_BYDAY = re.compile(r"^([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)$")
+
+
+# ==================== RULES ====================
+
+class RecurrenceRule(NamedTuple):
+    """A parsed RRULE; by_day holds (ordinal, weekday) with ordinal 0 meaning every such weekday"""
+    freq: str
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[date] = None
+    by_day: Tuple[Tuple[int, int], ...] = ()
+    by_month_day: Tuple[int, ...] = ()
+    by_month: Tuple[int, ...] = ()
+
+
+def _int_list(value: str, low: int, high: int, name: str, signed: bool = False) -> Tuple[int, ...]:
+    """Comma-separated numbers within low..high (or -high..-low when signed)"""
+    try:
+        numbers = tuple(int(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError(f"{name} must be a comma-separated list of numbers") from None
+    if any(not low <= (abs(number) if signed else number) <= high for number in numbers):
+        allowed = f"{low}..{high} or -{high}..-{low}" if signed else f"{low}..{high}"
+        raise ValueError(f"{name} values must be within {allowed}")
+    return numbers
+
+
+def parse_rrule(text: str) -> RecurrenceRule:
+    """
+    Parse an RFC 5545 recurrence rule, e.g. "FREQ=WEEKLY;BYDAY=MO,TH" or "RRULE:FREQ=MONTHLY;BYMONTHDAY=-1".
+
+    Supported parts:
+    - **FREQ**: DAILY, WEEKLY, MONTHLY or YEARLY (required)
+    - **INTERVAL**: Every n-th period
+    - **COUNT** / **UNTIL**: Stop after n occurrences, or after a date (YYYYMMDD); not both
+    - **BYDAY**: Weekdays (MO..SU); under MONTHLY/YEARLY also n-th ones such as 2TU or -1FR
+    - **BYMONTHDAY**: Days of the month, negative from the end (MONTHLY, YEARLY)
+    - **BYMONTH**: Months (YEARLY)
+
+    Raises ValueError for anything else.
+    """
+    body = text.strip().upper()
+    if body.startswith("RRULE:"):
+        body = body[len("RRULE:"):]
+    parts = {}
+    for part in filter(None, body.split(";")):
+        key, sep, value = part.partition("=")
+        if not sep or not value:
+            raise ValueError(f"Malformed rule part '{part}'")
+        if key in parts:
+            raise ValueError(f"{key} given twice")
+        parts[key] = value
+
+    freq = parts.pop("FREQ", None)
+    if freq not in FREQUENCIES:
+        raise ValueError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+
+    interval = 1
+    if "INTERVAL" in parts:
+        interval = _int_list(parts.pop("INTERVAL"), 1, MAX_INTERVAL, "INTERVAL")[0]
+
+    count = None
+    if "COUNT" in parts:
+        count = _int_list(parts.pop("COUNT"), 1, MAX_COUNT, "COUNT")[0]
+
+    until = None
+    if "UNTIL" in parts:
+        value = parts.pop("UNTIL")
+        try:
+            until = datetime.strptime(value[:8], "%Y%m%d").date()
+        except ValueError:
+            raise ValueError("UNTIL must be a date such as 20261231") from None
+    if count is not None and until is not None:
+        raise ValueError("COUNT and UNTIL cannot both be given")
+
+    by_day = []
+    for item in filter(None, parts.pop("BYDAY", "").split(",")):
+        match = _BYDAY.match(item)
+        if not match:
+            raise ValueError(f"Unknown BYDAY value '{item}'")
+        ordinal = int(match.group(1) or 0)
+        if ordinal and (freq not in ("MONTHLY", "YEARLY") or not 1 <= abs(ordinal) <= 5):
+            raise ValueError("Numbered BYDAY values (1..5 or -5..-1) need FREQ=MONTHLY or YEARLY")
+        by_day.append((ordinal, WEEKDAYS.index(match.group(2))))
+
+    by_month_day = ()
+    if "BYMONTHDAY" in parts:
+        if freq not in ("MONTHLY", "YEARLY"):
+            raise ValueError("BYMONTHDAY needs FREQ=MONTHLY or YEARLY")
+        by_month_day = _int_list(parts.pop("BYMONTHDAY"), 1, 31, "BYMONTHDAY", signed=True)
+
+    by_month = ()
+    if "BYMONTH" in parts:
+        if freq != "YEARLY":
+            raise ValueError("BYMONTH needs FREQ=YEARLY")
+        by_month = _int_list(parts.pop("BYMONTH"), 1, 12, "BYMONTH")
+
+    if freq == "YEARLY" and by_day and not by_month:
+        raise ValueError("BYDAY under FREQ=YEARLY needs BYMONTH")
+    if parts:
+        raise ValueError(f"Unsupported rule part(s): {', '.join(sorted(parts))}")
+
+    return RecurrenceRule(
+        freq=freq, interval=interval, count=count, until=until,
+        by_day=tuple(by_day), by_month_day=by_month_day, by_month=tuple(sorted(set(by_month))),
+    )
+
+
+def normalize_rrule(text: str) -> str:
+    """The rule as stored: validated, upper-case, without an RRULE: prefix; raises ValueError"""
+    parse_rrule(text)
+    body = text.strip().upper()
+    return body[len("RRULE:"):] if body.startswith("RRULE:") else body
+
+
+def _month_days(rule: RecurrenceRule, year: int, month: int, dtstart: date) -> List[date]:
+    """Days of one month the rule picks (BYMONTHDAY and BYDAY intersect when both are given)"""
+    length = calendar.monthrange(year, month)[1]
+    picked = None
+    if rule.by_month_day:
+        picked = {day if day > 0 else length + day + 1 for day in rule.by_month_day}
+    if rule.by_day:
+        by_day = set()
+        for ordinal, weekday in rule.by_day:
+            first = (weekday - calendar.weekday(year, month, 1)) % 7 + 1
+            matching = list(range(first, length + 1, 7))
+            position = ordinal - 1 if ordinal > 0 else ordinal
+            if ordinal == 0:
+                by_day.update(matching)
+            elif -len(matching) <= position < len(matching):
+                by_day.add(matching[position])
+        picked = by_day if picked is None else picked & by_day
+    if picked is None:
+        # Like DTSTART's day; months too short for it are skipped, as RFC 5545 does
+        picked = {dtstart.day}
+    return [date(year, month, day) for day in sorted(picked) if 1 <= day <= length]
+
+
+def _period(rule: RecurrenceRule, dtstart: date, index: int) -> Tuple[date, List[date]]:
+    """(first day, candidate days) of the index-th period counted from DTSTART's"""
+    step = rule.interval * index
+    if rule.freq == "DAILY":
+        day = dtstart + timedelta(days=step)
+        weekdays = {weekday for _, weekday in rule.by_day}
+        return day, [day] if not weekdays or day.weekday() in weekdays else []
+    if rule.freq == "WEEKLY":
+        monday = dtstart - timedelta(days=dtstart.weekday()) + timedelta(weeks=step)
+        weekdays = sorted({weekday for _, weekday in rule.by_day}) or [dtstart.weekday()]
+        # date.max is a Friday, so the last week can be cut short
+        return monday, [monday + timedelta(days=weekday) for weekday in weekdays if weekday <= (date.max - monday).days]
+    if rule.freq == "MONTHLY":
+        year, month = divmod(dtstart.year * 12 + dtstart.month - 1 + step, 12)
+        return date(year, month + 1, 1), _month_days(rule, year, month + 1, dtstart)
+    year = dtstart.year + step
+    return date(year, 1, 1), [
+        day for month in (rule.by_month or (dtstart.month,)) for day in _month_days(rule, year, month, dtstart)
+    ]
+
+
+def _first_period(rule: RecurrenceRule, dtstart: date, start: date) -> int:
+    """Index of the period containing `start` (or 0), so expansion can skip what lies before it"""
+    if start <= dtstart:
+        return 0
+    if rule.freq == "DAILY":
+        elapsed = (start - dtstart).days
+    elif rule.freq == "WEEKLY":
+        elapsed = (start - (dtstart - timedelta(days=dtstart.weekday()))).days // 7
+    elif rule.freq == "MONTHLY":
+        elapsed = (start.year * 12 + start.month) - (dtstart.year * 12 + dtstart.month)
+    else:
+        elapsed = start.year - dtstart.year
+    return elapsed // rule.interval
+
+
+def occurrences(rule: RecurrenceRule, dtstart: date, start: date, end: date) -> Iterator[date]:
+    """
+    Days from `start` to `end` (inclusive) on which the series falls.
+
+    Only periods overlapping the range are visited, except with COUNT, which
+    has to count from DTSTART. Expansion stops at date.max.
+    """
+    last = min(end, rule.until) if rule.until else end
+    index = 0 if rule.count else _first_period(rule, dtstart, start)
+    seen = 0
+    while True:
+        try:
+            first_day, days = _period(rule, dtstart, index)
+        except (OverflowError, ValueError):
+            # The period would start after 9999-12-31
+            return
+        if first_day > last:
+            return
+        for day in days:
+            if day < dtstart:
+                continue
+            if day > last:
+                return
+            seen += 1
+            if rule.count and seen > rule.count:
+                return
+            if day >= start:
+                yield day
+        index += 1
+
+
+# ==================== MATERIALIZATION ====================
+
+def _due_series(session: Session, horizon: date, user_id: Optional[int] = None, limit: Optional[int] = None):
+    """Series that are new, edited, or short of the horizon"""
+    statement = select(
+        Task.id, Task.user_id, Task.area_id, Task.title, Task.description, Task.priority, Task.contact_id,
+        Task.status, Task.recurrence, Task.due_date, Task.created_at, Task.materialized_until,
+    ).where(
+        Task.recurrence.is_not(None),
+        or_(
+            Task.materialized_until.is_(None),
+            and_(Task.status != TaskStatus.DONE, Task.materialized_until < horizon),
+        ),
+    )
+    if user_id is not None:
+        statement = statement.where(Task.user_id == user_id)
+    if limit is not None:
+        statement = statement.order_by(Task.id).limit(limit)
+    return session.execute(statement).all()
+
+
+def _delete_untouched(executor, series_id: int, today: date) -> Set[int]:
+    """
+    Delete a series' upcoming occurrences nobody has touched and leave tombstones for them.
+
+    Returns the deleted ids. `executor` is a Connection or Session.
+    """
+    table = Task.__table__
+    deleted = executor.execute(
+        delete(table)
+        .where(
+            table.c.recurrence_id == series_id,
+            table.c.due_date >= today,
+            table.c.status == TaskStatus.TODO,
+            table.c.version == 1,
+        )
+        .returning(table.c.id, table.c.user_id)
+    ).all()
+    if deleted:
+        now = datetime.utcnow()
+        executor.execute(insert(Tombstone.__table__), [
+            {"user_id": row.user_id, "resource": "tasks", "row_id": row.id, "deleted_at": now} for row in deleted
+        ])
+    return {row.id for row in deleted}
+
+
+def _extend(connection, series, today: date, horizon: date) -> Optional[int]:
+    """
+    Create one series' occurrences up to the horizon.
+
+    Returns how many rows were created, or None if another worker claimed
+    the same extension first. A series with materialized_until NULL (new or
+    edited) first loses its upcoming occurrences nobody has touched yet, and
+    is rebuilt from today.
+    """
+    table = Task.__table__
+    rebuild = series.materialized_until is None
+    claimed = connection.execute(
+        update(table)
+        .where(
+            table.c.id == series.id,
+            table.c.materialized_until.is_(None) if rebuild else table.c.materialized_until == series.materialized_until,
+        )
+        .values(materialized_until=horizon)
+    ).rowcount
+    if not claimed:
+        return None
+
+    dtstart = series.due_date or series.created_at.date()
+    if rebuild:
+        _delete_untouched(connection, series.id, today)
+        start = max(dtstart, today)
+    else:
+        start = series.materialized_until + timedelta(days=1)
+    if series.status == TaskStatus.DONE:
+        return 0
+
+    try:
+        rule = parse_rrule(series.recurrence)
+    except ValueError as e:
+        # Written around the API (an import, a manual edit); left without occurrences
+        print(f"[RECURRENCE] Task {series.id} has an invalid rule: {e}")
+        return 0
+    days = list(occurrences(rule, dtstart, start, horizon))
+    if rebuild and days:
+        kept = set(connection.execute(
+            select(table.c.due_date).where(table.c.recurrence_id == series.id, table.c.due_date >= start)
+        ).scalars())
+        days = [day for day in days if day not in kept]
+    if days:
+        now = datetime.utcnow()
+        connection.execute(insert(table), [
+            {
+                "user_id": series.user_id, "area_id": series.area_id, "title": series.title,
+                "description": series.description, "status": TaskStatus.TODO, "priority": series.priority,
+                "due_date": day, "contact_id": series.contact_id, "recurrence_id": series.id,
+                "created_at": now, "updated_at": now, "version": 1,
+            }
+            for day in days
+        ])
+    return len(days)
+
+
+def materialize(
+    session: Session,
+    user_id: Optional[int] = None,
+    today: Optional[date] = None,
+    window_days: int = RECURRENCE_WINDOW_DAYS,
+    limit: Optional[int] = None,
+) -> Tuple[int, int]:
+    """
+    Bring series (one user's, or everyone's) up to today + window_days and commit.
+
+    Returns (series claimed, occurrences created). Costs one indexed SELECT
+    when every series is already current.
+    """
+    today = today or date.today()
+    horizon = today + timedelta(days=window_days)
+    due = _due_series(session, horizon, user_id, limit)
+    if not due:
+        return 0, 0
+
+    connection = session.connection()
+    claimed = created = 0
+    touched = set()
+    for series in due:
+        count = _extend(connection, series, today, horizon)
+        if count is None:
+            continue
+        claimed += 1
+        created += count
+        touched.add((series.user_id, "tasks"))
+    # Core statements skip the ORM flush hooks, so list ETags are bumped here
+    bump_resource_versions(session, touched)
+    session.commit()
+    return claimed, created
+
+
+def drop_upcoming(session: Session, series_id: int, today: Optional[date] = None) -> Set[int]:
+    """
+    Detach a series' occurrences when it is deleted or stops recurring.
+
+    Upcoming ones nobody has touched are removed (with tombstones); the rest
+    stay as plain tasks. Returns the removed ids. Does not commit.
+    """
+    table = Task.__table__
+    removed = _delete_untouched(session, series_id, today or date.today())
+    # updated_at moves so delta sync re-sends them; version stays, so loaded copies can still be written
+    session.execute(
+        update(table).where(table.c.recurrence_id == series_id).values(recurrence_id=None, updated_at=datetime.utcnow())
+    )
+    return removed
+
+
+# ==================== TASK WRITES ====================
+
+def series_start(due_date: Optional[date], recurrence: Optional[str]) -> Optional[date]:
+    """A task's due date; a series without one starts today (its DTSTART)"""
+    return due_date or (date.today() if recurrence else None)
+
+
+def prepare_task_create(data: dict) -> dict:
+    """A task create payload with the series defaults applied (POST /api/tasks/ and the batch endpoint)"""
+    return {**data, "due_date": series_start(data.get("due_date"), data.get("recurrence"))}
+
+
+def materialize_written(session: Session, user_id: int, tasks: List[Task]):
+    """Create the occurrences of series just created or edited, rather than on the next list; commits"""
+    if any(task.recurrence is not None for task in tasks):
+        materialize(session, user_id=user_id)
+
+
+def task_update_error(task: Task, update_data: dict) -> Optional[str]:
+    """Why an update cannot be applied to a task, if it cannot (PUT /api/tasks/{id} and the batch endpoint)"""
+    if update_data.get("recurrence") and task.recurrence_id is not None:
+        return "An occurrence cannot recur; edit its series instead"
+    return None
+
+
+def apply_task_update(session: Session, task: Task, update_data: dict):
+    """
+    Set updated fields on a task, keeping its series consistent.
+
+    A series needs a start date; one that stops recurring drops its upcoming
+    occurrences. Does not commit.
+    """
+    was_series = task.recurrence is not None
+    for key, value in update_data.items():
+        setattr(task, key, value)
+    task.due_date = series_start(task.due_date, task.recurrence)
+    if was_series and task.recurrence is None:
+        drop_upcoming(session, task.id)
+
+
+def before_task_delete(session: Session, task: Task) -> Set[int]:
+    """Detach a series' occurrences before the series is deleted; returns occurrence ids removed with it"""
+    if task.recurrence is None:
+        return set()
+    return drop_upcoming(session, task.id)
+
+
+def materialize_tasks(session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+    """
+    Dependency that extends the user's series before a task list is served.
+
+    Listed ahead of conditional_get("tasks"), so new occurrences change the ETag
+    instead of hiding behind a 304.
+    """
+    materialize(session, user_id=current_user.id)
+
+
+# ==================== BACKGROUND ROLLER ====================
+
+def roll_all(window_days: int = RECURRENCE_WINDOW_DAYS) -> int:
+    """Extend every user's series in batches; returns occurrences created"""
+    total = 0
+    with Session(engine) as session:
+        while True:
+            claimed, created = materialize(session, window_days=window_days, limit=RECURRENCE_ROLL_BATCH)
+            total += created
+            # Fewer than a batch, or only series concurrent requests had already claimed: done
+            if claimed < RECURRENCE_ROLL_BATCH:
+                return total
+
+
+if RECURRENCE_ROLL_INTERVAL > 0:
+    scheduled_job("recurrence_roll", f"@every {RECURRENCE_ROLL_INTERVAL}")(roll_all)
@@ -0,0 +1,72 @@
+"""Admin-only diagnostics endpoints"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session, select
+from typing import Optional
+
+from ..auth import get_admin_user
+from ..db import get_session
+from ..models import ScheduledJob, User
+from ..querylog import QUERY_ORDERINGS, SLOW_QUERY_MS, reset_query_stats, top_queries
+from ..scheduler import JOBS, WORKER_ID, run_now
+
+router = APIRouter()
+
+
+@router.get("/queries")
+def list_top_queries(
+    limit: int = Query(20, ge=1, le=500, description="Number of fingerprints to return"),
+    order: str = Query("total", pattern=f"^({'|'.join(QUERY_ORDERINGS)})$", description="total, mean, max, or count"),
+    route: Optional[str] = Query(None, description="Only fingerprints seen on this route template"),
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Top SQL fingerprints for this worker process since start (or the last reset).
+
+    - **limit**: How many fingerprints to return
+    - **order**: Sort by total time, mean time, max time, or execution count
+    - **route**: Filter to a route template, e.g. `/api/entries/`
+
+    Each row has count, total/mean/max milliseconds, how many runs exceeded the
+    slow-query threshold and the routes that issued it most.
+    """
+    return {
+        "slow_query_ms": SLOW_QUERY_MS,
+        "queries": top_queries(limit=limit, order=order, route=route),
+    }
+
+
+@router.delete("/queries", status_code=status.HTTP_204_NO_CONTENT)
+def clear_query_stats(admin: User = Depends(get_admin_user)):
+    """Reset the per-fingerprint totals for this worker process"""
+    reset_query_stats()
+    return None
+
+
+@router.get("/jobs")
+def list_scheduled_jobs(
+    session: Session = Depends(get_session),
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Scheduled background jobs as recorded in the database (shared by all workers).
+
+    Each job has its schedule, next run, the worker holding its lease while it
+    runs, and the last run's status, error and duration. `registered` is false
+    for rows left by jobs this version no longer defines.
+    """
+    jobs = session.exec(select(ScheduledJob).order_by(ScheduledJob.name)).all()
+    return {
+        "worker": WORKER_ID,
+        "jobs": [dict(job.model_dump(), registered=job.name in JOBS) for job in jobs],
+    }
+
+
+@router.post("/jobs/{name}/run", status_code=status.HTTP_202_ACCEPTED)
+def run_scheduled_job(name: str, admin: User = Depends(get_admin_user)):
+    """Make a job due now; the first worker to poll runs it (within SCHEDULER_POLL_SECONDS)"""
+    if name not in JOBS or not run_now(name):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scheduled job not found"
+        )
+    return {"name": name, "status": "queued"}
@@ -0,0 +1,203 @@
+"""Agenda endpoint: dated tasks, goals and liabilities merged into one timeline"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select
+from typing import Iterator, List, Optional
+from datetime import date, timedelta
+import heapq
+
+import orjson
+
+from ..db import engine, get_session
+from ..schemas import AgendaResponse, AgendaItemType
+from ..models import User, Task, Goal, FinancialAccount, TaskStatus, GoalStatus, FinancialAccountType
+from ..auth import get_current_user
+from ..fastjson import area_lookup
+from ..recurrence import materialize_tasks, occurrences, parse_rrule
+
+router = APIRouter()
+
+# Range used when `to` is omitted
+AGENDA_DEFAULT_DAYS = 30
+
+# Longest range served as one JSON document; longer ones need stream=true
+AGENDA_MAX_DAYS = 366
+
+# Rows fetched per round trip, and NDJSON lines per streamed chunk
+AGENDA_BATCH_SIZE = 500
+
+# Order of items sharing a date
+_TYPE_ORDER = {AgendaItemType.TASK: 0, AgendaItemType.GOAL: 1, AgendaItemType.LIABILITY: 2}
+
+
+def _item(due_date: date, item_type: AgendaItemType, item_id: int, title: str, **fields) -> dict:
+    item = {
+        "due_date": due_date, "type": item_type, "id": item_id, "title": title, "status": None, "area": None,
+        "priority": None, "progress_percentage": None, "current_balance": None, "series_id": None, "projected": False,
+    }
+    item.update(fields)
+    return item
+
+
+def _rows(session: Session, statement) -> Iterator:
+    """Stream a range query in batches (server-side cursor where the driver has one)"""
+    return iter(session.execute(statement.execution_options(yield_per=AGENDA_BATCH_SIZE)))
+
+
+def _task_items(session: Session, user_id: int, start: date, end: date, include_done: bool) -> Iterator[dict]:
+    statement = (
+        select(Task.id, Task.title, Task.status, Task.priority, Task.area_id, Task.due_date, Task.recurrence_id)
+        .where(Task.user_id == user_id, Task.due_date >= start, Task.due_date <= end, Task.recurrence.is_(None))
+        .order_by(Task.due_date, Task.id)
+    )
+    if not include_done:
+        statement = statement.where(Task.status != TaskStatus.DONE)
+    areas = area_lookup(session)
+    for row in _rows(session, statement):
+        yield _item(
+            row.due_date, AgendaItemType.TASK, row.id, row.title, status=row.status, priority=row.priority,
+            area=areas.get(row.area_id), series_id=row.recurrence_id,
+        )
+
+
+def _projected_items(session: Session, user_id: int, start: date, end: date) -> List[Iterator[dict]]:
+    """
+    Occurrences of recurring series past their materialized window, one sorted stream per series.
+
+    Computed from the rule, so long ranges cost no rows.
+    """
+    series_rows = session.execute(
+        select(
+            Task.id, Task.title, Task.priority, Task.area_id, Task.recurrence, Task.due_date, Task.created_at,
+            Task.materialized_until,
+        ).where(Task.user_id == user_id, Task.recurrence.is_not(None), Task.status != TaskStatus.DONE)
+    ).all()
+    areas = area_lookup(session)
+
+    def project(series, rule, first: date) -> Iterator[dict]:
+        for day in occurrences(rule, series.due_date or series.created_at.date(), first, end):
+            yield _item(
+                day, AgendaItemType.TASK, series.id, series.title, status=TaskStatus.TODO, priority=series.priority,
+                area=areas.get(series.area_id), series_id=series.id, projected=True,
+            )
+
+    streams = []
+    for series in series_rows:
+        first = max(start, series.materialized_until + timedelta(days=1)) if series.materialized_until else start
+        if first > end:
+            continue
+        try:
+            rule = parse_rrule(series.recurrence)
+        except ValueError:
+            continue
+        streams.append(project(series, rule, first))
+    return streams
+
+
+def _goal_items(session: Session, user_id: int, start: date, end: date, include_done: bool) -> Iterator[dict]:
+    statement = (
+        select(Goal.id, Goal.title, Goal.status, Goal.progress_percentage, Goal.due_date)
+        .where(Goal.user_id == user_id, Goal.due_date >= start, Goal.due_date <= end)
+        .order_by(Goal.due_date, Goal.id)
+    )
+    if not include_done:
+        statement = statement.where(Goal.status.not_in([GoalStatus.COMPLETED, GoalStatus.ABANDONED]))
+    for row in _rows(session, statement):
+        yield _item(
+            row.due_date, AgendaItemType.GOAL, row.id, row.title, status=row.status,
+            progress_percentage=row.progress_percentage,
+        )
+
+
+def _liability_items(session: Session, user_id: int, start: date, end: date) -> Iterator[dict]:
+    statement = (
+        select(FinancialAccount.id, FinancialAccount.name, FinancialAccount.current_balance, FinancialAccount.due_date)
+        .where(
+            FinancialAccount.user_id == user_id,
+            FinancialAccount.due_date >= start,
+            FinancialAccount.due_date <= end,
+            FinancialAccount.account_type == FinancialAccountType.LIABILITY,
+        )
+        .order_by(FinancialAccount.due_date, FinancialAccount.id)
+    )
+    for row in _rows(session, statement):
+        yield _item(row.due_date, AgendaItemType.LIABILITY, row.id, row.name, current_balance=row.current_balance)
+
+
+def iter_agenda(session: Session, user_id: int, start: date, end: date, include_done: bool = False) -> Iterator[dict]:
+    """
+    Every dated item from `start` to `end`, in date order.
+
+    Each source is one range query over its (user_id, due_date) index, already
+    sorted, so the streams are combined with a k-way merge and nothing is
+    sorted or held in memory as a whole.
+    """
+    streams = [
+        _task_items(session, user_id, start, end, include_done),
+        _goal_items(session, user_id, start, end, include_done),
+        _liability_items(session, user_id, start, end),
+    ]
+    streams.extend(_projected_items(session, user_id, start, end))
+    return heapq.merge(*streams, key=lambda item: (item["due_date"], _TYPE_ORDER[item["type"]], item["id"]))
+
+
+def ndjson_agenda(user_id: int, start: date, end: date, include_done: bool) -> Iterator[bytes]:
+    """Yield the agenda as NDJSON, one item per line, in chunks"""
+    with Session(engine) as session:
+        chunk = []
+        for item in iter_agenda(session, user_id, start, end, include_done):
+            chunk.append(orjson.dumps(item))
+            if len(chunk) >= AGENDA_BATCH_SIZE:
+                yield b"\n".join(chunk) + b"\n"
+                chunk = []
+        if chunk:
+            yield b"\n".join(chunk) + b"\n"
+
+
+@router.get("/", response_model=AgendaResponse, dependencies=[Depends(materialize_tasks)])
+def get_agenda(
+    start_date: Optional[date] = Query(None, alias="from", description="First day to include (default: today)"),
+    end_date: Optional[date] = Query(None, alias="to", description=f"Last day to include (default: {AGENDA_DEFAULT_DAYS} days from `from`)"),
+    include_done: bool = Query(False, description="Also list done tasks and completed or abandoned goals"),
+    stream: bool = Query(False, description="Stream NDJSON (one item per line) instead of one JSON document"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upcoming tasks, goals and liabilities with a due date in the range, ordered by date.
+
+    - **from** / **to**: Inclusive date range (YYYY-MM-DD)
+    - **include_done**: Include finished tasks and goals
+    - **stream**: Return `application/x-ndjson` for long ranges; memory use stays
+      flat however many items there are. JSON responses cover at most a
+      year (AGENDA_MAX_DAYS).
+
+    Recurring tasks appear as their occurrences; ones beyond the created
+    window are computed from the rule and marked `projected`.
+    """
+    start_date = start_date or date.today()
+    end_date = end_date or start_date + timedelta(days=min(AGENDA_DEFAULT_DAYS - 1, (date.max - start_date).days))
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'"
+        )
+
+    if stream:
+        return StreamingResponse(
+            ndjson_agenda(current_user.id, start_date, end_date, include_done),
+            media_type="application/x-ndjson"
+        )
+
+    if (end_date - start_date).days >= AGENDA_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ranges longer than {AGENDA_MAX_DAYS} days need stream=true"
+        )
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "items": list(iter_agenda(session, current_user.id, start_date, end_date, include_done)),
+    }
+
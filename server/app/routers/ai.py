@@ -1,52 +1,54 @@
-"""AI-generated content endpoints (stubbed for MVP)"""
-from fastapi import APIRouter, Query
+"""AI-generated content endpoints (provider, cache and static fallback in ai_client.py)"""
+from fastapi import APIRouter, Query, Request
 from datetime import datetime
 
 from ..schemas import AIVerseResponse, AIInsightResponse
-from ..ai_stub import generate_bible_verse, generate_insight
+from ..ai_client import ai_client
 
 router = APIRouter()
 
 
 @router.get("/verse", response_model=AIVerseResponse)
-def get_bible_verse(
+async def get_bible_verse(
     area: str = Query(..., description="Life area name (e.g., 'physical_health', 'spiritual')")
 ):
     """
     Get AI-generated Bible verse for a life area.
 
-    **Note:** In MVP, this returns static placeholder content.
-    In Phase 2, this will call an AI API to generate dynamic verses.
+    Answers from the cache when it can; a provider that does not answer within
+    AI_TIMEOUT_SECONDS gets the static verse instead (source="fallback").
 
     - **area**: One of the 8 life area names
     """
-    verse_data = generate_bible_verse(area)
+    verse_data, source = await ai_client.verse(area)
 
     return AIVerseResponse(
         reference=verse_data["reference"],
         text=verse_data["text"],
         area=area,
-        generated_at=datetime.utcnow()
+        generated_at=datetime.utcnow(),
+        source=source
     )
 
 
 @router.get("/insight", response_model=AIInsightResponse)
-def get_insight(
+async def get_insight(
+    request: Request,
     area: str = Query(..., description="Life area name (e.g., 'physical_health', 'spiritual')")
 ):
     """
     Get AI-generated insight/tip for a life area.
 
-    **Note:** In MVP, this returns static placeholder content.
-    In Phase 2, this will call an AI API to generate personalized insights
-    based on user data and goals.
+    When logged in, the insight is based on your goals, habits and tasks in
+    that area. Falls back to a static tip like /verse.
 
     - **area**: One of the 8 life area names
     """
-    insight_text = generate_insight(area)
+    insight_text, source = await ai_client.insight(area, request.session.get("user_id"))
 
     return AIInsightResponse(
         insight=insight_text,
         area=area,
-        generated_at=datetime.utcnow()
+        generated_at=datetime.utcnow(),
+        source=source
     )
@@ -1,12 +1,17 @@
 """Life Areas endpoints"""
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from ..schemas import LifeAreaResponse
 from ..models import LifeAreaEnum
+from ..etags import static_conditional_get
 
 router = APIRouter()
 
 
-@router.get("/", response_model=list[LifeAreaResponse])
+# Bump when the static list below changes
+AREAS_ETAG = 'W/"areas-v1"'
+
+
+@router.get("/", response_model=list[LifeAreaResponse], dependencies=[Depends(static_conditional_get(AREAS_ETAG))])
 def list_areas():
     """
     Get all 8 predefined life areas.
@@ -4,14 +4,26 @@ from sqlmodel import Session
 from datetime import datetime
 
 from ..db import get_session
-from ..schemas import UserCreate, LoginRequest, UserResponse
-from ..auth import create_user, authenticate_user, get_current_user, create_session, destroy_session
+from ..schemas import UserCreate, UserUpdate, LoginRequest, UserResponse
+from ..auth import create_user, authenticate_user, get_current_user, create_session, destroy_session, destroy_all_sessions
 from ..models import User
+from ..ratelimit import (
+    RateLimit, username_and_client_ip, LOGIN_ATTEMPTS_PER_IP, LOGIN_ATTEMPTS_PER_USER_IP, LOGIN_RATE_WINDOW,
+    REGISTER_ATTEMPTS_PER_IP, REGISTER_RATE_WINDOW,
+)
 
 router = APIRouter()
 
+# Both run bcrypt, so attempts are limited before the endpoint body runs
+# (per username+address first, so its rejections do not drain the address's own bucket)
+login_limits = [
+    Depends(RateLimit("login", LOGIN_ATTEMPTS_PER_USER_IP, LOGIN_RATE_WINDOW, key=username_and_client_ip)),
+    Depends(RateLimit("login-ip", LOGIN_ATTEMPTS_PER_IP, LOGIN_RATE_WINDOW)),
+]
+register_limits = [Depends(RateLimit("register", REGISTER_ATTEMPTS_PER_IP, REGISTER_RATE_WINDOW))]
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+
+@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED, dependencies=register_limits)
 def register(
     user_data: UserCreate,
     session: Session = Depends(get_session)
@@ -23,6 +35,7 @@ def register(
     - **password**: Password (min 8 chars)
     - **email**: Optional email
     - **full_name**: Optional full name
+    - **timezone**: IANA timezone (default UTC); decides when the user's day ends
     """
     try:
         user = create_user(
@@ -30,7 +43,8 @@ def register(
             username=user_data.username,
             password=user_data.password,
             email=user_data.email,
-            full_name=user_data.full_name
+            full_name=user_data.full_name,
+            timezone=user_data.timezone
         )
         return user
     except ValueError as e:
@@ -40,7 +54,7 @@ def register(
         )
 
 
-@router.post("/login")
+@router.post("/login", dependencies=login_limits)
 def login(
     login_data: LoginRequest,
     request: Request,
@@ -50,6 +64,8 @@ def login(
     Login with username and password.
 
     Creates a session cookie that will be used for authentication.
+    Returns 429 with Retry-After once the attempt limit for this username
+    and address (or this address alone) is used up.
     """
     user = authenticate_user(
         session=session,
@@ -86,6 +102,18 @@ def logout(request: Request):
     return {"message": "Logged out successfully"}
 
 
+@router.post("/logout-all")
+def logout_all(request: Request, current_user: User = Depends(get_current_user)):
+    """
+    Logout on every device by revoking all of the current user's sessions.
+
+    Requires authentication. Other workers drop their cached copies within
+    SESSION_CACHE_TTL seconds.
+    """
+    revoked = destroy_all_sessions(request, current_user)
+    return {"message": "Logged out everywhere", "sessions_revoked": revoked}
+
+
 @router.get("/me", response_model=UserResponse)
 def get_me(current_user: User = Depends(get_current_user)):
     """
@@ -94,3 +122,25 @@ def get_me(current_user: User = Depends(get_current_user)):
     Requires authentication.
     """
     return current_user
+
+
+@router.patch("/me", response_model=UserResponse)
+def update_me(
+    user_data: UserUpdate,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update the current user's email, full name or timezone.
+
+    Only provided fields are changed. The timezone decides when habit streaks
+    roll over and which date a check-in without one counts for.
+    """
+    for key, value in user_data.model_dump(exclude_unset=True).items():
+        setattr(current_user, key, value)
+    current_user.updated_at = datetime.utcnow()
+    session.add(current_user)
+    session.commit()
+    session.refresh(current_user)
+
+    return current_user
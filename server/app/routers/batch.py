@@ -0,0 +1,277 @@
+"""Batch create/update/delete endpoints"""
+from fastapi import APIRouter, Depends, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete
+from sqlmodel import Session, SQLModel, select
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Type
+from datetime import datetime
+
+from ..db import get_session
+from ..schemas import (
+    BatchRequest, BatchResponse, BatchItemResult, BatchOp, BatchOperation, MAX_BATCH_OPERATIONS,
+    GoalCreate, GoalUpdate, HabitCreate, HabitUpdate, TaskCreate, TaskUpdate,
+    EntryCreate, EntryUpdate, ContactCreate, ContactUpdate, ReferenceCreate, ReferenceUpdate,
+    HealthCatalogItemCreate, HealthCatalogItemUpdate, FinancialAccountCreate, FinancialAccountUpdate
+)
+from ..models import (
+    User, LifeArea, Goal, GoalAreaLink, Habit, HabitAreaLink, Task, Entry,
+    Contact, ContactAreaLink, Reference, ReferenceAreaLink, HealthCatalogItem, FinancialAccount
+)
+from ..auth import get_current_user
+from ..recurrence import (
+    apply_task_update, before_task_delete, materialize_written, prepare_task_create, task_update_error
+)
+
+router = APIRouter()
+
+
+class BatchResource(NamedTuple):
+    """Everything the batch engine needs to know about one resource"""
+    model: Type[SQLModel]
+    create_schema: Type[BaseModel]
+    update_schema: Type[BaseModel]
+    link_model: Optional[Type[SQLModel]] = None
+    link_column: Optional[str] = None
+    # Rules shared with the single-row endpoints: defaults for a create payload, a reason
+    # to reject an update (400), how to apply one, work before a delete (returning other
+    # ids it removed), and follow-up work on the created and updated rows before commit
+    prepare_create: Optional[Callable[[dict], dict]] = None
+    update_error: Optional[Callable[[SQLModel, dict], Optional[str]]] = None
+    apply_update: Optional[Callable[[Session, SQLModel, dict], None]] = None
+    before_delete: Optional[Callable[[Session, SQLModel], Set[int]]] = None
+    before_commit: Optional[Callable[[Session, int, List[SQLModel]], None]] = None
+
+
+# Keyed by the URL segment each resource is mounted under in main.py
+BATCH_RESOURCES: Dict[str, BatchResource] = {
+    "goals": BatchResource(Goal, GoalCreate, GoalUpdate, GoalAreaLink, "goal_id"),
+    "habits": BatchResource(Habit, HabitCreate, HabitUpdate, HabitAreaLink, "habit_id"),
+    "tasks": BatchResource(
+        Task, TaskCreate, TaskUpdate,
+        prepare_create=prepare_task_create, update_error=task_update_error, apply_update=apply_task_update,
+        before_delete=before_task_delete, before_commit=materialize_written,
+    ),
+    "entries": BatchResource(Entry, EntryCreate, EntryUpdate),
+    "contacts": BatchResource(Contact, ContactCreate, ContactUpdate, ContactAreaLink, "contact_id"),
+    "references": BatchResource(Reference, ReferenceCreate, ReferenceUpdate, ReferenceAreaLink, "reference_id"),
+    "health": BatchResource(HealthCatalogItem, HealthCatalogItemCreate, HealthCatalogItemUpdate),
+    "finance": BatchResource(FinancialAccount, FinancialAccountCreate, FinancialAccountUpdate),
+}
+
+
+def _result(index: int, operation: BatchOperation, status_code: int, detail=None, item_id: Optional[int] = None) -> BatchItemResult:
+    """Build a per-operation result"""
+    return BatchItemResult(
+        index=index,
+        op=operation.op,
+        id=item_id if item_id is not None else operation.id,
+        status=status_code,
+        detail=detail
+    )
+
+
+def _referenced_area_ids(payload: BaseModel) -> List[int]:
+    """Return the life area IDs a create/update payload points at"""
+    area_ids = getattr(payload, "area_ids", None) or []
+    area_id = getattr(payload, "area_id", None)
+    if area_id is not None:
+        area_ids = list(area_ids) + [area_id]
+    return list(area_ids)
+
+
+def run_batch(
+    resource: BatchResource,
+    batch: BatchRequest,
+    session: Session,
+    current_user: User
+) -> BatchResponse:
+    """
+    Validate and apply a batch of operations in a single transaction.
+
+    Ownership of every targeted row is checked with one IN query and every
+    referenced life area with another. When the batch is atomic, any failed
+    operation rolls back the whole batch.
+    """
+    model = resource.model
+    results: Dict[int, BatchItemResult] = {}
+    payloads: Dict[int, BaseModel] = {}
+
+    # Validate payloads up front so nothing is written for malformed input
+    for index, operation in enumerate(batch.operations):
+        if operation.op != BatchOp.CREATE and operation.id is None:
+            results[index] = _result(index, operation, status.HTTP_400_BAD_REQUEST, "id is required")
+            continue
+        if operation.op == BatchOp.DELETE:
+            continue
+
+        schema = resource.create_schema if operation.op == BatchOp.CREATE else resource.update_schema
+        try:
+            payloads[index] = schema.model_validate(operation.data or {})
+        except ValidationError as e:
+            detail = [{"loc": list(err["loc"]), "msg": err["msg"]} for err in e.errors()]
+            results[index] = _result(index, operation, status.HTTP_422_UNPROCESSABLE_ENTITY, detail)
+
+    # Load every targeted row with one IN query
+    target_ids = {
+        operation.id for index, operation in enumerate(batch.operations)
+        if operation.op != BatchOp.CREATE and index not in results
+    }
+    rows = {}
+    if target_ids:
+        rows = {row.id: row for row in session.exec(select(model).where(model.id.in_(target_ids))).all()}
+
+    # Validate every referenced life area with one IN query
+    area_ids = {area_id for payload in payloads.values() for area_id in _referenced_area_ids(payload)}
+    known_area_ids = set()
+    if area_ids:
+        known_area_ids = set(session.exec(select(LifeArea.id).where(LifeArea.id.in_(area_ids))).all())
+
+    deleted_ids = set()
+    for index, operation in enumerate(batch.operations):
+        if index in results:
+            continue
+
+        if operation.op != BatchOp.CREATE:
+            row = rows.get(operation.id)
+            if row is None or operation.id in deleted_ids:
+                results[index] = _result(index, operation, status.HTTP_404_NOT_FOUND, "Not found")
+                continue
+            if row.user_id != current_user.id:
+                results[index] = _result(index, operation, status.HTTP_403_FORBIDDEN, "Not authorized")
+                continue
+            if operation.version is not None and row.version != operation.version:
+                results[index] = _result(
+                    index, operation, status.HTTP_412_PRECONDITION_FAILED,
+                    "Resource has been modified since it was read"
+                )
+                continue
+            if operation.op == BatchOp.DELETE:
+                deleted_ids.add(operation.id)
+            elif resource.update_error is not None:
+                error = resource.update_error(row, payloads[index].model_dump(exclude_unset=True))
+                if error:
+                    results[index] = _result(index, operation, status.HTTP_400_BAD_REQUEST, error)
+                    continue
+
+        payload = payloads.get(index)
+        missing = [area_id for area_id in (_referenced_area_ids(payload) if payload else []) if area_id not in known_area_ids]
+        if missing:
+            results[index] = _result(
+                index, operation, status.HTTP_400_BAD_REQUEST,
+                f"Life area with id {missing[0]} not found"
+            )
+
+    failed = any(result.status >= 400 for result in results.values())
+    if batch.atomic and failed:
+        for index, operation in enumerate(batch.operations):
+            if index not in results:
+                results[index] = _result(
+                    index, operation, status.HTTP_424_FAILED_DEPENDENCY,
+                    "Not applied: another operation in the batch failed"
+                )
+        return BatchResponse(committed=False, results=[results[i] for i in range(len(batch.operations))])
+
+    # Apply everything that passed validation
+    created = []
+    updated = []
+    relinked = {}
+    removed = []
+    for index, operation in enumerate(batch.operations):
+        if index in results:
+            continue
+
+        if operation.op == BatchOp.CREATE:
+            data = payloads[index].model_dump(exclude_none=True)
+            new_area_ids = data.pop("area_ids", None)
+            if resource.prepare_create is not None:
+                data = resource.prepare_create(data)
+            item = model(user_id=current_user.id, **data)
+            session.add(item)
+            created.append((index, operation, item, new_area_ids))
+        elif operation.op == BatchOp.UPDATE:
+            item = rows[operation.id]
+            update_data = payloads[index].model_dump(exclude_unset=True)
+            new_area_ids = update_data.pop("area_ids", None)
+            if resource.apply_update is not None:
+                resource.apply_update(session, item, update_data)
+            else:
+                for key, value in update_data.items():
+                    setattr(item, key, value)
+            item.updated_at = datetime.utcnow()
+            session.add(item)
+            updated.append(item)
+            if new_area_ids is not None and resource.link_model is not None:
+                relinked[item.id] = new_area_ids
+            results[index] = _result(index, operation, status.HTTP_200_OK)
+        else:
+            removed.append(rows[operation.id])
+            results[index] = _result(index, operation, status.HTTP_204_NO_CONTENT)
+
+    if resource.link_model is not None:
+        link_column = getattr(resource.link_model, resource.link_column)
+        for item in removed:
+            relinked.pop(item.id, None)
+        stale_link_ids = set(relinked) | {item.id for item in removed}
+        if stale_link_ids:
+            session.execute(delete(resource.link_model).where(link_column.in_(stale_link_ids)))
+
+    # Hooks run first (a series detaches its occurrences while it still exists);
+    # rows they already removed are not deleted twice
+    removed_by_hooks = set()
+    if resource.before_delete is not None:
+        for item in removed:
+            removed_by_hooks |= resource.before_delete(session, item)
+    for item in removed:
+        if item.id in removed_by_hooks:
+            session.expunge(item)
+        else:
+            session.delete(item)
+
+    # Flush once so every created row gets its primary key
+    session.flush()
+
+    for index, operation, item, new_area_ids in created:
+        if new_area_ids and resource.link_model is not None:
+            relinked[item.id] = new_area_ids
+        results[index] = _result(index, operation, status.HTTP_201_CREATED, item_id=item.id)
+
+    if resource.link_model is not None:
+        for item_id, new_area_ids in relinked.items():
+            for area_id in new_area_ids:
+                session.add(resource.link_model(**{resource.link_column: item_id, "area_id": area_id}))
+
+    if resource.before_commit is not None:
+        resource.before_commit(session, current_user.id, [item for _, _, item, _ in created] + updated)
+    session.commit()
+
+    return BatchResponse(committed=True, results=[results[i] for i in range(len(batch.operations))])
+
+
+def _make_batch_endpoint(resource_name: str, resource: BatchResource):
+    """Create the batch endpoint function for one resource"""
+    def batch_endpoint(
+        batch: BatchRequest,
+        session: Session = Depends(get_session),
+        current_user: User = Depends(get_current_user)
+    ):
+        return run_batch(resource, batch, session, current_user)
+
+    batch_endpoint.__name__ = f"batch_{resource_name}"
+    batch_endpoint.__doc__ = f"""
+    Apply up to {MAX_BATCH_OPERATIONS} create/update/delete operations to {resource_name} in one transaction.
+
+    - **operations**: List of `{{"op": "create"|"update"|"delete", "id": ..., "data": {{...}}}}`
+    - **atomic**: If true (default), any failed operation rolls back the whole batch
+
+    Returns a per-operation status (201, 200, 204, or an error code).
+    """
+    return batch_endpoint
+
+
+for _name, _resource in BATCH_RESOURCES.items():
+    router.add_api_route(
+        f"/{_name}:batch",
+        _make_batch_endpoint(_name, _resource),
+        methods=["POST"],
+        response_model=BatchResponse,
+    )
@@ -0,0 +1,96 @@
+"""Calendar feed endpoints: an ICS URL for calendar apps, and managing its token"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import delete
+from sqlmodel import Session
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from ..db import get_session
+from ..schemas import CalendarFeedResponse
+from ..models import CalendarFeed, User
+from ..auth import get_current_user
+from ..etags import etag_matches
+from ..calendar_feed import load_feed, rotate_feed_token
+
+router = APIRouter()
+
+# Calendar apps poll on their own schedule; this only asks them to revalidate each time
+CALENDAR_CACHE_CONTROL = "private, no-cache"
+
+
+def _not_modified_since(request: Request, last_modified: datetime) -> bool:
+    """If-Modified-Since check; only consulted when the client sent no If-None-Match"""
+    header = request.headers.get("if-modified-since")
+    if not header or request.headers.get("if-none-match"):
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return last_modified <= since
+
+
+@router.get("/calendar.ics", response_class=Response)
+def calendar_feed(
+    request: Request,
+    token: str = Query(..., description="Feed token from POST /api/calendar/feed"),
+    session: Session = Depends(get_session)
+):
+    """
+    The user's calendar as ICS: open dated tasks (recurring ones as RRULEs),
+    goal deadlines, liability due dates and contact birthdays.
+
+    Authenticated by the token in the URL, since calendar apps cannot log in.
+    Answers 304 to If-None-Match / If-Modified-Since while nothing shown has
+    changed; the calendar is rebuilt only after a relevant write.
+    """
+    def need_body(etag: str, last_modified: datetime) -> bool:
+        return not (etag_matches(request.headers.get("if-none-match"), etag) or _not_modified_since(request, last_modified))
+
+    feed = load_feed(session, token, need_body)
+    if feed is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Calendar feed not found"
+        )
+
+    headers = {
+        "ETag": feed.etag,
+        "Last-Modified": format_datetime(feed.last_modified.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": CALENDAR_CACHE_CONTROL,
+    }
+    if feed.body is None or not need_body(feed.etag, feed.last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=feed.body, media_type="text/calendar", headers=headers)
+
+
+@router.post("/calendar/feed", response_model=CalendarFeedResponse, status_code=status.HTTP_201_CREATED)
+def create_calendar_feed(
+    request: Request,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create the current user's calendar feed URL, or replace it.
+
+    The token is only shown here; calling this again invalidates the old URL.
+    """
+    token = rotate_feed_token(session, current_user.id)
+    url = str(request.url_for("calendar_feed").include_query_params(token=token))
+    return CalendarFeedResponse(token=token, url=url)
+
+
+@router.delete("/calendar/feed", status_code=status.HTTP_204_NO_CONTENT)
+def delete_calendar_feed(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Turn the calendar feed off; its URL stops working.
+    """
+    session.execute(delete(CalendarFeed).where(CalendarFeed.user_id == current_user.id))
+    session.commit()
+
+    return None
@@ -1,5 +1,5 @@
 """Contacts endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Header
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime, date
@@ -8,6 +8,7 @@ from ..db import get_session
 from ..schemas import ContactCreate, ContactUpdate, ContactResponse, ContactBirthdayResponse
 from ..models import Contact, User, LifeArea, ContactAreaLink
 from ..auth import get_current_user
+from ..etags import conditional_get, check_not_modified, check_if_match, row_etag
 
 router = APIRouter()
 
@@ -75,7 +76,7 @@ def create_contact(
     return contact
 
 
-@router.get("/", response_model=List[ContactResponse])
+@router.get("/", response_model=List[ContactResponse], dependencies=[Depends(conditional_get("contacts"))])
 def list_contacts(
     area_id: Optional[int] = Query(None, description="Filter by life area ID"),
     session: Session = Depends(get_session),
@@ -106,6 +107,8 @@ def list_contacts(
 @router.get("/{contact_id}", response_model=ContactResponse)
 def get_contact(
     contact_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -125,6 +128,8 @@ def get_contact(
             detail="Not authorized to access this contact"
         )
 
+    check_not_modified(request, response, row_etag(contact))
+
     return contact
 
 
@@ -179,6 +184,8 @@ def get_contact_birthday_info(
 def update_contact(
     contact_id: int,
     contact_data: ContactUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag from a previous read; fails with 412 if the row changed since"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -200,6 +207,8 @@ def update_contact(
             detail="Not authorized to update this contact"
         )
 
+    check_if_match(if_match, contact)
+
     # Update fields
     update_data = contact_data.model_dump(exclude_unset=True)
 
@@ -236,6 +245,8 @@ def update_contact(
     session.commit()
     session.refresh(contact)
 
+    response.headers["ETag"] = row_etag(contact)
+
     return contact
 
 
@@ -1,13 +1,17 @@
 """Journal Entries endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Header
 from sqlmodel import Session, select
+from sqlalchemy import Date, cast, func
+from sqlalchemy.orm import defer
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 
 from ..db import get_session
-from ..schemas import EntryCreate, EntryUpdate, EntryResponse
+from ..schemas import EntryCreate, EntryUpdate, EntryResponse, EntrySummaryResponse, EntryStatsGroup, EntryStatsResponse
 from ..models import Entry, User, LifeArea
 from ..auth import get_current_user
+from ..etags import conditional_get, check_not_modified, check_if_match, row_etag, get_resource_version, make_etag
+from ..fastjson import FAST_JSON_LISTS, area_lookup, fast_json_response
 
 router = APIRouter()
 
@@ -49,8 +53,9 @@ def create_entry(
     return entry
 
 
-@router.get("/", response_model=List[EntryResponse])
+@router.get("/", response_model=List[EntrySummaryResponse], dependencies=[Depends(conditional_get("entries"))])
 def list_entries(
+    response: Response,
     area_id: Optional[int] = Query(None, description="Filter by life area ID"),
     start_date: Optional[date] = Query(None, description="Filter entries from this date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="Filter entries until this date (YYYY-MM-DD)"),
@@ -64,6 +69,9 @@ def list_entries(
     - **area_id**: Filter by life area (1-8)
     - **start_date**: Get entries from this date onwards
     - **end_date**: Get entries up to this date
+
+    Entries carry an excerpt rather than their content; fetch one entry by ID
+    for the full text.
     """
     # Build query
     statement = select(Entry).where(Entry.user_id == current_user.id)
@@ -78,13 +86,120 @@ def list_entries(
     # Order by date descending (most recent first)
     statement = statement.order_by(Entry.entry_date.desc())
 
-    entries = session.exec(statement).all()
+    if FAST_JSON_LISTS:
+        # Serialize straight from row tuples, skipping ORM instances and response models
+        areas = area_lookup(session)
+        rows = session.execute(statement.with_only_columns(
+            Entry.id, Entry.title, Entry.excerpt, Entry.word_count, Entry.area_id, Entry.entry_date,
+            Entry.created_at, Entry.updated_at, Entry.version
+        )).all()
+        return fast_json_response([
+            {
+                "id": row.id,
+                "title": row.title,
+                "excerpt": row.excerpt,
+                "word_count": row.word_count,
+                "area": areas.get(row.area_id),
+                "entry_date": row.entry_date,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+                "version": row.version,
+            }
+            for row in rows
+        ], response)
+
+    entries = session.exec(statement.options(defer(Entry.content))).all()
     return entries
 
 
+# Default span for /stats when no start date is given: one year, a calendar heatmap's worth
+STATS_DEFAULT_DAYS = 365
+
+
+def _period_start(group: EntryStatsGroup, dialect: str):
+    """SQL expression for the first day of the day/week/month an entry falls in"""
+    if group == EntryStatsGroup.DAY:
+        return Entry.entry_date
+    if dialect == "sqlite":
+        # Dates are stored as YYYY-MM-DD text; 'weekday 0' moves to Sunday, so back 6 days is Monday
+        if group == EntryStatsGroup.WEEK:
+            return func.date(Entry.entry_date, "weekday 0", "-6 days", type_=Date)
+        return func.date(Entry.entry_date, "start of month", type_=Date)
+    return cast(func.date_trunc(group.value, Entry.entry_date), Date)
+
+
+@router.get("/stats", response_model=EntryStatsResponse)
+def entry_stats(
+    request: Request,
+    response: Response,
+    start_date: Optional[date] = Query(None, alias="from", description="First day to include (default: a year before `to`)"),
+    end_date: Optional[date] = Query(None, alias="to", description="Last day to include (default: today)"),
+    group: EntryStatsGroup = Query(EntryStatsGroup.DAY, description="Bucket size: day, week or month"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Entry and word counts per day, week or month, with a per-area breakdown.
+
+    - **from** / **to**: Inclusive date range (YYYY-MM-DD)
+    - **group**: day, week (starting Monday) or month
+
+    Computed with one GROUP BY over the (user, entry_date) index using word
+    counts stored at write time, so entry content is never read. Periods
+    without entries are left out.
+    """
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=STATS_DEFAULT_DAYS - 1)
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'"
+        )
+    # The default window moves with the calendar, so the resolved dates are part of the ETag
+    version = get_resource_version(session, current_user.id, "entries")
+    check_not_modified(request, response, make_etag(f"entries-stats-{start_date}-{end_date}", current_user.id, version))
+
+    period = _period_start(group, session.get_bind().dialect.name).label("period")
+    rows = session.execute(
+        select(period, Entry.area_id, func.count().label("entries"), func.sum(Entry.word_count).label("words"))
+        .where(Entry.user_id == current_user.id, Entry.entry_date >= start_date, Entry.entry_date <= end_date)
+        .group_by(period, Entry.area_id)
+        .order_by(period)
+    ).all()
+
+    areas = area_lookup(session)
+    totals = {"entries": 0, "words": 0}
+    area_totals = {}
+    periods = []
+    for row in rows:
+        if not periods or periods[-1]["period"] != row.period:
+            periods.append({"period": row.period, "entries": 0, "words": 0, "areas": {}})
+        bucket = periods[-1]
+        name = areas[row.area_id]["name"]
+        bucket["areas"][name] = {"entries": row.entries, "words": row.words}
+        bucket["entries"] += row.entries
+        bucket["words"] += row.words
+        area_total = area_totals.setdefault(name, {"entries": 0, "words": 0})
+        area_total["entries"] += row.entries
+        area_total["words"] += row.words
+        totals["entries"] += row.entries
+        totals["words"] += row.words
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "group": group,
+        "total": totals,
+        "areas": area_totals,
+        "periods": periods,
+    }
+
+
 @router.get("/{entry_id}", response_model=EntryResponse)
 def get_entry(
     entry_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -104,6 +219,8 @@ def get_entry(
             detail="Not authorized to access this entry"
         )
 
+    check_not_modified(request, response, row_etag(entry))
+
     return entry
 
 
@@ -111,6 +228,8 @@ def get_entry(
 def update_entry(
     entry_id: int,
     entry_data: EntryUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag from a previous read; fails with 412 if the row changed since"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -132,6 +251,8 @@ def update_entry(
             detail="Not authorized to update this entry"
         )
 
+    check_if_match(if_match, entry)
+
     # Update fields
     update_data = entry_data.model_dump(exclude_unset=True)
 
@@ -152,6 +273,8 @@ def update_entry(
     session.commit()
     session.refresh(entry)
 
+    response.headers["ETag"] = row_etag(entry)
+
     return entry
 
 
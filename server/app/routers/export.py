@@ -0,0 +1,50 @@
+"""Full-account export endpoint"""
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from datetime import date
+from enum import Enum
+
+from ..models import User
+from ..auth import get_current_user
+from ..data_export import ndjson_stream, csv_stream, zip_stream
+
+router = APIRouter()
+
+
+class ExportFormat(str, Enum):
+    """Export file formats"""
+    NDJSON = "ndjson"
+    CSV = "csv"
+    ZIP = "zip"
+
+
+# format -> (stream factory, media type, file extension)
+EXPORT_FORMATS = {
+    ExportFormat.NDJSON: (ndjson_stream, "application/x-ndjson", "ndjson"),
+    ExportFormat.CSV: (csv_stream, "text/csv", "csv"),
+    ExportFormat.ZIP: (zip_stream, "application/zip", "zip"),
+}
+
+
+@router.get("/")
+def export_account(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson, csv, or zip"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download every row the current user owns.
+
+    - **ndjson**: One `{"type": <table>, "data": {...}}` object per line, after an `export` header line
+    - **csv**: One CSV document with a `# <table>` section per table
+    - **zip**: One CSV file per table plus `manifest.json`
+
+    The export is streamed with server-side cursors, so memory use stays
+    constant regardless of account size.
+    """
+    stream, media_type, extension = EXPORT_FORMATS[format]
+    filename = f"life-export-{current_user.username}-{date.today().isoformat()}.{extension}"
+    return StreamingResponse(
+        stream(current_user),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
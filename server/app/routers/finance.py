@@ -1,5 +1,5 @@
 """Finance endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Header
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime
@@ -8,6 +8,7 @@ from ..db import get_session
 from ..schemas import FinancialAccountCreate, FinancialAccountUpdate, FinancialAccountResponse
 from ..models import FinancialAccount, User, FinancialAccountType
 from ..auth import get_current_user
+from ..etags import conditional_get, check_not_modified, check_if_match, row_etag
 
 router = APIRouter()
 
@@ -45,7 +46,7 @@ def create_financial_account(
     return account
 
 
-@router.get("/", response_model=List[FinancialAccountResponse])
+@router.get("/", response_model=List[FinancialAccountResponse], dependencies=[Depends(conditional_get("financial_accounts"))])
 def list_financial_accounts(
     account_type: Optional[FinancialAccountType] = Query(None, description="Filter by account type"),
     session: Session = Depends(get_session),
@@ -67,7 +68,7 @@ def list_financial_accounts(
     return accounts
 
 
-@router.get("/summary")
+@router.get("/summary", dependencies=[Depends(conditional_get("financial_accounts"))])
 def get_financial_summary(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
@@ -117,6 +118,8 @@ def get_financial_summary(
 @router.get("/{account_id}", response_model=FinancialAccountResponse)
 def get_financial_account(
     account_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -136,6 +139,8 @@ def get_financial_account(
             detail="Not authorized to access this financial account"
         )
 
+    check_not_modified(request, response, row_etag(account))
+
     return account
 
 
@@ -143,6 +148,8 @@ def get_financial_account(
 def update_financial_account(
     account_id: int,
     account_data: FinancialAccountUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag from a previous read; fails with 412 if the row changed since"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -164,6 +171,8 @@ def update_financial_account(
             detail="Not authorized to update this financial account"
         )
 
+    check_if_match(if_match, account)
+
     # Update fields
     update_data = account_data.model_dump(exclude_unset=True)
 
@@ -175,6 +184,8 @@ def update_financial_account(
     session.commit()
     session.refresh(account)
 
+    response.headers["ETag"] = row_etag(account)
+
     return account
 
 
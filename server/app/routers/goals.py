@@ -1,5 +1,5 @@
 """Goals endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Header
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime
@@ -8,6 +8,7 @@ from ..db import get_session
 from ..schemas import GoalCreate, GoalUpdate, GoalResponse
 from ..models import Goal, User, LifeArea, GoalAreaLink, GoalTimeframe, GoalStatus
 from ..auth import get_current_user
+from ..etags import conditional_get, check_not_modified, check_if_match, row_etag
 
 router = APIRouter()
 
@@ -61,7 +62,7 @@ def create_goal(
     return goal
 
 
-@router.get("/", response_model=List[GoalResponse])
+@router.get("/", response_model=List[GoalResponse], dependencies=[Depends(conditional_get("goals"))])
 def list_goals(
     area_id: Optional[int] = Query(None, description="Filter by life area ID"),
     timeframe: Optional[GoalTimeframe] = Query(None, description="Filter by timeframe"),
@@ -102,6 +103,8 @@ def list_goals(
 @router.get("/{goal_id}", response_model=GoalResponse)
 def get_goal(
     goal_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -121,6 +124,8 @@ def get_goal(
             detail="Not authorized to access this goal"
         )
 
+    check_not_modified(request, response, row_etag(goal))
+
     return goal
 
 
@@ -128,6 +133,8 @@ def get_goal(
 def update_goal(
     goal_id: int,
     goal_data: GoalUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag from a previous read; fails with 412 if the row changed since"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -149,6 +156,8 @@ def update_goal(
             detail="Not authorized to update this goal"
         )
 
+    check_if_match(if_match, goal)
+
     # Update fields
     update_data = goal_data.model_dump(exclude_unset=True)
 
@@ -185,6 +194,8 @@ def update_goal(
     session.commit()
     session.refresh(goal)
 
+    response.headers["ETag"] = row_etag(goal)
+
     return goal
 
 
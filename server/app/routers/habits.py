@@ -1,13 +1,15 @@
 """Habits endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Header
 from sqlmodel import Session, select
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import datetime
 
 from ..db import get_session
 from ..schemas import HabitCreate, HabitUpdate, HabitResponse, HabitCheckinRequest, HabitCheckInResponse
 from ..models import Habit, User, LifeArea, HabitAreaLink, HabitType
 from ..auth import get_current_user
+from ..etags import conditional_get, check_not_modified, check_if_match, row_etag
+from ..streaks import local_today
 
 router = APIRouter()
 
@@ -59,7 +61,7 @@ def create_habit(
     return habit
 
 
-@router.get("/", response_model=List[HabitResponse])
+@router.get("/", response_model=List[HabitResponse], dependencies=[Depends(conditional_get("habits"))])
 def list_habits(
     area_id: Optional[int] = Query(None, description="Filter by life area ID"),
     habit_type: Optional[HabitType] = Query(None, description="Filter by habit type"),
@@ -96,6 +98,8 @@ def list_habits(
 @router.get("/{habit_id}", response_model=HabitResponse)
 def get_habit(
     habit_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -115,6 +119,8 @@ def get_habit(
             detail="Not authorized to access this habit"
         )
 
+    check_not_modified(request, response, row_etag(habit))
+
     return habit
 
 
@@ -122,6 +128,8 @@ def get_habit(
 def update_habit(
     habit_id: int,
     habit_data: HabitUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag from a previous read; fails with 412 if the row changed since"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -143,6 +151,8 @@ def update_habit(
             detail="Not authorized to update this habit"
         )
 
+    check_if_match(if_match, habit)
+
     # Update fields
     update_data = habit_data.model_dump(exclude_unset=True)
 
@@ -179,6 +189,8 @@ def update_habit(
     session.commit()
     session.refresh(habit)
 
+    response.headers["ETag"] = row_etag(habit)
+
     return habit
 
 
@@ -227,6 +239,9 @@ def checkin_habit(
     - If checking in on consecutive days, increment current_streak
     - If there's a gap, reset current_streak to 1
     - Update longest_streak if current_streak exceeds it
+
+    Dates are in the user's timezone. A streak whose day passes without a
+    check-in is reset to 0 by the streak_rollover job (see streaks.py).
     """
     habit = session.get(Habit, habit_id)
     if not habit:
@@ -241,7 +256,7 @@ def checkin_habit(
             detail="Not authorized to check in to this habit"
         )
 
-    today = date.today()
+    today = local_today(current_user.timezone)
     checkin_date = checkin_data.checkin_date or today
 
     # Don't allow future check-ins
@@ -252,7 +267,7 @@ def checkin_habit(
         )
 
     # Calculate streak
-    if habit.habit_type == HabitType.POSITIVE:
+    if habit.habit_type == HabitType.GAIN:
         # Positive habit: checking in is good
         if habit.last_checkin_date is None:
             # First check-in
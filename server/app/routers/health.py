@@ -1,5 +1,5 @@
 """Health Catalog endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Header
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime
@@ -8,6 +8,7 @@ from ..db import get_session
 from ..schemas import HealthCatalogItemCreate, HealthCatalogItemUpdate, HealthCatalogItemResponse
 from ..models import HealthCatalogItem, User, HealthCatalogType
 from ..auth import get_current_user
+from ..etags import conditional_get, check_not_modified, check_if_match, row_etag
 
 router = APIRouter()
 
@@ -43,7 +44,7 @@ def create_health_item(
     return item
 
 
-@router.get("/", response_model=List[HealthCatalogItemResponse])
+@router.get("/", response_model=List[HealthCatalogItemResponse], dependencies=[Depends(conditional_get("health_catalog_items"))])
 def list_health_items(
     catalog_type: Optional[HealthCatalogType] = Query(None, description="Filter by catalog type"),
     session: Session = Depends(get_session),
@@ -68,6 +69,8 @@ def list_health_items(
 @router.get("/{item_id}", response_model=HealthCatalogItemResponse)
 def get_health_item(
     item_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -87,6 +90,8 @@ def get_health_item(
             detail="Not authorized to access this health catalog item"
         )
 
+    check_not_modified(request, response, row_etag(item))
+
     return item
 
 
@@ -94,6 +99,8 @@ def get_health_item(
 def update_health_item(
     item_id: int,
     item_data: HealthCatalogItemUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag from a previous read; fails with 412 if the row changed since"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -115,6 +122,8 @@ def update_health_item(
             detail="Not authorized to update this health catalog item"
         )
 
+    check_if_match(if_match, item)
+
     # Update fields
     update_data = item_data.model_dump(exclude_unset=True)
 
@@ -126,6 +135,8 @@ def update_health_item(
     session.commit()
     session.refresh(item)
 
+    response.headers["ETag"] = row_etag(item)
+
     return item
 
 
@@ -0,0 +1,27 @@
+"""Reminder digest endpoints"""
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+
+from ..db import get_session
+from ..schemas import DigestResponse
+from ..models import User
+from ..auth import get_current_user
+from ..notifications import digest_for_user
+
+router = APIRouter()
+
+
+@router.get("/digest", response_model=DigestResponse)
+def get_digest(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Today's reminder digest for the current user, as it would be sent.
+
+    Lists birthdays in the coming days, open tasks due today or overdue, and
+    habits not checked in yet today, in the user's timezone. The daily digest
+    goes out after DIGEST_HOUR local time through the configured NOTIFY_SINK;
+    this endpoint only previews it.
+    """
+    return digest_for_user(session.connection(), current_user)
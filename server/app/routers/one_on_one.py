@@ -1,13 +1,14 @@
 """One-on-One Conflict Resolution endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Header
 from sqlmodel import Session, select
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from ..db import get_session
 from ..schemas import ConflictTopicCreate, ConflictTopicUpdate, ConflictTopicResponse
 from ..models import ConflictTopic, User
 from ..auth import get_current_user
+from ..etags import conditional_get, check_not_modified, check_if_match, row_etag
 
 router = APIRouter()
 
@@ -53,7 +54,7 @@ def create_conflict_topic(
     return topic
 
 
-@router.get("/", response_model=List[ConflictTopicResponse])
+@router.get("/", response_model=List[ConflictTopicResponse], dependencies=[Depends(conditional_get("conflict_topics"))])
 def list_conflict_topics(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
@@ -71,6 +72,8 @@ def list_conflict_topics(
 @router.get("/{topic_id}", response_model=ConflictTopicResponse)
 def get_conflict_topic(
     topic_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -90,6 +93,8 @@ def get_conflict_topic(
             detail="Not authorized to access this conflict topic"
         )
 
+    check_not_modified(request, response, row_etag(topic))
+
     return topic
 
 
@@ -97,6 +102,8 @@ def get_conflict_topic(
 def update_conflict_topic(
     topic_id: int,
     topic_data: ConflictTopicUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag from a previous read; fails with 412 if the row changed since"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -120,6 +127,8 @@ def update_conflict_topic(
             detail="Not authorized to update this conflict topic"
         )
 
+    check_if_match(if_match, topic)
+
     # Update fields
     update_data = topic_data.model_dump(exclude_unset=True)
 
@@ -131,6 +140,8 @@ def update_conflict_topic(
     session.commit()
     session.refresh(topic)
 
+    response.headers["ETag"] = row_etag(topic)
+
     return topic
 
 
@@ -1,5 +1,5 @@
 """References endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Header
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime
@@ -8,6 +8,7 @@ from ..db import get_session
 from ..schemas import ReferenceCreate, ReferenceUpdate, ReferenceResponse
 from ..models import Reference, User, LifeArea, ReferenceAreaLink, ReferenceType
 from ..auth import get_current_user
+from ..etags import conditional_get, check_not_modified, check_if_match, row_etag
 
 router = APIRouter()
 
@@ -80,7 +81,7 @@ def create_reference(
     return reference
 
 
-@router.get("/", response_model=List[ReferenceResponse])
+@router.get("/", response_model=List[ReferenceResponse], dependencies=[Depends(conditional_get("references"))])
 def list_references(
     area_id: Optional[int] = Query(None, description="Filter by life area ID"),
     reference_type: Optional[ReferenceType] = Query(None, description="Filter by reference type"),
@@ -117,6 +118,8 @@ def list_references(
 @router.get("/{reference_id}", response_model=ReferenceResponse)
 def get_reference(
     reference_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -136,6 +139,8 @@ def get_reference(
             detail="Not authorized to access this reference"
         )
 
+    check_not_modified(request, response, row_etag(reference))
+
     return reference
 
 
@@ -143,6 +148,8 @@ def get_reference(
 def update_reference(
     reference_id: int,
     reference_data: ReferenceUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag from a previous read; fails with 412 if the row changed since"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -164,6 +171,8 @@ def update_reference(
             detail="Not authorized to update this reference"
         )
 
+    check_if_match(if_match, reference)
+
     # Update fields
     update_data = reference_data.model_dump(exclude_unset=True)
 
@@ -200,6 +209,8 @@ def update_reference(
     session.commit()
     session.refresh(reference)
 
+    response.headers["ETag"] = row_etag(reference)
+
     return reference
 
 
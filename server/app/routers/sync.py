@@ -0,0 +1,108 @@
+"""Delta sync endpoint"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+from typing import Optional
+from datetime import datetime, timedelta
+
+from ..db import get_session
+from ..schemas import (
+    SyncResponse, GoalResponse, HabitResponse, HabitCheckinRecord, TaskResponse, ContactResponse, ReferenceResponse,
+    HealthCatalogItemResponse, FinancialAccountResponse, EntryResponse, ConflictTopicResponse
+)
+from ..models import (
+    User, Goal, Habit, HabitCheckin, Task, Contact, Reference, HealthCatalogItem, FinancialAccount,
+    Entry, ConflictTopic, Tombstone
+)
+from ..auth import get_current_user
+from ..changes import encode_sync_token, decode_sync_token, SYNC_OVERLAP, TOMBSTONE_RETENTION_DAYS
+
+router = APIRouter()
+
+# Table name -> (model, response schema, relationships to eager-load)
+SYNC_RESOURCES = {
+    "goals": (Goal, GoalResponse, [Goal.areas]),
+    "habits": (Habit, HabitResponse, [Habit.areas]),
+    "tasks": (Task, TaskResponse, [Task.area]),
+    "contacts": (Contact, ContactResponse, [Contact.areas]),
+    "references": (Reference, ReferenceResponse, [Reference.areas]),
+    "health_catalog_items": (HealthCatalogItem, HealthCatalogItemResponse, []),
+    "financial_accounts": (FinancialAccount, FinancialAccountResponse, []),
+    "entries": (Entry, EntryResponse, [Entry.area]),
+    "conflict_topics": (ConflictTopic, ConflictTopicResponse, []),
+}
+
+# Tables without a user_id column, owned through a parent:
+# table name -> (model, response schema, parent model, foreign key to the parent)
+SYNC_CHILD_RESOURCES = {
+    "habit_checkins": (HabitCheckin, HabitCheckinRecord, Habit, HabitCheckin.habit_id),
+}
+
+
+@router.get("/", response_model=SyncResponse)
+def sync(
+    since: Optional[str] = Query(None, description="Token from the previous sync (omit for a full sync)"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Return everything that changed since the given sync token.
+
+    - **since**: Token returned by the previous call; omit it to get every row
+
+    The response carries a new **token** for the next call, the changed rows
+    per resource and the IDs deleted per resource. Resources with nothing to
+    report are omitted. When **reset** is true the client should replace its
+    local copy instead of merging (first sync, or a token older than the
+    tombstone retention window). Clients should upsert rows by id, since rows
+    near the previous token may be sent again.
+    """
+    issued_at = datetime.utcnow()
+
+    cutoff = None
+    if since:
+        moment = decode_sync_token(since)
+        if moment is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid sync token"
+            )
+        if moment >= issued_at - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+            cutoff = moment - SYNC_OVERLAP
+
+    queries = {}
+    for resource, (model, schema, relationships) in SYNC_RESOURCES.items():
+        statement = select(model).where(model.user_id == current_user.id)
+        for relationship in relationships:
+            statement = statement.options(selectinload(relationship))
+        queries[resource] = (model, schema, statement)
+    for resource, (model, schema, parent, parent_key) in SYNC_CHILD_RESOURCES.items():
+        statement = select(model).join(parent, parent_key == parent.id).where(parent.user_id == current_user.id)
+        queries[resource] = (model, schema, statement)
+
+    changes = {}
+    for resource, (model, schema, statement) in queries.items():
+        if cutoff is not None:
+            statement = statement.where(model.updated_at >= cutoff)
+        rows = session.exec(statement).all()
+        if rows:
+            changes[resource] = [schema.model_validate(row).model_dump(mode="json") for row in rows]
+
+    deleted = {}
+    if cutoff is not None:
+        statement = select(Tombstone.resource, Tombstone.row_id).where(
+            Tombstone.user_id == current_user.id,
+            Tombstone.deleted_at >= cutoff
+        )
+        live_ids = {resource: {row["id"] for row in rows} for resource, rows in changes.items()}
+        for resource, row_id in session.exec(statement).all():
+            # A reused ID that shows up as a live row was recreated after the delete
+            if row_id not in live_ids.get(resource, ()):
+                deleted.setdefault(resource, []).append(row_id)
+
+    return SyncResponse(
+        token=encode_sync_token(issued_at),
+        reset=cutoff is None,
+        changes=changes,
+        deleted=deleted
+    )
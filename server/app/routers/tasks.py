@@ -1,5 +1,5 @@
 """Tasks endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Header
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime
@@ -8,6 +8,11 @@ from ..db import get_session
 from ..schemas import TaskCreate, TaskUpdate, TaskResponse
 from ..models import Task, User, LifeArea, TaskStatus
 from ..auth import get_current_user
+from ..etags import conditional_get, check_not_modified, check_if_match, row_etag
+from ..fastjson import FAST_JSON_LISTS, area_lookup, fast_json_response
+from ..recurrence import (
+    apply_task_update, before_task_delete, materialize, materialize_tasks, series_start, task_update_error
+)
 
 router = APIRouter()
 
@@ -26,6 +31,8 @@ def create_task(
     - **status**: todo, doing, or done (defaults to todo)
     - **due_date**: Optional due date
     - **priority**: Optional priority level (1-5, 1=highest)
+    - **recurrence**: Optional RRULE (e.g. FREQ=WEEKLY;BYDAY=MO); the task becomes a series
+      starting on due_date (default today) and its occurrences are created as separate tasks
     """
     # Validate area ID exists
     area = session.get(LifeArea, task_data.area_id)
@@ -39,34 +46,52 @@ def create_task(
     task = Task(
         user_id=current_user.id,
         area_id=task_data.area_id,
+        title=task_data.title,
         description=task_data.description,
         status=task_data.status or TaskStatus.TODO,
-        due_date=task_data.due_date,
-        priority=task_data.priority
+        due_date=series_start(task_data.due_date, task_data.recurrence),
+        priority=task_data.priority,
+        contact_id=task_data.contact_id,
+        recurrence=task_data.recurrence
     )
     session.add(task)
     session.commit()
+
+    if task.recurrence:
+        # Create the occurrences inside the window now rather than on the next list
+        materialize(session, user_id=current_user.id)
     session.refresh(task)
 
     return task
 
 
-@router.get("/", response_model=List[TaskResponse])
+# materialize_tasks runs first so occurrences it creates are reflected in the ETag
+@router.get(
+    "/",
+    response_model=List[TaskResponse],
+    dependencies=[Depends(materialize_tasks), Depends(conditional_get("tasks"))]
+)
 def list_tasks(
+    response: Response,
     area_id: Optional[int] = Query(None, description="Filter by life area ID"),
     status: Optional[TaskStatus] = Query(None, description="Filter by status"),
+    series: bool = Query(False, description="List recurring series instead of tasks and occurrences"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     List all tasks for the current user.
 
+    Recurring tasks appear as their occurrences, which exist from today up to
+    RECURRENCE_WINDOW_DAYS ahead; pass series=true for the series themselves.
+
     Optional filters:
     - **area_id**: Filter by life area (1-8)
     - **status**: Filter by todo, doing, or done
     """
     # Build query
     statement = select(Task).where(Task.user_id == current_user.id)
+    statement = statement.where(Task.recurrence.is_not(None) if series else Task.recurrence.is_(None))
 
     if area_id is not None:
         statement = statement.where(Task.area_id == area_id)
@@ -76,6 +101,34 @@ def list_tasks(
     # Order by priority (nulls last), then by created_at
     statement = statement.order_by(Task.priority.asc(), Task.created_at.desc())
 
+    if FAST_JSON_LISTS:
+        # Serialize straight from row tuples, skipping ORM instances and response models
+        areas = area_lookup(session)
+        rows = session.execute(statement.with_only_columns(
+            Task.id, Task.title, Task.description, Task.status, Task.priority, Task.due_date,
+            Task.area_id, Task.contact_id, Task.created_at, Task.updated_at, Task.completed_at,
+            Task.recurrence, Task.recurrence_id, Task.version
+        )).all()
+        return fast_json_response([
+            {
+                "id": row.id,
+                "title": row.title,
+                "description": row.description,
+                "status": row.status,
+                "priority": row.priority,
+                "due_date": row.due_date,
+                "area": areas.get(row.area_id),
+                "contact_id": row.contact_id,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+                "completed_at": row.completed_at,
+                "recurrence": row.recurrence,
+                "recurrence_id": row.recurrence_id,
+                "version": row.version,
+            }
+            for row in rows
+        ], response)
+
     tasks = session.exec(statement).all()
     return tasks
 
@@ -83,6 +136,8 @@ def list_tasks(
 @router.get("/{task_id}", response_model=TaskResponse)
 def get_task(
     task_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -102,6 +157,8 @@ def get_task(
             detail="Not authorized to access this task"
         )
 
+    check_not_modified(request, response, row_etag(task))
+
     return task
 
 
@@ -109,6 +166,8 @@ def get_task(
 def update_task(
     task_id: int,
     task_data: TaskUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag from a previous read; fails with 412 if the row changed since"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -121,6 +180,10 @@ def update_task(
     - todo -> doing -> done (typical workflow)
     - Can transition directly from todo -> done
     - Can move back from done -> doing or doing -> todo
+
+    Editing a series (rule, due date or any copied field) regenerates its
+    upcoming occurrences; ones already edited or started are kept. Marking a
+    series done stops it.
     """
     task = session.get(Task, task_id)
     if not task:
@@ -135,9 +198,18 @@ def update_task(
             detail="Not authorized to update this task"
         )
 
+    check_if_match(if_match, task)
+
     # Update fields
     update_data = task_data.model_dump(exclude_unset=True)
 
+    error = task_update_error(task, update_data)
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+
     # Validate area_id if provided
     if "area_id" in update_data:
         area = session.get(LifeArea, update_data["area_id"])
@@ -147,14 +219,18 @@ def update_task(
                 detail=f"Life area with id {update_data['area_id']} not found"
             )
 
-    for key, value in update_data.items():
-        setattr(task, key, value)
+    apply_task_update(session, task, update_data)
 
     task.updated_at = datetime.utcnow()
     session.add(task)
     session.commit()
+
+    if task.recurrence is not None:
+        materialize(session, user_id=current_user.id)
     session.refresh(task)
 
+    response.headers["ETag"] = row_etag(task)
+
     return task
 
 
@@ -166,6 +242,9 @@ def delete_task(
 ):
     """
     Delete a task.
+
+    Deleting a series also removes its upcoming occurrences that were never
+    edited; the others stay as plain tasks.
     """
     task = session.get(Task, task_id)
     if not task:
@@ -180,6 +259,7 @@ def delete_task(
             detail="Not authorized to delete this task"
         )
 
+    before_task_delete(session, task)
     session.delete(task)
     session.commit()
 
@@ -0,0 +1,345 @@
+"""
+Periodic background jobs, run by an asyncio loop started from main.lifespan.
+
+Jobs register with @scheduled_job(name, schedule). A schedule is a five-field
+cron expression in UTC ("30 2 * * *"), one of the aliases @hourly, @daily
+(@midnight), @weekly, @monthly and @yearly, or "@every <seconds>". Job
+functions are plain blocking functions; they run in the threadpool.
+
+Every worker runs the loop, but each job has a row in scheduled_jobs and a
+run starts only in the worker whose conditional UPDATE takes the row's lease
+(the DB lock that elects one runner per job, on SQLite and PostgreSQL alike).
+The lease is renewed while the job runs. next_run_at moves forward only when
+a run succeeds: a failed run is retried after SCHEDULER_RETRY_SECONDS, and a
+run whose worker died is picked up again by another one once the lease
+lapses. Every scheduled run therefore happens at least once, so jobs must be
+idempotent. Runs missed while no worker was up are coalesced into one.
+
+Run durations, lag behind the scheduled time and outcomes go to /metrics.
+"""
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+import asyncio
+import os
+import socket
+import time
+import uuid
+
+from .db import engine
+from .models import ScheduledJob
+from .metrics import record_job_run
+
+# Run the scheduler loop in this process (false: jobs only run in other workers or not at all)
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# How often each worker looks for due jobs (seconds); bounds the lag of a run
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", "15"))
+
+# A lease not renewed for this long is considered abandoned and the job runs again
+SCHEDULER_LEASE_SECONDS = int(os.getenv("SCHEDULER_LEASE_SECONDS", "300"))
+
+# Delay before a failed run is retried
+SCHEDULER_RETRY_SECONDS = int(os.getenv("SCHEDULER_RETRY_SECONDS", "300"))
+
+# Identifies this process in lease_owner
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# (low, high) per cron field: minute, hour, day of month, month, day of week (0 and 7 are Sunday)
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+# ==================== SCHEDULES ====================
+
+def _cron_field(text: str, low: int, high: int) -> FrozenSet[int]:
+    """Parse one cron field: *, n, a-b, with an optional /step, comma-separated"""
+    values = set()
+    for part in text.split(","):
+        spec, _, step_text = part.partition("/")
+        step = int(step_text) if step_text.isdigit() else None
+        if step_text and not step:
+            raise ValueError(f"Invalid step in cron field {text!r}")
+        if spec == "*":
+            first, last = low, high
+        elif "-" in spec:
+            first_text, _, last_text = spec.partition("-")
+            if not (first_text.isdigit() and last_text.isdigit()):
+                raise ValueError(f"Invalid range in cron field {text!r}")
+            first, last = int(first_text), int(last_text)
+        elif spec.isdigit():
+            first = last = int(spec)
+            if step:
+                last = high
+        else:
+            raise ValueError(f"Invalid cron field {text!r}")
+        if not low <= first <= last <= high:
+            raise ValueError(f"Cron field {text!r} is outside {low}-{high}")
+        values.update(range(first, last + 1, step or 1))
+    return frozenset(values)
+
+
+class Schedule:
+    """A parsed schedule; next_after() gives the first run time strictly after a moment (UTC, naive)"""
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        text = ALIASES.get(self.expression.lower(), self.expression)
+        self.every: Optional[timedelta] = None
+        if text.lower().startswith("@every"):
+            seconds = text[len("@every"):].strip().rstrip("s")
+            if not seconds.isdigit() or int(seconds) <= 0:
+                raise ValueError(f"Invalid schedule {expression!r} (expected @every <seconds>)")
+            self.every = timedelta(seconds=int(seconds))
+            return
+
+        fields = text.split()
+        if len(fields) != 5:
+            raise ValueError(f"Invalid schedule {expression!r} (expected five cron fields or an @alias)")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _cron_field(field, low, high) for field, (low, high) in zip(fields, FIELD_RANGES)
+        )
+        # Cron counts Sunday as 0 (or 7), Python's weekday() as 6
+        self.weekdays = frozenset((day - 1) % 7 for day in weekdays)
+        # When both day fields are restricted a day matching either one runs, as in cron
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _day_matches(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        if self.any_day or self.any_weekday:
+            return day.day in self.days and day.weekday() in self.weekdays
+        return day.day in self.days or day.weekday() in self.weekdays
+
+    def next_after(self, moment: datetime) -> datetime:
+        if self.every is not None:
+            return moment + self.every
+
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Long enough for any valid expression, including 29 February
+        limit = candidate + timedelta(days=366 * 8)
+        while candidate < limit:
+            if not self._day_matches(candidate.date()):
+                candidate = datetime.combine(candidate.date() + timedelta(days=1), datetime.min.time())
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Schedule {self.expression!r} never runs")
+
+
+# ==================== REGISTRY ====================
+
+class Job(NamedTuple):
+    name: str
+    schedule: Schedule
+    func: Callable[[], object]
+
+
+JOBS: Dict[str, Job] = {}
+
+
+def scheduled_job(name: str, schedule: str):
+    """
+    Register a blocking function to run on a schedule (at least once per scheduled time).
+
+    Usage:
+        @scheduled_job("nightly_cleanup", "@daily")
+        def nightly_cleanup() -> int: ...
+
+    A truthy return value is logged with the run.
+    """
+    parsed = Schedule(schedule)
+
+    def register(func: Callable[[], object]):
+        if name in JOBS:
+            raise ValueError(f"Scheduled job {name!r} is already registered")
+        JOBS[name] = Job(name, parsed, func)
+        return func
+    return register
+
+
+# ==================== JOB TABLE ====================
+
+def sync_jobs(now: Optional[datetime] = None):
+    """
+    Make sure every registered job has its row; a changed schedule takes effect from now.
+
+    Rows of jobs no longer registered are left alone and never claimed.
+    """
+    now = now or datetime.utcnow()
+    table = ScheduledJob.__table__
+    with engine.connect() as connection:
+        stored = dict(connection.execute(select(table.c.name, table.c.schedule)).all())
+    for job in JOBS.values():
+        if stored.get(job.name) == job.schedule.expression:
+            continue
+        with engine.begin() as connection:
+            if job.name in stored:
+                connection.execute(
+                    update(table).where(table.c.name == job.name)
+                    .values(schedule=job.schedule.expression, next_run_at=job.schedule.next_after(now))
+                )
+                continue
+            try:
+                connection.execute(insert(table).values(
+                    name=job.name, schedule=job.schedule.expression, next_run_at=job.schedule.next_after(now),
+                    run_count=0, failure_count=0,
+                ))
+            except IntegrityError:
+                pass  # another worker starting at the same moment inserted it
+
+
+def _lease_free(now: datetime):
+    table = ScheduledJob.__table__
+    return or_(table.c.lease_expires_at.is_(None), table.c.lease_expires_at < now)
+
+
+def claim_due_jobs(names: List[str], now: Optional[datetime] = None) -> List[Tuple[str, datetime]]:
+    """
+    Take the lease of every job in `names` that is due and not leased elsewhere.
+
+    One indexed SELECT per poll; a conditional UPDATE per due job decides which
+    worker gets it. Returns (name, scheduled time) for the jobs this worker won.
+    """
+    if not names:
+        return []
+    now = now or datetime.utcnow()
+    table = ScheduledJob.__table__
+    claimed = []
+    with engine.begin() as connection:
+        due = connection.execute(
+            select(table.c.name, table.c.next_run_at)
+            .where(table.c.next_run_at <= now, table.c.name.in_(names), _lease_free(now))
+        ).all()
+        for name, next_run_at in due:
+            won = connection.execute(
+                update(table)
+                .where(table.c.name == name, table.c.next_run_at == next_run_at, _lease_free(now))
+                .values(
+                    lease_owner=WORKER_ID,
+                    lease_expires_at=now + timedelta(seconds=SCHEDULER_LEASE_SECONDS),
+                    last_started_at=now,
+                )
+            ).rowcount
+            if won:
+                claimed.append((name, next_run_at))
+    return claimed
+
+
+def renew_lease(name: str) -> bool:
+    """Push this worker's lease on a running job forward; False if it was lost"""
+    table = ScheduledJob.__table__
+    with engine.begin() as connection:
+        return connection.execute(
+            update(table)
+            .where(table.c.name == name, table.c.lease_owner == WORKER_ID)
+            .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=SCHEDULER_LEASE_SECONDS))
+        ).rowcount == 1
+
+
+def finish_run(name: str, next_run_at: datetime, duration: float, error: Optional[str]) -> bool:
+    """Record a run's outcome and release the lease; False if another worker had taken the job over"""
+    table = ScheduledJob.__table__
+    with engine.begin() as connection:
+        return connection.execute(
+            update(table)
+            .where(table.c.name == name, table.c.lease_owner == WORKER_ID)
+            .values(
+                next_run_at=next_run_at,
+                lease_owner=None,
+                lease_expires_at=None,
+                last_finished_at=datetime.utcnow(),
+                last_status="failed" if error else "ok",
+                last_error=error[:500] if error else None,
+                last_duration_ms=round(duration * 1000, 1),
+                run_count=table.c.run_count + 1,
+                failure_count=table.c.failure_count + (1 if error else 0),
+            )
+        ).rowcount == 1
+
+
+def run_now(name: str) -> bool:
+    """Make a job due immediately (it starts on the next poll); False for an unknown job"""
+    table = ScheduledJob.__table__
+    with engine.begin() as connection:
+        return connection.execute(
+            update(table).where(table.c.name == name).values(next_run_at=datetime.utcnow())
+        ).rowcount == 1
+
+
+# ==================== LOOP ====================
+
+async def _keep_lease(name: str):
+    while True:
+        await asyncio.sleep(SCHEDULER_LEASE_SECONDS / 3)
+        if not await run_in_threadpool(renew_lease, name):
+            print(f"[SCHEDULER] Lost the lease on {name}; another worker may run it again")
+            return
+
+
+async def _run(job: Job, scheduled_at: datetime):
+    started_at = datetime.utcnow()
+    lag = max(0.0, (started_at - scheduled_at).total_seconds())
+    started = time.perf_counter()
+    keeper = asyncio.create_task(_keep_lease(job.name))
+    error = None
+    try:
+        result = await run_in_threadpool(job.func)
+    except Exception as e:  # recorded on the row; the run is retried
+        result = None
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        keeper.cancel()
+    duration = time.perf_counter() - started
+
+    if error:
+        next_run_at = started_at + timedelta(seconds=SCHEDULER_RETRY_SECONDS)
+        print(f"[SCHEDULER] {job.name} failed after {duration:.2f}s, retrying at {next_run_at:%H:%M:%S}: {error}")
+    else:
+        # The first scheduled time after this run started: missed runs collapse into this one
+        next_run_at = job.schedule.next_after(started_at)
+        print(f"[SCHEDULER] {job.name} finished in {duration:.2f}s" + (f" ({result})" if result else ""))
+    if not await run_in_threadpool(finish_run, job.name, next_run_at, duration, error):
+        print(f"[SCHEDULER] {job.name} finished without its lease; the result was not recorded")
+    record_job_run(job.name, "failed" if error else "ok", duration, lag)
+
+
+async def run_scheduler(poll_seconds: float = SCHEDULER_POLL_SECONDS):
+    """Background loop started from main.lifespan: runs due jobs this worker wins the lease for"""
+    try:
+        await run_in_threadpool(sync_jobs)
+    except Exception as e:
+        print(f"[SCHEDULER] Could not register jobs, scheduler not started: {e}")
+        return
+
+    running: Dict[str, asyncio.Task] = {}
+    try:
+        while True:
+            try:
+                idle = [name for name in JOBS if name not in running]
+                for name, scheduled_at in await run_in_threadpool(claim_due_jobs, idle):
+                    task = asyncio.create_task(_run(JOBS[name], scheduled_at))
+                    running[name] = task
+                    task.add_done_callback(lambda _, name=name: running.pop(name, None))
+            except Exception as e:  # keep polling; the database may be back next time
+                print(f"[SCHEDULER] Poll failed: {e}")
+            await asyncio.sleep(poll_seconds)
+    finally:
+        # Interrupted runs keep their lease until it lapses, then run again elsewhere
+        for task in running.values():
+            task.cancel()
@@ -1,11 +1,14 @@
 """Pydantic schemas for request/response validation"""
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+from typing import Optional, List, Any, Dict
 from datetime import datetime, date
+from enum import Enum
 from .models import (
     LifeAreaEnum, GoalTimeframe, GoalStatus, HabitType, TaskStatus, TaskPriority,
     ReferenceType, LawLevel, HealthCatalogType, FinancialAccountType
 )
+from .recurrence import normalize_rrule
+from .streaks import normalize_timezone
 
 
 # ==================== AUTH SCHEMAS ====================
@@ -16,6 +19,24 @@ class UserCreate(BaseModel):
     password: str = Field(..., min_length=8)
     email: Optional[str] = None
     full_name: Optional[str] = None
+    timezone: str = Field("UTC", max_length=64, description='IANA timezone, e.g. "America/Chicago"')
+
+    @field_validator("timezone")
+    @classmethod
+    def check_timezone(cls, value: str) -> str:
+        return normalize_timezone(value)
+
+
+class UserUpdate(BaseModel):
+    """Schema for updating the current user's profile"""
+    email: Optional[str] = None
+    full_name: Optional[str] = None
+    timezone: Optional[str] = Field(None, max_length=64)
+
+    @field_validator("timezone")
+    @classmethod
+    def check_timezone(cls, value: Optional[str]) -> Optional[str]:
+        return None if value is None else normalize_timezone(value)
 
 
 class LoginRequest(BaseModel):
@@ -30,6 +51,7 @@ class UserResponse(BaseModel):
     username: str
     email: Optional[str]
     full_name: Optional[str]
+    timezone: str
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -84,6 +106,7 @@ class GoalResponse(BaseModel):
     contact_id: Optional[int]
     created_at: datetime
     updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -122,6 +145,18 @@ class HabitCheckInResponse(BaseModel):
     message: str
 
 
+class HabitCheckinRecord(BaseModel):
+    """Schema for a stored habit check-in (delta sync)"""
+    id: int
+    habit_id: int
+    checkin_date: date
+    notes: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class HabitResponse(BaseModel):
     """Schema for habit response"""
     id: int
@@ -135,6 +170,7 @@ class HabitResponse(BaseModel):
     areas: List[LifeAreaResponse]
     created_at: datetime
     updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -150,6 +186,12 @@ class TaskCreate(BaseModel):
     priority: TaskPriority = TaskPriority.MEDIUM
     due_date: Optional[date] = None
     contact_id: Optional[int] = None
+    recurrence: Optional[str] = Field(None, max_length=200, description='RRULE subset, e.g. "FREQ=WEEKLY;BYDAY=MO"')
+
+    @field_validator("recurrence")
+    @classmethod
+    def check_recurrence(cls, value: Optional[str]) -> Optional[str]:
+        return None if value is None else normalize_rrule(value)
 
 
 class TaskUpdate(BaseModel):
@@ -160,6 +202,12 @@ class TaskUpdate(BaseModel):
     priority: Optional[TaskPriority] = None
     due_date: Optional[date] = None
     contact_id: Optional[int] = None
+    recurrence: Optional[str] = Field(None, max_length=200)
+
+    @field_validator("recurrence")
+    @classmethod
+    def check_recurrence(cls, value: Optional[str]) -> Optional[str]:
+        return None if value is None else normalize_rrule(value)
 
 
 class TaskResponse(BaseModel):
@@ -175,6 +223,9 @@ class TaskResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime]
+    recurrence: Optional[str] = None
+    recurrence_id: Optional[int] = None
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -218,6 +269,7 @@ class ContactResponse(BaseModel):
     areas: List[LifeAreaResponse]
     created_at: datetime
     updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -279,6 +331,7 @@ class ReferenceResponse(BaseModel):
     areas: List[LifeAreaResponse]
     created_at: datetime
     updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -333,6 +386,7 @@ class HealthCatalogResponse(BaseModel):
     notes: Optional[str]
     created_at: datetime
     updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -381,6 +435,7 @@ class FinancialAccountResponse(BaseModel):
     notes: Optional[str]
     created_at: datetime
     updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -407,14 +462,135 @@ class EntryResponse(BaseModel):
     id: int
     title: Optional[str]
     content: str
+    excerpt: str
+    word_count: int
     area: LifeAreaResponse
     entry_date: date
     created_at: datetime
     updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class EntrySummaryResponse(BaseModel):
+    """Schema for entries in lists: an excerpt instead of the content (GET /api/entries/{id} has it)"""
+    id: int
+    title: Optional[str]
+    excerpt: str
+    word_count: int
+    area: LifeAreaResponse
+    entry_date: date
+    created_at: datetime
+    updated_at: datetime
+    version: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class EntryStatsGroup(str, Enum):
+    """Bucket size for entry statistics"""
+    DAY = "day"
+    WEEK = "week"    # ISO weeks, starting Monday
+    MONTH = "month"
+
+
+class EntryStatsCount(BaseModel):
+    """Entry and word totals"""
+    entries: int
+    words: int
+
+
+class EntryStatsPeriod(EntryStatsCount):
+    """Totals for one day, week or month, with a breakdown by life area name"""
+    period: date  # first day of the bucket
+    areas: Dict[str, EntryStatsCount]
+
+
+class EntryStatsResponse(BaseModel):
+    """Schema for entry statistics; periods without entries are omitted"""
+    start_date: date
+    end_date: date
+    group: EntryStatsGroup
+    total: EntryStatsCount
+    areas: Dict[str, EntryStatsCount]
+    periods: List[EntryStatsPeriod]
+
+
+# ==================== AGENDA SCHEMAS ====================
+
+class AgendaItemType(str, Enum):
+    """Sources merged into the agenda"""
+    TASK = "task"
+    GOAL = "goal"
+    LIABILITY = "liability"
+
+
+class AgendaItem(BaseModel):
+    """One dated item; fields that do not apply to its type are null"""
+    due_date: date
+    type: AgendaItemType
+    id: int
+    title: str
+    status: Optional[str] = None
+    area: Optional[LifeAreaResponse] = None
+    priority: Optional[TaskPriority] = None
+    progress_percentage: Optional[int] = None
+    current_balance: Optional[float] = None
+    series_id: Optional[int] = None  # recurring task series the item belongs to
+    projected: bool = False  # an occurrence beyond the created window; `id` is then the series
+
+
+class AgendaResponse(BaseModel):
+    """Schema for the agenda, ordered by date"""
+    start_date: date
+    end_date: date
+    items: List[AgendaItem]
+
+
+# ==================== CALENDAR SCHEMAS ====================
+
+class CalendarFeedResponse(BaseModel):
+    """A new calendar feed URL; the token is not shown again"""
+    token: str
+    url: str
+
+
+# ==================== NOTIFICATION SCHEMAS ====================
+
+class DigestBirthday(BaseModel):
+    """A contact's birthday within the digest window"""
+    contact_id: int
+    name: str
+    date: date
+    turns: int
+
+
+class DigestTask(BaseModel):
+    """An open task due on or before the digest date"""
+    id: int
+    title: str
+    due_date: date
+    overdue: bool
+
+
+class DigestHabit(BaseModel):
+    """A habit not yet checked in on the digest date"""
+    id: int
+    name: str
+    current_streak: int
+
+
+class DigestResponse(BaseModel):
+    """Schema for a user's daily reminder digest; lists are capped, counts are not"""
+    date: date
+    birthdays: List[DigestBirthday]
+    tasks: List[DigestTask]
+    task_count: int
+    habits: List[DigestHabit]
+    habit_count: int
+
+
 # ==================== CONFLICT TOPIC SCHEMAS ====================
 
 class ConflictTopicCreate(BaseModel):
@@ -442,6 +618,7 @@ class ConflictTopicResponse(BaseModel):
     progress_notes: Optional[str]
     created_at: datetime
     updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -454,6 +631,8 @@ class AIVerseResponse(BaseModel):
     text: str
     area: str
     generated_at: datetime
+    # cache, provider, coalesced or fallback (static content; see ai_client.py)
+    source: str = "fallback"
 
 
 class AIInsightResponse(BaseModel):
@@ -461,3 +640,56 @@ class AIInsightResponse(BaseModel):
     insight: str
     area: str
     generated_at: datetime
+    source: str = "fallback"
+
+
+# ==================== BATCH SCHEMAS ====================
+
+# Upper bound on operations accepted by a single batch request
+MAX_BATCH_OPERATIONS = 100
+
+
+class BatchOp(str, Enum):
+    """Batch operation kinds"""
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class BatchOperation(BaseModel):
+    """A single create/update/delete inside a batch request"""
+    op: BatchOp
+    id: Optional[int] = None
+    data: Optional[Dict[str, Any]] = None
+    version: Optional[int] = None  # Expected row version for update/delete (412 on mismatch)
+
+
+class BatchRequest(BaseModel):
+    """Schema for a batch of operations against one resource"""
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=MAX_BATCH_OPERATIONS)
+    atomic: bool = True
+
+
+class BatchItemResult(BaseModel):
+    """Per-operation outcome of a batch request"""
+    index: int
+    op: BatchOp
+    id: Optional[int]
+    status: int
+    detail: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Schema for batch response"""
+    committed: bool
+    results: List[BatchItemResult]
+
+
+# ==================== SYNC SCHEMAS ====================
+
+class SyncResponse(BaseModel):
+    """Schema for delta sync response"""
+    token: str
+    reset: bool
+    changes: Dict[str, List[Dict[str, Any]]]
+    deleted: Dict[str, List[int]]
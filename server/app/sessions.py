@@ -0,0 +1,540 @@
+"""Server-side sessions: opaque cookie tokens, an in-process LRU in front of a shared store"""
+from sqlalchemy import bindparam, delete, insert, select, update
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, NamedTuple, Optional
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+
+import orjson
+
+from .db import engine
+from .models import UserSession
+
+try:
+    import redis
+except ImportError:  # only needed for SESSION_BACKEND=redis
+    redis = None
+
+# Where sessions live: "db" (user_sessions table), "redis" (REDIS_URL) or
+# "memory" (in-process Redis stand-in; single worker only, lost on restart)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "db")
+
+# Sliding idle timeout, and the absolute lifetime no amount of activity extends past (seconds)
+SESSION_IDLE_TIMEOUT = int(os.getenv("SESSION_IDLE_TIMEOUT", "86400"))
+SESSION_MAX_LIFETIME = int(os.getenv("SESSION_MAX_LIFETIME", str(30 * 86400)))
+
+# Sessions kept in this process's LRU, and how long a cached entry is trusted before
+# re-reading the store (bounds how late other workers notice a logout-everywhere)
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "10"))
+
+# Sliding expiry is only pushed forward once a session has been idle-extended by at
+# least this much, and pending extensions are written in one batch at most this often
+SESSION_TOUCH_INTERVAL = float(os.getenv("SESSION_TOUCH_INTERVAL", "60"))
+SESSION_TOUCH_BATCH_SIZE = 500
+
+# How often the database backend deletes expired rows (seconds)
+SESSION_PURGE_INTERVAL = 3600
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class SessionRecord(NamedTuple):
+    """A stored session; times are Unix timestamps"""
+    user_id: Optional[int]
+    data: dict
+    created_at: float
+    expires_at: float
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    return EPOCH + timedelta(seconds=timestamp)
+
+
+def _to_timestamp(moment: datetime) -> float:
+    return (moment - EPOCH).total_seconds()
+
+
+# ==================== BACKENDS ====================
+
+class DatabaseSessionBackend:
+    """Sessions in the user_sessions table (shared by every worker on the same database)"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.table = UserSession.__table__
+
+    def load(self, key: str) -> Optional[SessionRecord]:
+        table = self.table
+        statement = select(table.c.user_id, table.c.data, table.c.created_at, table.c.expires_at).where(table.c.id == key)
+        with self.engine.connect() as connection:
+            row = connection.execute(statement).first()
+        if row is None:
+            return None
+        return SessionRecord(row.user_id, orjson.loads(row.data), _to_timestamp(row.created_at), _to_timestamp(row.expires_at))
+
+    def save(self, key: str, record: SessionRecord, new: bool = False):
+        values = {
+            "user_id": record.user_id,
+            "data": orjson.dumps(record.data).decode(),
+            "created_at": _to_datetime(record.created_at),
+            "expires_at": _to_datetime(record.expires_at),
+        }
+        with self.engine.begin() as connection:
+            if not new and connection.execute(update(self.table).where(self.table.c.id == key).values(**values)).rowcount:
+                return
+            connection.execute(insert(self.table).values(id=key, **values))
+
+    def delete(self, key: str):
+        with self.engine.begin() as connection:
+            connection.execute(delete(self.table).where(self.table.c.id == key))
+
+    def delete_user(self, user_id: int) -> int:
+        with self.engine.begin() as connection:
+            return connection.execute(delete(self.table).where(self.table.c.user_id == user_id)).rowcount
+
+    def extend(self, expiries: Dict[str, float]):
+        """Push several sessions' expiry forward in one executemany UPDATE"""
+        statement = (
+            update(self.table)
+            .where(self.table.c.id == bindparam("session_key"))
+            .values(expires_at=bindparam("new_expiry"))
+        )
+        params = [{"session_key": key, "new_expiry": _to_datetime(expiry)} for key, expiry in expiries.items()]
+        with self.engine.begin() as connection:
+            connection.execute(statement, params)
+
+    def purge_expired(self, now: float) -> int:
+        with self.engine.begin() as connection:
+            return connection.execute(delete(self.table).where(self.table.c.expires_at < _to_datetime(now))).rowcount
+
+
+class RedisSessionBackend:
+    """
+    Sessions in Redis (or anything speaking its commands, such as LocalRedis).
+
+    `session:<key>` holds the JSON record and expires with the session;
+    `session-user:<user_id>` is a set of the user's keys for logout-everywhere.
+    """
+
+    def __init__(self, client, prefix: str = "session:"):
+        self.client = client
+        self.prefix = prefix
+        self.user_prefix = prefix.rstrip(":") + "-user:"
+
+    def load(self, key: str) -> Optional[SessionRecord]:
+        pipeline = self.client.pipeline()
+        pipeline.get(self.prefix + key)
+        pipeline.ttl(self.prefix + key)
+        value, ttl = pipeline.execute()
+        if value is None or ttl is None or ttl < 0:
+            return None
+        stored = orjson.loads(value)
+        # Redis owns the expiry (extend() only moves the TTL), so derive it from there
+        return SessionRecord(stored["user_id"], stored["data"], stored["created_at"], time.time() + ttl)
+
+    def save(self, key: str, record: SessionRecord, new: bool = False):
+        value = orjson.dumps({"user_id": record.user_id, "data": record.data, "created_at": record.created_at})
+        ttl = max(1, int(record.expires_at - time.time()))
+        pipeline = self.client.pipeline()
+        pipeline.set(self.prefix + key, value, ex=ttl)
+        if record.user_id is not None:
+            user_key = f"{self.user_prefix}{record.user_id}"
+            pipeline.sadd(user_key, key)
+            pipeline.expire(user_key, SESSION_MAX_LIFETIME)
+        pipeline.execute()
+
+    def delete(self, key: str):
+        # The user's index keeps the stale member until it expires; delete_user() tolerates that
+        self.client.delete(self.prefix + key)
+
+    def delete_user(self, user_id: int) -> int:
+        user_key = f"{self.user_prefix}{user_id}"
+        keys = [member.decode() if isinstance(member, bytes) else member for member in self.client.smembers(user_key)]
+        pipeline = self.client.pipeline()
+        for key in keys:
+            pipeline.delete(self.prefix + key)
+        pipeline.delete(user_key)
+        return sum(pipeline.execute()[:-1])
+
+    def extend(self, expiries: Dict[str, float]):
+        now = time.time()
+        pipeline = self.client.pipeline()
+        for key, expiry in expiries.items():
+            pipeline.expire(self.prefix + key, max(1, int(expiry - now)))
+        pipeline.execute()
+
+
+class LocalRedis:
+    """
+    In-process stand-in for the few Redis commands RedisSessionBackend uses.
+
+    Values come back as bytes and missing keys as None, as with redis-py, so
+    the backend runs unchanged against this or a real server.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, object] = {}
+        self._expiry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, name: str) -> bool:
+        expiry = self._expiry.get(name)
+        if expiry is not None and expiry <= time.time():
+            self._values.pop(name, None)
+            self._expiry.pop(name, None)
+        return name in self._values
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            return self._values[name] if self._live(name) else None
+
+    def set(self, name: str, value, ex: Optional[int] = None) -> bool:
+        with self._lock:
+            self._values[name] = value if isinstance(value, bytes) else str(value).encode()
+            if ex is None:
+                self._expiry.pop(name, None)
+            else:
+                self._expiry[name] = time.time() + ex
+            return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            removed = sum(1 for name in names if self._live(name))
+            for name in names:
+                self._values.pop(name, None)
+                self._expiry.pop(name, None)
+            return removed
+
+    def expire(self, name: str, seconds: int) -> bool:
+        with self._lock:
+            if not self._live(name):
+                return False
+            self._expiry[name] = time.time() + seconds
+            return True
+
+    def ttl(self, name: str) -> int:
+        with self._lock:
+            if not self._live(name):
+                return -2
+            expiry = self._expiry.get(name)
+            return -1 if expiry is None else max(0, int(expiry - time.time()))
+
+    def sadd(self, name: str, *members: str) -> int:
+        with self._lock:
+            existing = self._values[name] if self._live(name) else self._values.setdefault(name, set())
+            added = len(set(members) - existing)
+            existing.update(members)
+            return added
+
+    def smembers(self, name: str) -> set:
+        with self._lock:
+            return {member.encode() for member in self._values[name]} if self._live(name) else set()
+
+    def pipeline(self, transaction: bool = True) -> "_LocalPipeline":
+        return _LocalPipeline(self)
+
+
+class _LocalPipeline:
+    """Queues LocalRedis calls and runs them on execute(), like a redis-py pipeline"""
+
+    def __init__(self, client: LocalRedis):
+        self._client = client
+        self._calls = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self._client, name)
+
+        def queue(*args, **kwargs):
+            self._calls.append((method, args, kwargs))
+            return self
+        return queue
+
+    def execute(self) -> list:
+        calls, self._calls = self._calls, []
+        return [method(*args, **kwargs) for method, args, kwargs in calls]
+
+
+def build_backend(name: str = SESSION_BACKEND):
+    """The backend selected by SESSION_BACKEND"""
+    if name == "db":
+        return DatabaseSessionBackend(engine)
+    if name == "memory":
+        return RedisSessionBackend(LocalRedis())
+    if name == "redis":
+        if redis is None:
+            raise RuntimeError("SESSION_BACKEND=redis needs the redis package (pip install redis)")
+        return RedisSessionBackend(redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    raise RuntimeError(f"Unknown SESSION_BACKEND {name!r} (expected db, redis or memory)")
+
+
+# ==================== STORE ====================
+
+class SessionStore:
+    """
+    LRU cache in front of a session backend, with batched sliding expiry.
+
+    Cache hits cost a dict lookup. Entries are re-read from the backend after
+    `cache_ttl` seconds, so a logout-everywhere issued by another worker takes
+    effect within that window (immediately in the worker that handled it).
+    Expiry extensions are queued and written together by flush(); a crash
+    loses at most one flush interval of extension, never a session.
+    """
+
+    def __init__(
+        self,
+        backend,
+        cache_size: int = SESSION_CACHE_SIZE,
+        cache_ttl: float = SESSION_CACHE_TTL,
+        idle_timeout: int = SESSION_IDLE_TIMEOUT,
+        max_lifetime: int = SESSION_MAX_LIFETIME,
+        touch_interval: float = SESSION_TOUCH_INTERVAL,
+    ):
+        self.backend = backend
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.touch_interval = touch_interval
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (record, cached at, monotonic)
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._last_purge = 0.0
+
+    def _remember(self, key: str, record: SessionRecord):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[key] = (record, time.monotonic())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._cache.pop(key, None)
+            self._pending.pop(key, None)
+
+    def get_cached(self, key: str, now: float) -> Optional[SessionRecord]:
+        """The session from this process's cache, or None if it has to be loaded"""
+        entry = self._cache.get(key)
+        if entry is None or time.monotonic() - entry[1] > self.cache_ttl or entry[0].expires_at <= now:
+            return None
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+        return entry[0]
+
+    def load(self, key: str, now: float) -> Optional[SessionRecord]:
+        """Read a session from the backend (blocking); expired sessions are removed"""
+        record = self.backend.load(key)
+        if record is not None and record.expires_at <= now:
+            self.backend.delete(key)
+            record = None
+        if record is None:
+            self._forget(key)
+        else:
+            self._remember(key, record)
+        return record
+
+    def create(self, key: str, data: dict, now: float) -> SessionRecord:
+        """Store a new session (blocking)"""
+        record = SessionRecord(data.get("user_id"), dict(data), now, now + min(self.idle_timeout, self.max_lifetime))
+        self.backend.save(key, record, new=True)
+        self._remember(key, record)
+        return record
+
+    def update(self, key: str, record: SessionRecord, data: dict) -> SessionRecord:
+        """Replace a session's data, keeping its timestamps (blocking)"""
+        record = record._replace(user_id=data.get("user_id"), data=dict(data))
+        self.backend.save(key, record)
+        self._remember(key, record)
+        return record
+
+    def delete(self, key: str):
+        """Remove one session (blocking)"""
+        self._forget(key)
+        self.backend.delete(key)
+
+    def revoke_user(self, user_id: int) -> int:
+        """Remove every session of a user (blocking); returns how many the backend held"""
+        with self._lock:
+            stale = [key for key, (record, _) in self._cache.items() if record.user_id == user_id]
+        for key in stale:
+            self._forget(key)
+        return self.backend.delete_user(user_id)
+
+    def touch(self, key: str, record: SessionRecord, now: float) -> bool:
+        """
+        Slide a session's expiry after a request. Cheap: only queues the change.
+
+        Returns True when enough extensions are pending that flush() should run.
+        """
+        expires_at = min(now + self.idle_timeout, record.created_at + self.max_lifetime)
+        if expires_at - record.expires_at >= self.touch_interval:
+            with self._lock:
+                self._pending[key] = expires_at
+                entry = self._cache.get(key)
+                if entry is not None:
+                    self._cache[key] = (entry[0]._replace(expires_at=expires_at), entry[1])
+        if not self._pending:
+            return False
+        return len(self._pending) >= SESSION_TOUCH_BATCH_SIZE or time.monotonic() - self._last_flush >= self.touch_interval
+
+    def flush(self):
+        """Write queued expiry extensions in one batch and occasionally purge expired rows (blocking)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if pending:
+            self.backend.extend(pending)
+
+        purge = getattr(self.backend, "purge_expired", None)
+        if purge is not None and self._last_flush - self._last_purge >= SESSION_PURGE_INTERVAL:
+            self._last_purge = self._last_flush
+            removed = purge(time.time())
+            if removed:
+                print(f"[SESSION] Purged {removed} expired session(s)")
+
+
+session_store = SessionStore(build_backend())
+
+
+# ==================== MIDDLEWARE ====================
+
+class SessionData(dict):
+    """The `request.session` dict; remembers whether the request changed it"""
+
+    modified = False
+
+    def __setitem__(self, key, value):
+        self.modified = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.modified = True
+        super().__delitem__(key)
+
+    def clear(self):
+        self.modified = True
+        super().clear()
+
+    def pop(self, *args):
+        self.modified = True
+        return super().pop(*args)
+
+    def popitem(self):
+        self.modified = True
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.modified = True
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self.modified = True
+        super().update(*args, **kwargs)
+
+
+class ServerSessionMiddleware:
+    """
+    Drop-in replacement for Starlette's SessionMiddleware backed by a SessionStore.
+
+    The cookie holds a random token; the store is keyed by its HMAC under
+    `secret_key`, so a leaked store cannot be replayed as cookies. The cookie
+    is only written when a session starts, changes user (login rotates the
+    token) or ends; requests that merely read the session send no Set-Cookie.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: SessionStore,
+        secret_key: str,
+        session_cookie: str = "session",
+        path: str = "/",
+        same_site: str = "lax",
+        https_only: bool = False,
+    ):
+        self.app = app
+        self.store = store
+        self.secret_key = secret_key.encode()
+        self.session_cookie = session_cookie
+        self.cookie_flags = f"path={path}; httponly; samesite={same_site}" + ("; secure" if https_only else "")
+
+    def session_key(self, token: str) -> str:
+        return hmac.new(self.secret_key, token.encode(), hashlib.sha256).hexdigest()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        store = self.store
+        now = time.time()
+        token = HTTPConnection(scope).cookies.get(self.session_cookie)
+        key = self.session_key(token) if token else None
+        record = None
+        if key is not None:
+            record = store.get_cached(key, now)
+            if record is None:
+                record = await run_in_threadpool(store.load, key, now)
+
+        session = SessionData(record.data if record is not None else {})
+        scope["session"] = session
+        flush_due = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal flush_due
+            if message["type"] == "http.response.start":
+                cookie = None
+                if session.modified:
+                    cookie = await self._commit(key, record, session, now)
+                elif record is not None:
+                    flush_due = store.touch(key, record, now)
+                elif token:
+                    # Unknown, expired or revoked session: stop sending the cookie
+                    cookie = self._cookie("", 0)
+                if cookie is not None:
+                    MutableHeaders(scope=message).append("Set-Cookie", cookie)
+            await send(message)
+            if flush_due and message["type"] == "http.response.body" and not message.get("more_body", False):
+                # After the response is out, so no client waits on the batch write
+                flush_due = False
+                await run_in_threadpool(store.flush)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _commit(self, key: Optional[str], record: Optional[SessionRecord], session: SessionData, now: float) -> Optional[str]:
+        """Persist a changed session; returns the Set-Cookie value, if the cookie changes"""
+        store = self.store
+        if not session:
+            if record is not None:
+                await run_in_threadpool(store.delete, key)
+            return self._cookie("", 0) if key is not None else None
+
+        if record is not None and record.user_id == session.get("user_id"):
+            await run_in_threadpool(store.update, key, record, session)
+            return None
+
+        # New session, or a different user on this browser: issue a fresh token
+        # (never reuse one the client presented before logging in)
+        if record is not None:
+            await run_in_threadpool(store.delete, key)
+        token = secrets.token_urlsafe(32)
+        await run_in_threadpool(store.create, self.session_key(token), session, now)
+        return self._cookie(token, store.max_lifetime)
+
+    def _cookie(self, value: str, max_age: int) -> str:
+        return f"{self.session_cookie}={value}; Max-Age={max_age}; {self.cookie_flags}"
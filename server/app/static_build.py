@@ -0,0 +1,133 @@
+"""
+Build fingerprinted, precompressed frontend assets.
+
+Usage (from the repository root):
+    python -m server.app.static_build [--source frontend] [--out frontend/dist]
+
+Copies every CSS/JS file to a content-hashed name (css/styles.3f2a9c0b1d.css),
+writes .gz and .br siblings next to each text asset, rewrites index.html to
+point at the hashed names and records the mapping in manifest.json. Hashed
+files never change, so they can be cached for a year; index.html and the
+manifest are served with "no-cache" so a deploy is picked up immediately.
+"""
+from pathlib import Path
+from typing import Dict, Optional
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:  # .br siblings are skipped without it
+    brotli = None
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+FRONTEND_DIR = SERVER_DIR.parent / "frontend"
+DIST_DIR = FRONTEND_DIR / "dist"
+
+# Assets that get a content hash in their name
+FINGERPRINTED_SUFFIXES = {".css", ".js"}
+
+# Assets worth shipping precompressed siblings for
+COMPRESSED_SUFFIXES = {".css", ".js", ".html", ".json", ".svg", ".txt"}
+
+# Matches the 10 hex digit hash this script inserts, e.g. app.0123456789.js
+HASHED_NAME = re.compile(r"\.[0-9a-f]{10}\.[A-Za-z0-9]+$")
+
+MANIFEST_NAME = "manifest.json"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def hashed_name(relative: Path, data: bytes) -> Path:
+    """css/styles.css -> css/styles.<hash>.css"""
+    return relative.with_name(f"{relative.stem}.{content_hash(data)}{relative.suffix}")
+
+
+def is_fingerprinted(path: str) -> bool:
+    """True for file names produced by hashed_name()"""
+    return bool(HASHED_NAME.search(path))
+
+
+def write_compressed(path: Path, data: bytes):
+    """Write .gz and .br siblings at maximum compression (this runs once per deploy)"""
+    # mtime=0 keeps the output byte-identical between builds
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(data, quality=11))
+
+
+def _rewrite_references(html: str, manifest: Dict[str, str]) -> str:
+    """Point href/src attributes at the hashed file names"""
+    def replace(match):
+        target = manifest.get(match.group(2))
+        return f'{match.group(1)}="{target}"' if target else match.group(0)
+
+    return re.sub(r'\b(href|src)="([^"#?:]+)"', replace, html)
+
+
+def build(source: Path = FRONTEND_DIR, out: Path = DIST_DIR) -> Dict[str, str]:
+    """Build the asset tree into `out` and return the logical -> hashed name manifest"""
+    if out.exists():
+        shutil.rmtree(out)
+    out.mkdir(parents=True)
+
+    manifest: Dict[str, str] = {}
+    html_files = []
+    for path in sorted(source.rglob("*")):
+        if not path.is_file() or out in path.parents or DIST_DIR in path.parents:
+            continue
+        relative = path.relative_to(source)
+        if path.suffix == ".html":
+            html_files.append(relative)
+            continue
+
+        data = path.read_bytes()
+        target = hashed_name(relative, data) if path.suffix in FINGERPRINTED_SUFFIXES else relative
+        manifest[relative.as_posix()] = target.as_posix()
+        destination = out / target
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.write_bytes(data)
+        if path.suffix in COMPRESSED_SUFFIXES:
+            write_compressed(destination, data)
+
+    for relative in html_files:
+        html = _rewrite_references((source / relative).read_text(encoding="utf-8"), manifest)
+        destination = out / relative
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        data = html.encode("utf-8")
+        destination.write_bytes(data)
+        write_compressed(destination, data)
+
+    manifest_data = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+    (out / MANIFEST_NAME).write_bytes(manifest_data)
+    return manifest
+
+
+def load_manifest(directory: Path) -> Optional[Dict[str, str]]:
+    """Return the manifest of a built asset tree, or None if it has not been built"""
+    path = directory / MANIFEST_NAME
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build fingerprinted, precompressed frontend assets")
+    parser.add_argument("--source", type=Path, default=FRONTEND_DIR)
+    parser.add_argument("--out", type=Path, default=DIST_DIR)
+    args = parser.parse_args()
+
+    manifest = build(args.source, args.out)
+    print(f"[STATIC] Built {len(manifest)} assets into {args.out}")
+    for logical, hashed in sorted(manifest.items()):
+        print(f"[STATIC]   {logical} -> {hashed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Habit streak rollover: zero the streaks of "gain" habits whose day passed without a check-in.
+
+A check-in only updates its own habit, so without this a streak missed for a
+week would still show until the next check-in. The streak_rollover job runs
+every HABIT_ROLLOVER_SCHEDULE and, per timezone bucket (all users whose
+local date is the same), breaks every stale streak with one UPDATE:
+
+    UPDATE habits SET current_streak = 0 ...
+    WHERE user_id IN (users in the bucket) AND habit_type = 'gain'
+      AND current_streak > 0 AND last_checkin_date < :cutoff
+
+where the cutoff is the bucket's yesterday (a habit checked in yesterday can
+still be continued today). At any moment there are at most three local dates
+in use, so a pass is a handful of statements however many users there are,
+and a partial index keeps them to live streaks. Habit reads just return
+current_streak; they never compute dates per row.
+
+"Lose" habits are left alone: for them a day without a check-in is the goal.
+"""
+from sqlalchemy import and_, distinct, select, update
+from sqlmodel import Session
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import os
+
+from .db import engine
+from .models import Habit, HabitType, User
+from .etags import bump_resource_versions_for
+from .scheduler import scheduled_job
+
+# When the rollover runs (UTC cron). Every 15 minutes catches each timezone's
+# midnight, including the :30 and :45 offsets, shortly after it happens.
+HABIT_ROLLOVER_SCHEDULE = os.getenv("HABIT_ROLLOVER_SCHEDULE", "*/15 * * * *")
+
+DEFAULT_TIMEZONE = "UTC"
+
+
+def normalize_timezone(name: str) -> str:
+    """Validate an IANA timezone name ("Europe/Berlin"); raises ValueError for unknown ones"""
+    name = name.strip()
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone {name!r} (expected an IANA name such as 'America/New_York')")
+    return name
+
+
+def local_now(tz_name: Optional[str], now: Optional[datetime] = None) -> datetime:
+    """The current time in a user's timezone (UTC for unknown names)"""
+    now = now or datetime.now(timezone.utc)
+    try:
+        zone = ZoneInfo(tz_name or DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        zone = timezone.utc
+    return now.astimezone(zone)
+
+
+def local_today(tz_name: Optional[str], now: Optional[datetime] = None) -> date:
+    """The current date in a user's timezone (UTC for unknown names)"""
+    return local_now(tz_name, now).date()
+
+
+def timezone_buckets(session: Session, now: Optional[datetime] = None) -> Dict[date, List[str]]:
+    """Users' timezones grouped by their current local date"""
+    buckets: Dict[date, List[str]] = {}
+    for name in session.execute(select(distinct(User.timezone))).scalars():
+        buckets.setdefault(local_today(name, now), []).append(name)
+    return buckets
+
+
+def roll_streaks(now: Optional[datetime] = None) -> int:
+    """Zero every broken streak, one UPDATE per timezone bucket; returns habits reset"""
+    reset = 0
+    with Session(engine) as session:
+        for today, zones in sorted(timezone_buckets(session, now).items()):
+            broken = and_(
+                Habit.user_id.in_(select(User.id).where(User.timezone.in_(zones))),
+                Habit.habit_type == HabitType.GAIN,
+                Habit.current_streak > 0,
+                Habit.last_checkin_date < today - timedelta(days=1),
+            )
+            # List ETags first, for exactly the users about to change
+            bump_resource_versions_for(session, "habits", select(Habit.user_id).where(broken))
+            reset += session.execute(
+                update(Habit.__table__)
+                .where(broken)
+                .values(current_streak=0, updated_at=datetime.utcnow(), version=Habit.version + 1)
+            ).rowcount
+        session.commit()
+    return reset
+
+
+scheduled_job("streak_rollover", HABIT_ROLLOVER_SCHEDULE)(roll_streaks)
@@ -0,0 +1,454 @@
+"""
+Reproducible API benchmark suite.
+
+Usage (from the repository root):
+    python -m server.benchmarks.bench_api [--profile realistic] [--requests 50] [--out results.json]
+    python -m server.benchmarks.bench_api --mode load [--workers 4] [--concurrency 32] [--duration 30]
+    python -m server.benchmarks.bench_api --diff baseline.json results.json
+
+Generates a synthetic dataset (see synthetic.py) into a scratch SQLite file,
+then drives every router:
+
+- inprocess: each scenario runs sequentially through an in-process ASGI
+  client (httpx.ASGITransport), so numbers reflect the app alone.
+- load: the app runs under uvicorn with --workers N and `concurrency` clients
+  send a weighted, read-heavy mix of the same scenarios over HTTP for
+  `duration` seconds.
+
+Results go to JSON (p50/p95/p99, RPS, errors and SQL queries per request,
+read from the Server-Timing header) tagged with the git commit, under
+server/benchmarks/results/ by default. --diff compares two result files.
+"""
+import argparse
+import asyncio
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import orjson
+
+from .synthetic import ANCHOR_DATE, DEFAULT_PASSWORD, PROFILES
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+BENCH_USER = "bench1"
+BENCH_SECRET = "benchmark-secret"
+
+# Changes beyond this (percent) are marked in --diff output
+DIFF_THRESHOLD = 10.0
+
+_DB_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+# ==================== SCENARIOS ====================
+
+class Context:
+    """Row IDs of the benchmark user plus a seeded RNG, used to build requests"""
+
+    def __init__(self, ids: Dict[str, List[int]], seed: int):
+        self.ids = ids
+        self.rng = random.Random(seed)
+        self.sync_token: Optional[str] = None
+        self.counter = 0
+
+    def pick(self, resource: str) -> int:
+        return self.rng.choice(self.ids[resource])
+
+    def next(self) -> int:
+        self.counter += 1
+        return self.counter
+
+
+Request = Tuple[str, str, Optional[dict]]
+
+
+class Scenario(NamedTuple):
+    """One request shape; weight is its share of the load-mode mix, max_requests caps heavy ones in-process"""
+    name: str
+    weight: int
+    build: Callable[[Context], Request]
+    max_requests: Optional[int] = None
+
+
+def _get(path: str) -> Callable[[Context], Request]:
+    return lambda ctx: ("GET", path, None)
+
+
+def _entries_month(ctx: Context) -> Request:
+    start = ANCHOR_DATE - timedelta(days=ctx.rng.randint(30, 3000))
+    return "GET", f"/api/entries/?start_date={start}&end_date={start + timedelta(days=30)}", None
+
+
+def _task_batch(ctx: Context) -> Request:
+    operations = [
+        {"op": "create", "data": {"title": f"Batch task {ctx.next()}", "area_id": ctx.rng.randint(1, 8)}}
+        for _ in range(20)
+    ]
+    return "POST", "/api/tasks:batch", {"operations": operations}
+
+
+SCENARIOS = [
+    Scenario("auth.me", 5, _get("/api/auth/me")),
+    Scenario("areas.list", 5, _get("/api/areas/")),
+    Scenario("ai.verse", 2, _get("/api/ai/verse?area=spiritual")),
+    Scenario("ai.insight", 2, _get("/api/ai/insight?area=physical_health")),
+    Scenario("goals.list", 5, _get("/api/goals/")),
+    Scenario("goals.get", 5, lambda ctx: ("GET", f"/api/goals/{ctx.pick('goals')}", None)),
+    Scenario("habits.list", 5, _get("/api/habits/")),
+    Scenario("habits.get", 3, lambda ctx: ("GET", f"/api/habits/{ctx.pick('habits')}", None)),
+    Scenario("tasks.list", 10, _get("/api/tasks/")),
+    Scenario("tasks.list_todo", 5, _get("/api/tasks/?status=todo")),
+    Scenario("tasks.get", 5, lambda ctx: ("GET", f"/api/tasks/{ctx.pick('tasks')}", None)),
+    Scenario("tasks.update", 3, lambda ctx: (
+        "PUT", f"/api/tasks/{ctx.pick('tasks')}", {"priority": ctx.rng.choice(("low", "medium", "high"))}
+    )),
+    Scenario("tasks.batch_create", 1, _task_batch, max_requests=10),
+    Scenario("contacts.list", 5, _get("/api/contacts/")),
+    Scenario("contacts.get", 3, lambda ctx: ("GET", f"/api/contacts/{ctx.pick('contacts')}", None)),
+    Scenario("contacts.birthday", 2, lambda ctx: ("GET", f"/api/contacts/{ctx.pick('birthdays')}/birthday", None)),
+    Scenario("references.list", 3, _get("/api/references/")),
+    Scenario("health.list", 3, _get("/api/health/")),
+    Scenario("finance.list", 3, _get("/api/finance/")),
+    Scenario("finance.summary", 3, _get("/api/finance/summary")),
+    Scenario("entries.list", 10, _get("/api/entries/")),
+    Scenario("entries.list_month", 5, _entries_month),
+    Scenario("entries.stats_year", 3, _get(f"/api/entries/stats?from={ANCHOR_DATE - timedelta(days=365)}&to={ANCHOR_DATE}")),
+    Scenario("entries.stats_monthly", 2, _get(f"/api/entries/stats?from={ANCHOR_DATE - timedelta(days=3650)}&to={ANCHOR_DATE}&group=month")),
+    Scenario("entries.get", 5, lambda ctx: ("GET", f"/api/entries/{ctx.pick('entries')}", None)),
+    Scenario("entries.create", 3, lambda ctx: (
+        "POST", "/api/entries/",
+        {"area_id": ctx.rng.randint(1, 8), "title": f"Bench {ctx.next()}", "content": "Benchmark entry. " * 20},
+    )),
+    Scenario("one_on_one.list", 2, _get("/api/one-on-one/")),
+    Scenario("sync.delta", 3, lambda ctx: ("GET", f"/api/sync/?since={ctx.sync_token}", None)),
+    Scenario("export.ndjson", 1, _get("/api/export/?format=ndjson"), max_requests=5),
+    Scenario("metrics.scrape", 1, _get("/metrics")),
+    Scenario("admin.queries", 1, _get("/api/admin/queries?limit=20")),
+]
+
+
+# ==================== MEASUREMENT ====================
+
+def _queries(response) -> int:
+    match = _DB_QUERIES.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else 0
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    """Latencies, query counts and errors for one scenario"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.queries: List[int] = []
+        self.errors = 0
+        self.statuses: Dict[str, int] = {}
+
+    def add(self, elapsed: float, response):
+        self.latencies.append(elapsed)
+        self.queries.append(_queries(response))
+        code = str(response.status_code)
+        self.statuses[code] = self.statuses.get(code, 0) + 1
+        if response.status_code >= 400:
+            self.errors += 1
+
+    def summary(self, wall_seconds: float) -> dict:
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "statuses": self.statuses,
+            "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+            "p95_ms": round(_percentile(ordered, 95) * 1000, 3),
+            "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+            "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+            "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+            "rps": round(count / wall_seconds, 2) if wall_seconds else 0.0,
+            "queries_per_request": round(sum(self.queries) / count, 2) if count else 0.0,
+        }
+
+
+async def _login(client) -> str:
+    """Log in as the benchmark user and return a sync token for the delta scenario"""
+    response = await client.post("/api/auth/login", json={"username": BENCH_USER, "password": DEFAULT_PASSWORD})
+    response.raise_for_status()
+    response = await client.get("/api/sync/")
+    response.raise_for_status()
+    return response.json()["token"]
+
+
+async def _send(client, request: Request):
+    method, url, body = request
+    return await client.request(method, url, json=body)
+
+
+# ==================== MODES ====================
+
+def _load_ids(engine) -> Dict[str, List[int]]:
+    """IDs of the benchmark user's rows per resource"""
+    from sqlmodel import Session, select
+    from ..app import models
+
+    tables = {
+        "goals": models.Goal, "habits": models.Habit, "tasks": models.Task,
+        "contacts": models.Contact, "entries": models.Entry,
+    }
+    with Session(engine) as session:
+        user = session.exec(select(models.User).where(models.User.username == BENCH_USER)).one()
+        ids = {
+            name: list(session.exec(select(model.id).where(model.user_id == user.id).order_by(model.id)))
+            for name, model in tables.items()
+        }
+        ids["birthdays"] = list(session.exec(
+            select(models.Contact.id)
+            .where(models.Contact.user_id == user.id, models.Contact.birthday.is_not(None))
+            .order_by(models.Contact.id)
+        ))
+        return ids
+
+
+async def run_inprocess(app, ctx: Context, requests: int, warmup: int) -> Dict[str, dict]:
+    """Run each scenario back to back through an in-process ASGI client"""
+    import httpx
+
+    # Unhandled exceptions become 500s and are counted as errors, as they would be behind uvicorn
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        ctx.sync_token = await _login(client)
+        results = {}
+        for scenario in SCENARIOS:
+            count = min(requests, scenario.max_requests or requests)
+            for _ in range(min(warmup, count)):
+                await _send(client, scenario.build(ctx))
+            recorder = Recorder()
+            started = time.perf_counter()
+            for _ in range(count):
+                request = scenario.build(ctx)
+                sent = time.perf_counter()
+                response = await _send(client, request)
+                recorder.add(time.perf_counter() - sent, response)
+            results[scenario.name] = recorder.summary(time.perf_counter() - started)
+            print(f"[BENCH] {scenario.name:<22} p50={results[scenario.name]['p50_ms']:>9.2f}ms "
+                  f"p95={results[scenario.name]['p95_ms']:>9.2f}ms q/req={results[scenario.name]['queries_per_request']}")
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(database_url: str, workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url, APP_SECRET=BENCH_SECRET, ADMIN_USERNAMES=BENCH_USER)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server.app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL,
+    )
+
+
+async def _wait_ready(base_url: str, server: subprocess.Popen, timeout: float = 60.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not become ready in time")
+
+
+async def run_load(base_url: str, ctx: Context, concurrency: int, duration: float, seed: int,
+                   scenarios: Sequence[Scenario] = SCENARIOS) -> Tuple[Dict[str, dict], dict]:
+    """Send a weighted scenario mix from `concurrency` clients for `duration` seconds"""
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        ctx.sync_token = await _login(client)
+        recorders = {scenario.name: Recorder() for scenario in scenarios}
+        weights = [scenario.weight for scenario in scenarios]
+        deadline = time.monotonic() + duration
+
+        async def worker(index: int):
+            rng = random.Random(seed + index)
+            while time.monotonic() < deadline:
+                scenario = rng.choices(scenarios, weights)[0]
+                request = scenario.build(ctx)
+                sent = time.perf_counter()
+                try:
+                    response = await _send(client, request)
+                except httpx.HTTPError:
+                    recorders[scenario.name].errors += 1
+                    continue
+                recorders[scenario.name].add(time.perf_counter() - sent, response)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(index) for index in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    results = {name: recorder.summary(wall) for name, recorder in recorders.items() if recorder.latencies}
+    overall = Recorder()
+    for recorder in recorders.values():
+        overall.latencies += recorder.latencies
+        overall.queries += recorder.queries
+        overall.errors += recorder.errors
+    return results, overall.summary(wall)
+
+
+# ==================== RESULTS ====================
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _environment() -> dict:
+    return {
+        "git_commit": _git("rev-parse", "HEAD"),
+        "git_dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_results(results: dict, out: Optional[Path]) -> Path:
+    if out is None:
+        commit = results["environment"]["git_commit"][:10] or "unknown"
+        out = RESULTS_DIR / f"api-{results['config']['mode']}-{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+    return out
+
+
+def _change(old: float, new: float) -> str:
+    if not old:
+        return "    n/a" if new else "     0%"
+    percent = (new - old) / old * 100
+    marker = " !" if percent > DIFF_THRESHOLD else (" +" if percent < -DIFF_THRESHOLD else "  ")
+    return f"{percent:+6.0f}%{marker}"
+
+
+def diff_results(old: dict, new: dict) -> None:
+    """Print per-scenario changes; '!' marks a regression beyond DIFF_THRESHOLD, '+' an improvement"""
+    print(f"baseline {old['environment']['git_commit'][:10]}  vs  {new['environment']['git_commit'][:10]}")
+    print(f"{'scenario':<22}{'p50 ms':>10}{'':>10}{'p95 ms':>10}{'':>10}{'p99 ms':>10}{'':>10}{'q/req':>8}{'':>10}")
+    for name, current in new["scenarios"].items():
+        previous = old["scenarios"].get(name)
+        if previous is None:
+            print(f"{name:<22} (new)")
+            continue
+        line = f"{name:<22}"
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            line += f"{current[key]:>10.2f}{_change(previous[key], current[key]):>10}"
+        line += f"{current['queries_per_request']:>8.1f}{_change(previous['queries_per_request'], current['queries_per_request']):>10}"
+        print(line)
+    if "overall" in new and "overall" in old:
+        print(f"overall rps {old['overall']['rps']} -> {new['overall']['rps']} ({_change(old['overall']['rps'], new['overall']['rps']).strip()})")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("inprocess", "load"), default="inprocess")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic")
+    parser.add_argument("--users", type=int, default=1, help="Synthetic users in the database (the first one is benchmarked)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per scenario (inprocess)")
+    parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests per scenario (inprocess)")
+    parser.add_argument("--workers", type=int, default=4, help="uvicorn worker processes (load)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients (load)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load (load)")
+    parser.add_argument("--out", type=Path, help="Result file (default: server/benchmarks/results/api-<mode>-<commit>.json)")
+    parser.add_argument("--baseline", type=Path, help="Compare against this result file when done")
+    parser.add_argument("--diff", nargs=2, type=Path, metavar=("OLD", "NEW"), help="Only compare two result files")
+    args = parser.parse_args(argv)
+
+    if args.diff:
+        old, new = (orjson.loads(path.read_bytes()) for path in args.diff)
+        diff_results(old, new)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.sqlite3')}"
+        os.environ["DATABASE_URL"] = database_url
+        os.environ["APP_SECRET"] = BENCH_SECRET
+        os.environ["ADMIN_USERNAMES"] = BENCH_USER
+
+        from ..app.db import engine, ensure_schema
+        from .synthetic import generate
+        ensure_schema()
+        started = time.perf_counter()
+        dataset = generate(engine, users=args.users, profile=args.profile, seed=args.seed)
+        print(f"[BENCH] Generated '{args.profile}' dataset for {args.users} user(s) in {time.perf_counter() - started:.1f}s")
+        ctx = Context(_load_ids(engine), args.seed)
+
+        config = {"mode": args.mode, "profile": args.profile, "users": args.users, "seed": args.seed}
+        overall = None
+        if args.mode == "inprocess":
+            from ..app.main import app
+            config.update(requests=args.requests, warmup=args.warmup)
+            scenarios = asyncio.run(run_inprocess(app, ctx, args.requests, args.warmup))
+        else:
+            engine.dispose()
+            port = _free_port()
+            server = _start_server(database_url, args.workers, port)
+            config.update(workers=args.workers, concurrency=args.concurrency, duration=args.duration)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                asyncio.run(_wait_ready(base_url, server))
+                scenarios, overall = asyncio.run(run_load(base_url, ctx, args.concurrency, args.duration, args.seed))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            for name, result in scenarios.items():
+                print(f"[BENCH] {name:<22} n={result['requests']:<6} p50={result['p50_ms']:>9.2f}ms "
+                      f"p99={result['p99_ms']:>9.2f}ms errors={result['errors']}")
+            print(f"[BENCH] overall {overall['rps']} req/s, p99 {overall['p99_ms']}ms, {overall['errors']} errors")
+
+        results = {
+            "benchmark": "api",
+            "config": config,
+            "environment": _environment(),
+            "dataset": dataset[BENCH_USER],
+            "scenarios": scenarios,
+        }
+        if overall is not None:
+            results["overall"] = overall
+        path = write_results(results, args.out)
+        print(f"[BENCH] Results written to {path}")
+
+    if args.baseline:
+        diff_results(orjson.loads(args.baseline.read_bytes()), results)
+
+
+if __name__ == "__main__":
+    main()
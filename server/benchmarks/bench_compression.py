@@ -0,0 +1,124 @@
+"""
+Benchmark response sizes and latency with and without compression.
+
+Usage (from the repository root):
+    python -m server.benchmarks.bench_compression [--tasks 2000] [--runs 20]
+
+Builds the fingerprinted static assets into a scratch directory, seeds a
+throwaway SQLite database, then measures GET /api/tasks/ and every static
+asset with Accept-Encoding identity, gzip and br. Static assets are served
+from their build-time .br/.gz siblings; API responses are compressed on the fly.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from .synthetic import scratch_database, seed_life_areas
+
+ENCODINGS = ("identity", "gzip", "br")
+
+
+def _setup_app(tmp: str):
+    """Build the assets and point the app at a scratch database"""
+    engine = scratch_database(os.path.join(tmp, "bench.sqlite3"))
+
+    from ..app import static_build
+    dist = Path(tmp) / "dist"
+    manifest = static_build.build(static_build.FRONTEND_DIR, dist)
+
+    from ..app.main import app
+    from ..app.compression import PrecompressedStaticFiles
+
+    # Serve the scratch build regardless of whether frontend/dist exists
+    app.router.routes = [route for route in app.router.routes if getattr(route, "name", None) != "static"]
+    app.mount("/static", PrecompressedStaticFiles(directory=str(dist), fingerprinted=static_build.is_fingerprinted), name="static")
+    return app, engine, manifest
+
+
+def _seed(engine, task_count: int) -> None:
+    """Create one user with task_count tasks"""
+    from sqlmodel import Session
+    from ..app.auth import create_user
+    from ..app.models import Task
+
+    with Session(engine) as session:
+        seed_life_areas(session)
+
+        user = create_user(session, "bench", "benchmark-pass")
+        session.add_all([
+            Task(
+                user_id=user.id,
+                area_id=(i % 8) + 1,
+                title=f"Task {i}",
+                description="Follow up on the quarterly review and send notes to the team.",
+            )
+            for i in range(task_count)
+        ])
+        session.commit()
+
+
+def _measure(client, url: str, encoding: str, runs: int) -> dict:
+    """Time repeated GETs and report wire size"""
+    headers = {"Accept-Encoding": encoding}
+    client.get(url, headers=headers)  # warm up
+    timings = []
+    wire = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+        # httpx decodes transparently; Content-Length is what went over the wire
+        wire = int(response.headers.get("content-length") or len(response.content))
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "wire_kb": round(wire / 1024, 1),
+        "encoding": response.headers.get("content-encoding", "-"),
+    }
+
+
+def _print_table(title: str, results: dict) -> None:
+    print(title)
+    print(f"{'':<36}{'encoding':>10}{'wire KB':>10}{'median ms':>12}")
+    for url, by_encoding in results.items():
+        for encoding, result in by_encoding.items():
+            print(f"{url:<36}{result['encoding']:>10}{result['wire_kb']:>10}{result['median_ms']:>12}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, engine, manifest = _setup_app(tmp)
+        _seed(engine, args.tasks)
+
+        from fastapi.testclient import TestClient
+        client = TestClient(app)
+        client.post("/api/auth/login", json={"username": "bench", "password": "benchmark-pass"})
+
+        api = {"/api/tasks/": {encoding: _measure(client, "/api/tasks/", encoding, args.runs) for encoding in ENCODINGS}}
+        _print_table(f"API: GET /api/tasks/ with {args.tasks} tasks ({args.runs} runs, compressed on the fly)", api)
+
+        static = {}
+        for logical in ["index.html"] + sorted(name for name in manifest if name.endswith((".css", ".js"))):
+            url = f"/static/{manifest.get(logical, logical)}"
+            static[logical] = {encoding: _measure(client, url, encoding, args.runs) for encoding in ENCODINGS}
+        _print_table(f"Static assets ({args.runs} runs, precompressed at build time)", static)
+
+        totals = {
+            encoding: round(sum(result[encoding]["wire_kb"] for result in static.values()), 1)
+            for encoding in ENCODINGS
+        }
+        print("Total static payload KB: " + ", ".join(f"{encoding}={kb}" for encoding, kb in totals.items()))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
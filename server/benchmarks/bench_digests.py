@@ -0,0 +1,125 @@
+"""
+Benchmark the reminder digest pipeline over many users.
+
+Usage (from the repository root):
+    python -m server.benchmarks.bench_digests [--users 100000] [--batch-size 1000]
+
+Seeds a throwaway SQLite database with users spread over several timezones,
+each with contacts (some with a birthday this week), tasks (some overdue) and
+habits, then times one full digest pass into an in-memory sink, and a second
+pass, which should find every user already done for the day.
+"""
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from .synthetic import scratch_database
+
+# At NOW London, Berlin, Tokyo and Sydney are already on the next day, so two
+# date buckets are exercised; the pass runs with hour=0 so every user is due
+TIMEZONES = (
+    "UTC", "Europe/London", "Europe/Berlin", "America/New_York", "America/Chicago",
+    "America/Los_Angeles", "Asia/Tokyo", "Australia/Sydney",
+)
+NOW = datetime(2026, 10, 19, 23, 0, tzinfo=timezone.utc)
+
+CONTACTS_PER_USER = 4
+TASKS_PER_USER = 8
+HABITS_PER_USER = 3
+# Users generated and inserted per transaction
+SEED_CHUNK = 5000
+
+
+class CountingSink:
+    """Accepts every digest and keeps only counts"""
+
+    def __init__(self):
+        self.batches = 0
+        self.digests = 0
+
+    def send(self, digests):
+        self.batches += 1
+        self.digests += len(digests)
+        return len(digests)
+
+
+def seed(engine, users: int, seed: int = 7) -> int:
+    """Bulk-insert the users and their reminder sources; returns rows written"""
+    from ..app.models import Contact, Habit, HabitType, Task, TaskPriority, TaskStatus, User
+
+    rng = random.Random(seed)
+    today = NOW.date()
+    created = datetime(2026, 1, 1)
+    written = 0
+    for first in range(1, users + 1, SEED_CHUNK):
+        user_rows, contact_rows, task_rows, habit_rows = [], [], [], []
+        for user_id in range(first, min(first + SEED_CHUNK, users + 1)):
+            user_rows.append({
+                "id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@example.com",
+                "hashed_password": "x", "timezone": TIMEZONES[user_id % len(TIMEZONES)], "is_active": True,
+                "created_at": created, "updated_at": created,
+            })
+            for i in range(CONTACTS_PER_USER):
+                birthday = today + timedelta(days=rng.randrange(365))
+                contact_rows.append({
+                    "user_id": user_id, "name": f"Contact {i}",
+                    "birthday": birthday.replace(year=rng.randrange(1950, 2010)),
+                    "created_at": created, "updated_at": created, "version": 1,
+                })
+            for i in range(TASKS_PER_USER):
+                task_rows.append({
+                    "user_id": user_id, "area_id": (i % 8) + 1, "title": f"Task {i}",
+                    "status": TaskStatus.DONE if i % 4 == 0 else TaskStatus.TODO, "priority": TaskPriority.MEDIUM,
+                    "due_date": today + timedelta(days=rng.randrange(-30, 60)),
+                    "created_at": created, "updated_at": created, "version": 1,
+                })
+            for i in range(HABITS_PER_USER):
+                habit_rows.append({
+                    "user_id": user_id, "name": f"Habit {i}", "habit_type": HabitType.GAIN,
+                    "frequency_description": "daily", "current_streak": rng.randrange(0, 20), "longest_streak": 20,
+                    "last_checkin_date": today - timedelta(days=rng.randrange(0, 3)),
+                    "created_at": created, "updated_at": created, "version": 1,
+                })
+        with engine.begin() as connection:
+            for model, rows in ((User, user_rows), (Contact, contact_rows), (Task, task_rows), (Habit, habit_rows)):
+                connection.execute(model.__table__.insert(), rows)
+                written += len(rows)
+    return written
+
+
+def _peak_rss_mb() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = scratch_database(os.path.join(tmp, "bench.sqlite3"))
+        started = time.perf_counter()
+        rows = seed(engine, args.users)
+        print(f"Seeded {args.users} users ({rows} rows) in {time.perf_counter() - started:.1f}s")
+
+        from ..app.notifications import send_digests
+
+        for label in ("first pass", "re-run"):
+            sink = CountingSink()
+            started = time.perf_counter()
+            processed, sent = send_digests(sink, now=NOW, batch_size=args.batch_size, hour=0)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{label:<10} {elapsed:8.2f}s {processed / elapsed if processed else 0:10.0f} users/s  "
+                f"users={processed} digests={sent} sink_calls={sink.batches} peak_rss={_peak_rss_mb()}MB"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark the bulk importer on a large mixed NDJSON export.
+
+Usage (from the repository root):
+    python -m server.benchmarks.bench_import [--rows 1000000] [--chunk-size 1000]
+
+Writes a synthetic export (contacts, goals, habits with check-ins, tasks,
+entries and their area links) to a scratch directory, imports it into a
+throwaway SQLite database, then imports it again to time the idempotent
+re-run, which should insert nothing.
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import orjson
+
+from .synthetic import scratch_database, seed_life_areas
+
+# Share of the generated rows per record type, in export order
+MIX = [
+    ("contacts", 0.04),
+    ("contact_area_links", 0.04),
+    ("goals", 0.04),
+    ("goal_area_links", 0.04),
+    ("habits", 0.02),
+    ("habit_area_links", 0.02),
+    ("habit_checkins", 0.30),
+    ("tasks", 0.20),
+    ("entries", 0.30),
+]
+
+
+def _setup(db_path: str):
+    """Point the app at a scratch database and create the schema"""
+    from sqlmodel import Session
+
+    engine = scratch_database(db_path)
+    with Session(engine) as session:
+        seed_life_areas(session)
+    return engine
+
+
+def _record(table: str, i: int, counts: dict, today: date) -> dict:
+    """Build the data for the i-th record of a table, pointing at parents that exist"""
+    area_id = (i % 8) + 1
+    if table == "contacts":
+        return {"id": i + 1, "name": f"Contact {i}", "email": f"contact{i}@example.com", "birthday": "1980-01-01"}
+    if table == "goals":
+        return {"id": i + 1, "title": f"Goal {i}", "timeframe": "short", "status": "in_progress", "progress_percentage": i % 100}
+    if table == "habits":
+        return {"id": i + 1, "name": f"Habit {i}", "habit_type": "gain", "frequency_description": "daily"}
+    if table.endswith("_area_links"):
+        singular = table[:-len("_area_links")]
+        parent, column = singular + "s", singular + "_id"
+        return {column: (i % counts[parent]) + 1, "area_id": area_id}
+    if table == "habit_checkins":
+        return {"id": i + 1, "habit_id": (i % counts["habits"]) + 1, "checkin_date": (today - timedelta(days=i // counts["habits"])).isoformat()}
+    if table == "tasks":
+        return {
+            "id": i + 1, "area_id": area_id, "title": f"Task {i}", "status": "todo", "priority": "medium",
+            "due_date": (today + timedelta(days=i % 90)).isoformat(), "contact_id": (i % counts["contacts"]) + 1,
+        }
+    return {
+        "id": i + 1, "area_id": area_id, "title": f"Entry {i}",
+        "content": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4,
+        "entry_date": (today - timedelta(days=i % 3650)).isoformat(),
+    }
+
+
+def write_export(path: str, rows: int) -> dict:
+    """Write a synthetic NDJSON export with about `rows` records; returns per-table counts"""
+    counts = {table: max(1, int(rows * share)) for table, share in MIX}
+    today = date.today()
+    with open(path, "wb") as f:
+        f.write(orjson.dumps({"type": "export", "data": {"format_version": 1, "exported_at": datetime.utcnow()}}) + b"\n")
+        for table, _ in MIX:
+            batch = []
+            for i in range(counts[table]):
+                batch.append(orjson.dumps({"type": table, "data": _record(table, i, counts, today)}))
+                if len(batch) >= 10_000:
+                    f.write(b"\n".join(batch) + b"\n")
+                    batch = []
+            if batch:
+                f.write(b"\n".join(batch) + b"\n")
+    return counts
+
+
+def _peak_rss_mb() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _run_import(path: str, chunk_size: int):
+    from ..app.data_import import import_files
+
+    started = time.perf_counter()
+    result = import_files([path], "bench", password="benchmark-pass", chunk_size=chunk_size)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "export.ndjson")
+        started = time.perf_counter()
+        counts = write_export(source, args.rows)
+        total = sum(counts.values())
+        print(f"Generated {total} records ({os.path.getsize(source) / (1024 * 1024):.0f} MB) in {time.perf_counter() - started:.1f}s")
+
+        engine = _setup(os.path.join(tmp, "bench.sqlite3"))
+        rss_before = _peak_rss_mb()
+
+        for label in ("first run", "re-run"):
+            result, elapsed = _run_import(source, args.chunk_size)
+            assert result.failed == 0, result.errors[:5]
+            print(
+                f"{label:<10} {elapsed:8.1f}s {total / elapsed:10.0f} rows/s  "
+                f"inserted={result.total_inserted} skipped={result.total_skipped} peak_rss={_peak_rss_mb()}MB"
+            )
+        print(f"peak RSS before import: {rss_before}MB")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark GET /api/entries/ serialization: Pydantic response models vs the orjson fast path.
+
+Usage (from the repository root):
+    python -m server.benchmarks.bench_list_entries [--entries 10000] [--runs 5]
+
+Seeds a throwaway SQLite database, then times the endpoint and records peak
+Python memory (tracemalloc) with FAST_JSON_LISTS off and on.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from .synthetic import scratch_database, seed_life_areas
+
+
+def _setup_app(db_path: str):
+    """Point the app at a scratch database and import it"""
+    engine = scratch_database(db_path)
+    from ..app.main import app
+    return app, engine
+
+
+def _seed(engine, entry_count: int) -> None:
+    """Create one user with entry_count journal entries"""
+    from sqlmodel import Session
+    from ..app.auth import create_user
+    from ..app.models import Entry
+
+    with Session(engine) as session:
+        seed_life_areas(session)
+
+        user = create_user(session, "bench", "benchmark-pass")
+        start = date.today() - timedelta(days=entry_count)
+        session.add_all([
+            Entry(
+                user_id=user.id,
+                area_id=(i % 8) + 1,
+                title=f"Entry {i}",
+                content="Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8,
+                entry_date=start + timedelta(days=i),
+            )
+            for i in range(entry_count)
+        ])
+        session.commit()
+
+
+def _measure(client, runs: int) -> dict:
+    """Time the list endpoint and capture peak traced memory"""
+    timings = []
+    peak = 0
+    size = 0
+    for _ in range(runs):
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = client.get("/api/entries/")
+        timings.append(time.perf_counter() - started)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        assert response.status_code == 200, response.text
+        size = len(response.content)
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "peak_mb": round(peak / (1024 * 1024), 1),
+        "response_kb": round(size / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, engine = _setup_app(os.path.join(tmp, "bench.sqlite3"))
+        _seed(engine, args.entries)
+
+        from fastapi.testclient import TestClient
+        from ..app.routers import entries
+
+        client = TestClient(app)
+        client.post("/api/auth/login", json={"username": "bench", "password": "benchmark-pass"})
+
+        results = {}
+        for label, fast in (("pydantic", False), ("orjson_rows", True)):
+            entries.FAST_JSON_LISTS = fast
+            client.get("/api/entries/")  # warm up
+            results[label] = _measure(client, args.runs)
+
+        print(f"GET /api/entries/ with {args.entries} entries ({args.runs} runs)")
+        print(f"{'path':<14}{'median ms':>12}{'min ms':>10}{'peak MB':>10}{'body KB':>10}")
+        for label, result in results.items():
+            print(f"{label:<14}{result['median_ms']:>12}{result['min_ms']:>10}{result['peak_mb']:>10}{result['response_kb']:>10}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
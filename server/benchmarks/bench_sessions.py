@@ -0,0 +1,206 @@
+"""
+Benchmark per-request session overhead for each session setup.
+
+Usage (from the repository root):
+    python -m server.benchmarks.bench_sessions [--requests 20000] [--users 1000]
+
+Drives a bare ASGI endpoint that reads request.session["user_id"] through
+each session middleware, so the numbers are the session lookup alone:
+
+- signed-cookie: Starlette's SessionMiddleware (the previous setup)
+- db / memory: ServerSessionMiddleware over the user_sessions table or the
+  in-process Redis stand-in, with the LRU warm ("cached") or disabled
+  ("uncached": every request reads the backend)
+
+Also times sliding-expiry writes as one UPDATE per request against one
+batched flush, and a logout-everywhere for a user with many sessions.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .bench_api import BENCH_SECRET, _environment, write_results
+
+
+async def _endpoint(scope, receive, send):
+    """/login?<user_id> starts a session; anything else needs one"""
+    if scope["path"] == "/login":
+        user_id = int(scope["query_string"])
+        scope["session"].update(user_id=user_id, username=f"user{user_id}")
+        status = 200
+    else:
+        status = 200 if scope["session"].get("user_id") else 401
+    await send({"type": "http.response.start", "status": status, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _request(app, path: str, query: bytes = b"", cookie: Optional[str] = None) -> Tuple[int, Optional[str]]:
+    """One request straight through the ASGI stack; returns (status, cookie set by the response)"""
+    scope = {
+        "type": "http", "method": "GET", "path": path, "query_string": query, "root_path": "",
+        "headers": [(b"cookie", cookie.encode())] if cookie else [],
+    }
+    result = [0, None]
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result[0] = message["status"]
+            for name, value in message["headers"]:
+                if name == b"set-cookie":
+                    result[1] = value.decode().split(";", 1)[0]
+
+    await app(scope, _receive, send)
+    return result[0], result[1]
+
+
+def _setups():
+    """(name, app) for every session configuration"""
+    from starlette.middleware.sessions import SessionMiddleware
+    from ..app.db import engine
+    from ..app.sessions import DatabaseSessionBackend, LocalRedis, RedisSessionBackend, ServerSessionMiddleware, SessionStore
+
+    def server(backend, cache_size):
+        return ServerSessionMiddleware(
+            _endpoint, store=SessionStore(backend, cache_size=cache_size), secret_key=BENCH_SECRET, session_cookie="session_id",
+        )
+
+    memory = RedisSessionBackend(LocalRedis())
+    return [
+        ("signed-cookie", SessionMiddleware(_endpoint, secret_key=BENCH_SECRET, session_cookie="session_id", max_age=86400)),
+        ("db cached", server(DatabaseSessionBackend(engine), 100_000)),
+        ("db uncached", server(DatabaseSessionBackend(engine), 0)),
+        ("memory cached", server(memory, 100_000)),
+        ("memory uncached", server(memory, 0)),
+    ]
+
+
+async def measure(app, users: int, requests: int, seed: int) -> dict:
+    """Log in `users` sessions, then time `requests` authenticated requests spread across them"""
+    cookies = []
+    for user_id in range(1, users + 1):
+        _, cookie = await _request(app, "/login", str(user_id).encode())
+        cookies.append(cookie)
+
+    rng = random.Random(seed)
+    order = [rng.choice(cookies) for _ in range(requests)]
+    for cookie in cookies:  # warm-up: fills the LRU where there is one
+        await _request(app, "/", cookie=cookie)
+
+    timings: List[float] = []
+    failures = 0
+    for cookie in order:
+        started = time.perf_counter()
+        status, _ = await _request(app, "/", cookie=cookie)
+        timings.append(time.perf_counter() - started)
+        failures += status != 200
+    timings.sort()
+    return {
+        "mean_us": round(statistics.fmean(timings) * 1e6, 1),
+        "p50_us": round(timings[len(timings) // 2] * 1e6, 1),
+        "p99_us": round(timings[int(len(timings) * 0.99)] * 1e6, 1),
+        "failures": failures,
+    }
+
+
+def measure_expiry_writes(sessions: int) -> dict:
+    """Sliding-expiry cost for `sessions` active sessions: UPDATE per request vs one batched flush"""
+    from ..app.db import engine
+    from ..app.sessions import DatabaseSessionBackend, SessionStore
+
+    store = SessionStore(DatabaseSessionBackend(engine), touch_interval=0)
+    now = time.time()
+    keys = [f"expiry-{index}" for index in range(sessions)]
+    for key in keys:
+        store.create(key, {"user_id": None}, now)
+
+    started = time.perf_counter()
+    for key in keys:
+        store.backend.extend({key: now + 100})
+    per_request = time.perf_counter() - started
+
+    started = time.perf_counter()
+    store.backend.extend({key: now + 200 for key in keys})
+    batched = time.perf_counter() - started
+    return {
+        "sessions": sessions,
+        "per_request_ms": round(per_request * 1000, 1),
+        "batched_ms": round(batched * 1000, 1),
+    }
+
+
+def measure_logout_everywhere(sessions: int) -> dict:
+    """Revoke a user holding `sessions` sessions, on each backend"""
+    from sqlmodel import Session
+    from ..app.auth import create_user
+    from ..app.db import engine
+    from ..app.sessions import DatabaseSessionBackend, LocalRedis, RedisSessionBackend, SessionStore
+
+    with Session(engine) as session:
+        user_id = create_user(session, "bench-sessions", "benchmark-pass").id
+    results = {}
+    for name, backend in (("db", DatabaseSessionBackend(engine)), ("memory", RedisSessionBackend(LocalRedis()))):
+        store = SessionStore(backend)
+        now = time.time()
+        for index in range(sessions):
+            store.create(f"{name}-{index}", {"user_id": user_id}, now)
+        started = time.perf_counter()
+        revoked = store.revoke_user(user_id)
+        results[name] = {"revoked": revoked, "ms": round((time.perf_counter() - started) * 1000, 2)}
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=1000, help="Distinct sessions the requests are spread across")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'sessions.sqlite3')}"
+        os.environ["APP_SECRET"] = BENCH_SECRET
+        from ..app.db import engine, ensure_schema
+        ensure_schema()
+        # First, while the only sessions in the table are the ones it creates
+        logout = measure_logout_everywhere(args.users)
+
+        overhead = {}
+        print(f"{'setup':<18}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}")
+        for name, app in _setups():
+            overhead[name] = asyncio.run(measure(app, args.users, args.requests, args.seed))
+            row = overhead[name]
+            print(f"{name:<18}{row['mean_us']:>10.1f}{row['p50_us']:>10.1f}{row['p99_us']:>10.1f}"
+                  + (f"  ({row['failures']} failures)" if row["failures"] else ""))
+
+        expiry = measure_expiry_writes(args.users)
+        print(f"\nsliding expiry for {expiry['sessions']} sessions: {expiry['per_request_ms']} ms as one UPDATE each, "
+              f"{expiry['batched_ms']} ms batched")
+        for name, row in logout.items():
+            print(f"logout-everywhere ({name}): {row['revoked']} sessions in {row['ms']} ms")
+        engine.dispose()
+
+    results = {
+        "benchmark": "sessions",
+        "config": {"mode": "sessions", "requests": args.requests, "users": args.users, "seed": args.seed},
+        "environment": _environment(),
+        "overhead": overhead,
+        "sliding_expiry": expiry,
+        "logout_everywhere": logout,
+    }
+    path = write_results(results, args.out)
+    print(f"[BENCH] Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark cold-start time: imports, schema check and time until the first request is served.
+
+Usage (from the repository root):
+    python -m server.benchmarks.bench_startup [--runs 5] [--importtime 15]
+
+Every run uses a fresh interpreter, as a Railway restart does:
+
+- import: `import server.app.main` (models, schemas, routers, middleware)
+- schema: ensure_schema() on an up-to-date database (one SELECT), shown next
+  to what the old create_all() startup cost on the same database
+- ready: from spawning uvicorn until GET /health answers, on an up-to-date
+  database, plus one first boot against an empty database (runs migrations)
+
+--importtime lists the slowest imports under server.app.main from
+`python -X importtime`, to see what is worth trimming.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import orjson
+
+from .bench_api import BENCH_SECRET, REPO_ROOT, _environment, _free_port, write_results
+
+_PHASES_SCRIPT = """
+import time
+started = time.perf_counter()
+import server.app.main
+imported = time.perf_counter()
+from server.app.db import create_db_and_tables, ensure_schema
+ensure_schema()
+checked = time.perf_counter()
+create_db_and_tables()
+created = time.perf_counter()
+import orjson
+print("RESULT " + orjson.dumps({
+    "import_ms": (imported - started) * 1000,
+    "schema_ms": (checked - imported) * 1000,
+    "create_all_ms": (created - checked) * 1000,
+}).decode())
+"""
+
+
+def _env(database_url: str) -> Dict[str, str]:
+    return dict(os.environ, DATABASE_URL=database_url, APP_SECRET=BENCH_SECRET, PYTHONDONTWRITEBYTECODE="")
+
+
+def measure_phases(database_url: str) -> dict:
+    """Import and schema-check timings from a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", _PHASES_SCRIPT], cwd=REPO_ROOT, env=_env(database_url),
+        capture_output=True, text=True, check=True,
+    ).stdout
+    line = next(line for line in output.splitlines() if line.startswith("RESULT "))
+    return orjson.loads(line[len("RESULT "):])
+
+
+def measure_ready(database_url: str, timeout: float = 60.0) -> float:
+    """Milliseconds from spawning uvicorn until /health returns 200"""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server.app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=_env(database_url), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError("uvicorn did not become ready in time")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def slowest_imports(limit: int) -> List[dict]:
+    """Direct imports of server.app.main (with their subtrees), slowest cumulative first"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server.app.main"], cwd=REPO_ROOT,
+        env=_env(f"sqlite:///{tempfile.gettempdir()}/importtime.sqlite3"), capture_output=True, text=True,
+    ).stderr
+    # "import time: <self us> | <cumulative us> | <two spaces per level><module>"
+    entries = []
+    for line in stderr.splitlines():
+        parts = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        level = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((level, int(parts[0]), int(parts[1]), name.strip()))
+
+    # Children are reported before their parent, so walk back from server.app.main
+    main_index = max(i for i, entry in enumerate(entries) if entry[3] == "server.app.main")
+    main_level = entries[main_index][0]
+    rows = []
+    for level, own, cumulative, name in reversed(entries[:main_index]):
+        if level <= main_level:
+            break
+        if level == main_level + 1:
+            rows.append({"module": name, "self_ms": own / 1000, "cumulative_ms": cumulative / 1000})
+    rows.sort(key=lambda row: -row["cumulative_ms"])
+    return rows[:limit]
+
+
+def _summary(values: List[float]) -> dict:
+    return {
+        "median_ms": round(statistics.median(values), 1),
+        "min_ms": round(min(values), 1),
+        "max_ms": round(max(values), 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", type=int, default=15, metavar="N", help="Show the N slowest imports (0 = skip)")
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'startup.sqlite3')}"
+
+        # First boot on an empty database: migrations run here
+        first_boot = measure_ready(database_url)
+        print(f"[BENCH] first boot (migrations)  {first_boot:8.1f} ms")
+
+        phases: Dict[str, List[float]] = {"import_ms": [], "schema_ms": [], "create_all_ms": []}
+        ready: List[float] = []
+        for run in range(args.runs):
+            for key, value in measure_phases(database_url).items():
+                phases[key].append(value)
+            ready.append(measure_ready(database_url))
+            print(f"[BENCH] run {run + 1}: import {phases['import_ms'][-1]:7.1f} ms  "
+                  f"schema check {phases['schema_ms'][-1]:6.2f} ms  (create_all {phases['create_all_ms'][-1]:6.1f} ms)  "
+                  f"ready {ready[-1]:7.1f} ms")
+
+    results = {
+        "benchmark": "startup",
+        "config": {"mode": "startup", "runs": args.runs},
+        "environment": _environment(),
+        "first_boot_ms": round(first_boot, 1),
+        "import": _summary(phases["import_ms"]),
+        "schema_check": _summary(phases["schema_ms"]),
+        "create_all_reference": _summary(phases["create_all_ms"]),
+        "ready": _summary(ready),
+    }
+    print(f"\nmedian: import {results['import']['median_ms']} ms, schema check {results['schema_check']['median_ms']} ms "
+          f"(create_all {results['create_all_reference']['median_ms']} ms), ready {results['ready']['median_ms']} ms")
+
+    if args.importtime:
+        results["slowest_imports"] = slowest_imports(args.importtime)
+        print(f"\n{'module':<40}{'cumulative ms':>15}{'self ms':>10}")
+        for row in results["slowest_imports"]:
+            print(f"{row['module']:<40}{row['cumulative_ms']:>15.1f}{row['self_ms']:>10.1f}")
+
+    path = write_results(results, args.out)
+    print(f"[BENCH] Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark throughput scaling with the number of gunicorn workers.
+
+Usage (from the repository root):
+    python -m server.benchmarks.bench_workers [--workers 1,2,4] [--concurrency 64] [--duration 20]
+
+Generates one synthetic dataset, then for each worker count starts the
+production server exactly as the Procfile does (gunicorn -c
+server/gunicorn.conf.py) and drives it with the read-only scenarios from
+bench_api.py. Prints requests/s and speedup over one worker, and writes the
+runs to JSON next to the bench_api results. Scaling flattens out at the
+number of available CPUs.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from .bench_api import (
+    BENCH_SECRET, BENCH_USER, REPO_ROOT, SCENARIOS, Context,
+    _environment, _free_port, _load_ids, _wait_ready, run_load, write_results,
+)
+from .synthetic import PROFILES
+
+
+def _default_worker_counts() -> List[int]:
+    """1, 2, 4, ... up to the CPU count, always including the CPU count itself"""
+    cpus = os.cpu_count() or 1
+    counts, count = [], 1
+    while count < cpus:
+        counts.append(count)
+        count *= 2
+    return counts + [cpus]
+
+
+def _start_gunicorn(database_url: str, workers: int, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ, DATABASE_URL=database_url, APP_SECRET=BENCH_SECRET, ADMIN_USERNAMES=BENCH_USER,
+        WEB_CONCURRENCY=str(workers), PORT=str(port), ACCESS_LOG="",
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "server/gunicorn.conf.py", "server.app.main:app"],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL,
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=lambda value: [int(part) for part in value.split(",")],
+                        default=_default_worker_counts(), help="Comma-separated worker counts")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.sqlite3')}"
+        os.environ["DATABASE_URL"] = database_url
+        os.environ["APP_SECRET"] = BENCH_SECRET
+
+        from ..app.db import engine, ensure_schema
+        from .synthetic import generate
+        ensure_schema()
+        dataset = generate(engine, profile=args.profile, seed=args.seed)
+        ctx = Context(_load_ids(engine), args.seed)
+        engine.dispose()
+
+        # Reads only: SQLite serializes writers, which would hide CPU scaling
+        scenarios = [
+            scenario for scenario in SCENARIOS
+            if scenario.max_requests is None and scenario.build(ctx)[0] == "GET"
+        ]
+
+        runs = []
+        for workers in args.workers:
+            port = _free_port()
+            server = _start_gunicorn(database_url, workers, port)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                asyncio.run(_wait_ready(base_url, server))
+                _, overall = asyncio.run(run_load(base_url, ctx, args.concurrency, args.duration, args.seed, scenarios))
+            finally:
+                server.terminate()
+                server.wait(timeout=60)
+            overall["workers"] = workers
+            runs.append(overall)
+            print(f"[BENCH] {workers:>3} worker(s): {overall['rps']:>9.1f} req/s  p50={overall['p50_ms']:.1f}ms  "
+                  f"p99={overall['p99_ms']:.1f}ms  errors={overall['errors']}")
+            time.sleep(1)
+
+    baseline = runs[0]["rps"] or 1.0
+    print(f"\n{'workers':>8}{'req/s':>10}{'speedup':>10}")
+    for run in runs:
+        run["speedup"] = round(run["rps"] / baseline, 2)
+        print(f"{run['workers']:>8}{run['rps']:>10.1f}{run['speedup']:>9.2f}x")
+
+    results = {
+        "benchmark": "workers",
+        "config": {"mode": "workers", "profile": args.profile, "seed": args.seed,
+                   "concurrency": args.concurrency, "duration": args.duration},
+        "environment": _environment(),
+        "dataset": dataset[BENCH_USER],
+        "runs": runs,
+    }
+    path = write_results(results, args.out)
+    print(f"[BENCH] Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""
+Synthetic data generator for benchmarks.
+
+Usage (from the repository root):
+    python -m server.benchmarks.synthetic --db /tmp/bench.sqlite3 [--users 1] [--profile realistic] [--seed 42]
+
+Writes realistic users straight into the database with bulk INSERTs (no API
+round trips): by default 10 years of daily journal entries, 5k tasks, 50
+habits with daily check-ins, 2k contacts, plus goals, references, health
+items, financial accounts and conflict topics, all linked to life areas.
+The same seed and anchor date always produce the same rows, so results from
+different commits are measured against identical data.
+"""
+import argparse
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+# Every generated date lies before this day; fixed so data does not drift between runs
+ANCHOR_DATE = date(2026, 1, 1)
+
+DEFAULT_PASSWORD = "benchmark-pass"
+
+INSERT_CHUNK_SIZE = 2000
+
+
+class DataProfile(NamedTuple):
+    """How much data one synthetic user gets"""
+    entry_years: int
+    tasks: int
+    habits: int
+    habit_years: int
+    contacts: int
+    goals: int
+    references: int
+    health_items: int
+    accounts: int
+    conflict_topics: int
+
+
+PROFILES = {
+    "tiny": DataProfile(entry_years=1, tasks=200, habits=5, habit_years=1, contacts=50, goals=10,
+                        references=10, health_items=10, accounts=5, conflict_topics=3),
+    "small": DataProfile(entry_years=2, tasks=1000, habits=10, habit_years=1, contacts=300, goals=40,
+                         references=50, health_items=30, accounts=10, conflict_topics=3),
+    "realistic": DataProfile(entry_years=10, tasks=5000, habits=50, habit_years=3, contacts=2000, goals=200,
+                             references=300, health_items=150, accounts=40, conflict_topics=3),
+}
+
+WORDS = (
+    "today family work budget run walk prayer plan call friend doctor garden read book meeting "
+    "project review savings loan goal habit sleep water walk church sermon vote council neighbor "
+    "dinner lunch gym stretch focus notes idea guitar paint travel trip bills rent invest market "
+    "grateful tired happy calm busy progress setback learn teach listen patience honest kind"
+).split()
+
+RECURRENCE_RULES = ("FREQ=DAILY", "FREQ=WEEKLY;BYDAY=MO,WE,FR", "FREQ=WEEKLY;INTERVAL=2", "FREQ=MONTHLY;BYMONTHDAY=1")
+
+FIRST_NAMES = "Alex Sam Jordan Taylor Morgan Casey Riley Jamie Avery Quinn Drew Parker Rowan Sage Emerson".split()
+LAST_NAMES = "Smith Johnson Lee Brown Garcia Miller Davis Wilson Moore Clark Lewis Walker Hall Young King".split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choices(WORDS, k=words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(_sentence(rng, rng.randint(6, 16)) for _ in range(sentences))
+
+
+def _moment(day: date, rng: random.Random) -> datetime:
+    return datetime.combine(day, datetime.min.time()) + timedelta(seconds=rng.randint(6 * 3600, 23 * 3600))
+
+
+def _insert(session, model, rows: List[dict], returning: bool = False) -> List[int]:
+    """Bulk INSERT in chunks; returns the new primary keys in row order when asked"""
+    from sqlalchemy import insert
+
+    ids: List[int] = []
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + INSERT_CHUNK_SIZE]
+        if returning:
+            statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+            ids.extend(session.scalars(statement, chunk).all())
+        else:
+            session.execute(insert(model), chunk)
+    return ids
+
+
+def _area_links(rng: random.Random, ids: List[int], column: str, when: List[datetime]) -> List[dict]:
+    """One or two random life areas per parent row"""
+    links = []
+    for row_id, created in zip(ids, when):
+        for area_id in rng.sample(range(1, 9), rng.choice((1, 1, 2))):
+            links.append({column: row_id, "area_id": area_id, "created_at": created})
+    return links
+
+
+def scratch_database(path: str):
+    """Point the app at a throwaway SQLite file, create the schema from the models and return the engine"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(path)}"
+    os.environ.setdefault("APP_SECRET", "benchmark-secret")
+
+    from ..app.db import engine, create_db_and_tables
+    create_db_and_tables()
+    return engine
+
+
+def seed_life_areas(session) -> None:
+    """Insert the 8 life areas if they are missing"""
+    from ..app.models import LifeArea, LifeAreaEnum
+
+    if session.get(LifeArea, 1) is not None:
+        return
+    for index, area in enumerate(LifeAreaEnum, start=1):
+        session.add(LifeArea(id=index, name=area, display_name=area.value.replace("_", " ").title()))
+    session.commit()
+
+
+def generate_user(session, username: str, profile: DataProfile, rng: random.Random,
+                  anchor: date = ANCHOR_DATE, password: str = DEFAULT_PASSWORD) -> Dict[str, int]:
+    """Create one user and all of their data; returns row counts per table"""
+    from ..app import models
+    from ..app.auth import create_user
+    from ..app.etags import bump_resource_versions
+
+    user = create_user(session, username, password, email=f"{username}@example.com", full_name=username.title())
+    user_id = user.id
+    counts: Dict[str, int] = {}
+
+    def days_back(limit_days: int) -> date:
+        return anchor - timedelta(days=rng.randint(1, limit_days))
+
+    # Contacts first: goals and tasks point at them
+    contact_days = [days_back(365 * profile.entry_years) for _ in range(profile.contacts)]
+    contact_rows = []
+    for index, day in enumerate(contact_days):
+        moment = _moment(day, rng)
+        contact_rows.append({
+            "user_id": user_id,
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}",
+            "role": rng.choice(("friend", "family", "coworker", "doctor", "pastor", None)),
+            "phone": f"555-{rng.randint(1000, 9999)}",
+            "email": f"contact{index}@example.com",
+            "birthday": date(rng.randint(1940, 2015), rng.randint(1, 12), rng.randint(1, 28)) if rng.random() < 0.7 else None,
+            "notes": _sentence(rng, 10) if rng.random() < 0.3 else None,
+            "created_at": moment,
+            "updated_at": moment,
+            "version": 1,
+        })
+    contact_ids = _insert(session, models.Contact, contact_rows, returning=True)
+    _insert(session, models.ContactAreaLink, _area_links(rng, contact_ids, "contact_id", [r["created_at"] for r in contact_rows]))
+    counts["contacts"] = len(contact_ids)
+
+    goal_rows = []
+    for _ in range(profile.goals):
+        moment = _moment(days_back(365 * profile.entry_years), rng)
+        goal_rows.append({
+            "user_id": user_id,
+            "title": _sentence(rng, 5)[:200],
+            "description": _paragraph(rng, 2),
+            "timeframe": rng.choice(list(models.GoalTimeframe)),
+            "status": rng.choice(list(models.GoalStatus)),
+            "progress_percentage": rng.randint(0, 100),
+            "due_date": moment.date() + timedelta(days=rng.randint(30, 720)),
+            "contact_id": rng.choice(contact_ids) if contact_ids and rng.random() < 0.2 else None,
+            "created_at": moment,
+            "updated_at": moment,
+            "version": 1,
+        })
+    goal_ids = _insert(session, models.Goal, goal_rows, returning=True)
+    _insert(session, models.GoalAreaLink, _area_links(rng, goal_ids, "goal_id", [r["created_at"] for r in goal_rows]))
+    counts["goals"] = len(goal_ids)
+
+    # Habits with a check-in on most days since each habit was started
+    habit_rows, habit_starts = [], []
+    for index in range(profile.habits):
+        started = days_back(365 * profile.habit_years)
+        habit_starts.append(started)
+        moment = _moment(started, rng)
+        habit_rows.append({
+            "user_id": user_id,
+            "name": f"Habit {index}: {_sentence(rng, 3)}"[:200],
+            "description": _sentence(rng, 10),
+            "habit_type": rng.choice(list(models.HabitType)),
+            "frequency_description": "daily",
+            "current_streak": 0,
+            "longest_streak": 0,
+            "last_checkin_date": None,
+            "created_at": moment,
+            "updated_at": moment,
+            "version": 1,
+        })
+    habit_ids = _insert(session, models.Habit, habit_rows, returning=True)
+    _insert(session, models.HabitAreaLink, _area_links(rng, habit_ids, "habit_id", [r["created_at"] for r in habit_rows]))
+
+    checkin_rows = []
+    for habit_id, row, started in zip(habit_ids, habit_rows, habit_starts):
+        streak = longest = 0
+        last = None
+        day = started
+        while day < anchor:
+            if rng.random() < 0.8:
+                streak = streak + 1 if last == day - timedelta(days=1) else 1
+                longest = max(longest, streak)
+                last = day
+                moment = _moment(day, rng)
+                checkin_rows.append({
+                    "habit_id": habit_id,
+                    "checkin_date": day,
+                    "notes": None,
+                    "created_at": moment,
+                    "updated_at": moment,
+                })
+            day += timedelta(days=1)
+        row.update(current_streak=streak if last == anchor - timedelta(days=1) else 0, longest_streak=longest, last_checkin_date=last)
+        if len(checkin_rows) >= INSERT_CHUNK_SIZE * 10:
+            _insert(session, models.HabitCheckin, checkin_rows)
+            counts["habit_checkins"] = counts.get("habit_checkins", 0) + len(checkin_rows)
+            checkin_rows = []
+    _insert(session, models.HabitCheckin, checkin_rows)
+    counts["habit_checkins"] = counts.get("habit_checkins", 0) + len(checkin_rows)
+
+    habit_table = models.Habit.__table__
+    for habit_id, row in zip(habit_ids, habit_rows):
+        session.execute(
+            habit_table.update().where(habit_table.c.id == habit_id).values(
+                current_streak=row["current_streak"], longest_streak=row["longest_streak"],
+                last_checkin_date=row["last_checkin_date"],
+            )
+        )
+    counts["habits"] = len(habit_ids)
+
+    task_rows = []
+    for index in range(profile.tasks):
+        moment = _moment(days_back(365 * profile.entry_years), rng)
+        task_status = rng.choices(list(models.TaskStatus), weights=(3, 1, 6))[0]
+        task_rows.append({
+            "user_id": user_id,
+            "area_id": rng.randint(1, 8),
+            "title": _sentence(rng, rng.randint(3, 8))[:200],
+            "description": _sentence(rng, 15) if rng.random() < 0.5 else None,
+            "status": task_status,
+            "priority": rng.choice(list(models.TaskPriority)),
+            "due_date": moment.date() + timedelta(days=rng.randint(0, 60)) if rng.random() < 0.6 else None,
+            "contact_id": rng.choice(contact_ids) if contact_ids and rng.random() < 0.1 else None,
+            "created_at": moment,
+            "updated_at": moment,
+            "completed_at": moment + timedelta(days=rng.randint(0, 14)) if task_status == models.TaskStatus.DONE else None,
+            # One task in a hundred is a recurring series; occurrences appear on the first task list
+            "recurrence": rng.choice(RECURRENCE_RULES) if index % 100 == 0 else None,
+            "materialized_until": None,
+            "version": 1,
+        })
+    counts["tasks"] = len(task_rows)
+    _insert(session, models.Task, task_rows)
+
+    # One journal entry per day, with an occasional second one
+    entry_rows = []
+    day = anchor - timedelta(days=365 * profile.entry_years)
+    while day < anchor:
+        for _ in range(2 if rng.random() < 0.1 else 1):
+            moment = _moment(day, rng)
+            content = _paragraph(rng, rng.randint(2, 12))
+            entry_rows.append({
+                "user_id": user_id,
+                "area_id": rng.randint(1, 8),
+                "title": _sentence(rng, 4)[:200],
+                "content": content,
+                "excerpt": models.make_excerpt(content),
+                "word_count": models.count_words(content),
+                "entry_date": day,
+                "created_at": moment,
+                "updated_at": moment,
+                "version": 1,
+            })
+        day += timedelta(days=1)
+    counts["entries"] = len(entry_rows)
+    _insert(session, models.Entry, entry_rows)
+
+    reference_rows = []
+    for _ in range(profile.references):
+        moment = _moment(days_back(365 * profile.entry_years), rng)
+        reference_type = rng.choice(list(models.ReferenceType))
+        reference_rows.append({
+            "user_id": user_id,
+            "title": _sentence(rng, 5)[:200],
+            "type": reference_type,
+            "url": f"https://example.com/{rng.randint(1, 10 ** 6)}" if reference_type == models.ReferenceType.WEBSITE else None,
+            "content": _paragraph(rng, 3),
+            "law_level": rng.choice(list(models.LawLevel)) if reference_type == models.ReferenceType.LAW else None,
+            "tags": ",".join(rng.sample(WORDS, 3)),
+            "notes": None,
+            "created_at": moment,
+            "updated_at": moment,
+            "version": 1,
+        })
+    reference_ids = _insert(session, models.Reference, reference_rows, returning=True)
+    _insert(session, models.ReferenceAreaLink, _area_links(rng, reference_ids, "reference_id", [r["created_at"] for r in reference_rows]))
+    counts["references"] = len(reference_ids)
+
+    health_rows = []
+    for _ in range(profile.health_items):
+        moment = _moment(days_back(365 * profile.entry_years), rng)
+        health_rows.append({
+            "user_id": user_id,
+            "catalog_type": rng.choice(list(models.HealthCatalogType)),
+            "name": _sentence(rng, 3)[:200],
+            "description": _sentence(rng, 12),
+            "frequency_description": rng.choice(("daily", "weekly", "as needed")),
+            "created_at": moment,
+            "updated_at": moment,
+            "version": 1,
+        })
+    counts["health_catalog_items"] = len(health_rows)
+    _insert(session, models.HealthCatalogItem, health_rows)
+
+    account_rows = []
+    for _ in range(profile.accounts):
+        moment = _moment(days_back(365 * profile.entry_years), rng)
+        account_rows.append({
+            "user_id": user_id,
+            "account_type": rng.choice(list(models.FinancialAccountType)),
+            "name": f"{rng.choice(('Checking', 'Savings', 'Brokerage', 'Mortgage', 'Card', 'Car loan'))} {rng.randint(1, 99)}",
+            "institution": rng.choice(("First Bank", "Credit Union", "Brokerage Co")),
+            "account_number_last4": f"{rng.randint(0, 9999):04d}",
+            "current_balance": round(rng.uniform(-50000, 250000), 2),
+            "interest_rate": round(rng.uniform(0, 8), 2),
+            "due_date": anchor + timedelta(days=rng.randint(1, 60)) if rng.random() < 0.4 else None,
+            "created_at": moment,
+            "updated_at": moment,
+            "version": 1,
+        })
+    counts["financial_accounts"] = len(account_rows)
+    _insert(session, models.FinancialAccount, account_rows)
+
+    topic_rows = []
+    for _ in range(profile.conflict_topics):
+        moment = _moment(days_back(365), rng)
+        topic_rows.append({
+            "user_id": user_id,
+            "topic": _sentence(rng, 4)[:200],
+            "description": _sentence(rng, 15),
+            "resolution_strategy": _sentence(rng, 12),
+            "progress_notes": None,
+            "created_at": moment,
+            "updated_at": moment,
+            "version": 1,
+        })
+    counts["conflict_topics"] = len(topic_rows)
+    _insert(session, models.ConflictTopic, topic_rows)
+
+    # Bulk INSERTs bypass the session hooks, so start the ETag counters by hand
+    bump_resource_versions(session, [
+        (user_id, resource)
+        for resource in ("contacts", "goals", "habits", "tasks", "entries", "references",
+                         "health_catalog_items", "financial_accounts", "conflict_topics")
+    ])
+    session.commit()
+    return counts
+
+
+def generate(engine, users: int = 1, profile: str = "realistic", seed: int = 42,
+             anchor: date = ANCHOR_DATE, username_prefix: str = "bench") -> Dict[str, Dict[str, int]]:
+    """
+    Populate the database behind `engine` with synthetic users.
+
+    Users are named "<prefix>1", "<prefix>2", ... and share DEFAULT_PASSWORD.
+    Returns row counts per user.
+    """
+    from sqlmodel import Session
+
+    rng = random.Random(seed)
+    summary: Dict[str, Dict[str, int]] = {}
+    with Session(engine) as session:
+        seed_life_areas(session)
+        for index in range(1, users + 1):
+            username = f"{username_prefix}{index}"
+            summary[username] = generate_user(session, username, PROFILES[profile], rng, anchor)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="SQLite file to create (must not exist yet)")
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", type=date.fromisoformat, default=ANCHOR_DATE, help="Generate data up to this day")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.db):
+        parser.error(f"{args.db} already exists")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.db)}"
+    os.environ.setdefault("APP_SECRET", "benchmark-secret")
+
+    from ..app.db import engine, ensure_schema
+    ensure_schema()
+
+    started = time.perf_counter()
+    summary = generate(engine, args.users, args.profile, args.seed, args.anchor)
+    elapsed = time.perf_counter() - started
+    for username, counts in summary.items():
+        print(f"[SYNTHETIC] {username}: " + ", ".join(f"{table}={count}" for table, count in counts.items()))
+    print(f"[SYNTHETIC] {args.users} user(s) with profile '{args.profile}' in {elapsed:.1f}s -> {args.db}")
+
+
+if __name__ == "__main__":
+    main()
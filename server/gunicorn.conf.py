@@ -0,0 +1,74 @@
+"""
+Gunicorn configuration for production: uvicorn workers sized from the CPU count.
+
+Usage (from the repository root):
+    gunicorn -c server/gunicorn.conf.py server.app.main:app
+
+Before any worker starts, the master process:
+
+- refuses to start without APP_SECRET, since each worker would otherwise
+  generate its own session secret and reject the others' cookies;
+- checks the schema version and runs any pending migrations once, so
+  workers skip it (DB_SCHEMA_READY);
+- gives the workers a shared METRICS_DIR so /metrics sums all of them.
+
+Environment:
+    PORT             Port to bind (default 8000)
+    WEB_CONCURRENCY  Worker count (default: one per available CPU)
+    ACCESS_LOG       Access log target (default "-" = stdout; empty disables)
+"""
+import os
+import shutil
+import tempfile
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects container CPU affinity)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS / Windows
+        return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY") or available_cpus())
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+accesslog = os.getenv("ACCESS_LOG", "-") or None
+
+# Set when this config created METRICS_DIR, so it can be removed on exit
+_metrics_dir_created = None
+
+
+def on_starting(server):
+    """Runs once in the master before workers are forked"""
+    global _metrics_dir_created
+
+    if not os.getenv("APP_SECRET"):
+        raise SystemExit(
+            "[SECURITY] APP_SECRET is not set. Every worker would generate its own session secret "
+            "and reject cookies issued by the others. Set APP_SECRET and restart."
+        )
+
+    from server.app.db import engine, ensure_schema
+    ensure_schema()
+    # Connections must not be shared with forked workers
+    engine.dispose()
+    os.environ["DB_SCHEMA_READY"] = "1"
+
+    if workers > 1 and not os.getenv("METRICS_DIR"):
+        _metrics_dir_created = tempfile.mkdtemp(prefix="life-metrics-")
+        os.environ["METRICS_DIR"] = _metrics_dir_created
+
+    print(f"[SERVER] Starting {workers} uvicorn worker(s) on {bind}")
+
+
+def on_exit(server):
+    if _metrics_dir_created:
+        shutil.rmtree(_metrics_dir_created, ignore_errors=True)
@@ -0,0 +1,50 @@
+"""
+Alembic environment.
+
+Runs against app.db.engine (so DATABASE_URL and its SQLite path handling
+apply), or against the connection passed in by app.db.ensure_schema().
+
+App modules are imported under config.attributes["app_package"], the name the
+running app was imported as ("app" or "server.app"; app.db.alembic_config
+sets it), so the models are never loaded twice into SQLModel.metadata.
+"""
+from logging.config import fileConfig
+from pathlib import Path
+import importlib
+import sys
+
+from alembic import context
+from sqlmodel import SQLModel
+
+# Make the `server` package importable when alembic runs from server/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+config = context.config
+APP_PACKAGE = config.attributes.setdefault("app_package", "server.app")
+
+importlib.import_module(f"{APP_PACKAGE}.models")  # registers every table on SQLModel.metadata
+target_metadata = SQLModel.metadata
+
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite cannot ALTER most things in place; batch mode rebuilds the table instead
+        render_as_batch=connection.dialect.name == "sqlite",
+        compare_type=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+connection = config.attributes.get("connection")
+if connection is not None:
+    run_migrations(connection)
+else:
+    # Command line: configure logging from alembic.ini without silencing the app's loggers
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name, disable_existing_loggers=False)
+    engine = importlib.import_module(f"{APP_PACKAGE}.db").engine
+    with engine.begin() as connection:
+        run_migrations(connection)
@@ -0,0 +1,85 @@
+"""entry excerpts and compressed content
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 11:06:49.197253
+
+"""
+from typing import Sequence, Union
+import importlib
+
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel
+
+# The stored format is the app's: CompressedText decides what gets compressed, make_excerpt what lists show.
+# Imported under the running app's package name (see migrations/env.py).
+APP_PACKAGE = context.config.attributes["app_package"]
+CompressedText = importlib.import_module(f"{APP_PACKAGE}.compressed_text").CompressedText
+make_excerpt = importlib.import_module(f"{APP_PACKAGE}.models").make_excerpt
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows rewritten per UPDATE batch
+BACKFILL_BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('entries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('excerpt', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default=''))
+        batch_op.alter_column('content',
+               existing_type=sa.VARCHAR(),
+               type_=sa.LargeBinary(),
+               existing_nullable=False,
+               postgresql_using="convert_to(content, 'UTF8')")
+
+    # Content is now plain UTF-8 bytes, which CompressedText reads as-is. Write it
+    # back through the column type (compressing large entries) and fill in excerpts.
+    entries = sa.table(
+        'entries', sa.column('id', sa.Integer), sa.column('content', CompressedText()), sa.column('excerpt', sa.String)
+    )
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(entries.c.id, entries.c.content)
+            .where(entries.c.id > last_id)
+            .order_by(entries.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            entries.update()
+            .where(entries.c.id == sa.bindparam('entry_id'))
+            .values(content=sa.bindparam('new_content'), excerpt=sa.bindparam('new_excerpt')),
+            [{'entry_id': row.id, 'new_content': row.content, 'new_excerpt': make_excerpt(row.content)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    # Decompress back to plain text before the column becomes text again
+    entries = sa.table('entries', sa.column('id', sa.Integer), sa.column('content', CompressedText()))
+    plain = sa.table('entries', sa.column('id', sa.Integer), sa.column('content', sa.LargeBinary()))
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(entries.c.id, entries.c.content)).all()
+    if rows:
+        connection.execute(
+            plain.update().where(plain.c.id == sa.bindparam('entry_id')).values(content=sa.bindparam('raw')),
+            [{'entry_id': row.id, 'raw': row.content.encode('utf-8')} for row in rows],
+        )
+
+    with op.batch_alter_table('entries', schema=None) as batch_op:
+        batch_op.alter_column('content',
+               existing_type=sa.LargeBinary(),
+               type_=sa.VARCHAR(),
+               existing_nullable=False,
+               postgresql_using="convert_from(content, 'UTF8')")
+        batch_op.drop_column('excerpt')
@@ -0,0 +1,40 @@
+"""task recurrence
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 11:12:54.913395
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing tasks stay one-off (recurrence NULL); nothing to backfill
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recurrence', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+        batch_op.add_column(sa.Column('recurrence_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('materialized_until', sa.Date(), nullable=True))
+        batch_op.create_index('ix_tasks_recurrence_id_due_date', ['recurrence_id', 'due_date'], unique=True)
+        batch_op.create_index('ix_tasks_series_materialized_until', ['user_id', 'materialized_until'], unique=False, sqlite_where=sa.text('recurrence IS NOT NULL'), postgresql_where=sa.text('recurrence IS NOT NULL'))
+        batch_op.create_foreign_key('fk_tasks_recurrence_id_tasks', 'tasks', ['recurrence_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_tasks_recurrence_id_tasks', type_='foreignkey')
+        batch_op.drop_index('ix_tasks_series_materialized_until', sqlite_where=sa.text('recurrence IS NOT NULL'), postgresql_where=sa.text('recurrence IS NOT NULL'))
+        batch_op.drop_index('ix_tasks_recurrence_id_due_date')
+        batch_op.drop_column('materialized_until')
+        batch_op.drop_column('recurrence_id')
+        batch_op.drop_column('recurrence')
@@ -0,0 +1,41 @@
+"""due date indexes
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 11:22:42.198644
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('financial_accounts', schema=None) as batch_op:
+        batch_op.create_index('ix_financial_accounts_user_id_due_date', ['user_id', 'due_date'], unique=False)
+
+    with op.batch_alter_table('goals', schema=None) as batch_op:
+        batch_op.create_index('ix_goals_user_id_due_date', ['user_id', 'due_date'], unique=False)
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_user_id_due_date', ['user_id', 'due_date'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_user_id_due_date')
+
+    with op.batch_alter_table('goals', schema=None) as batch_op:
+        batch_op.drop_index('ix_goals_user_id_due_date')
+
+    with op.batch_alter_table('financial_accounts', schema=None) as batch_op:
+        batch_op.drop_index('ix_financial_accounts_user_id_due_date')
@@ -0,0 +1,38 @@
+"""calendar feeds
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 11:24:41.191364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('calendar_feeds',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('token_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('source_versions', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('sections', sa.LargeBinary(), nullable=True),  # CompressedText in the app
+    sa.Column('etag', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('generated_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id'),
+    sa.UniqueConstraint('token_hash')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('calendar_feeds')
@@ -0,0 +1,38 @@
+"""user timezone and live streak index
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 11:30:34.284216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('habits', schema=None) as batch_op:
+        batch_op.create_index('ix_habits_live_streak_last_checkin', ['habit_type', 'last_checkin_date'], unique=False, sqlite_where=sa.text('current_streak > 0'), postgresql_where=sa.text('current_streak > 0'))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('timezone', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default='UTC'))
+        batch_op.create_index(batch_op.f('ix_users_timezone'), ['timezone'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_timezone'))
+        batch_op.drop_column('timezone')
+
+    with op.batch_alter_table('habits', schema=None) as batch_op:
+        batch_op.drop_index('ix_habits_live_streak_last_checkin', sqlite_where=sa.text('current_streak > 0'), postgresql_where=sa.text('current_streak > 0'))
+
@@ -0,0 +1,38 @@
+"""habit checkin updated at
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 12:03:46.779679
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('habit_checkins', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # Existing check-ins were never edited: they last changed when they were created
+    op.execute("UPDATE habit_checkins SET updated_at = created_at")
+
+    with op.batch_alter_table('habit_checkins', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index('ix_habit_checkins_habit_id_updated_at', ['habit_id', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('habit_checkins', schema=None) as batch_op:
+        batch_op.drop_index('ix_habit_checkins_habit_id_updated_at')
+        batch_op.drop_column('updated_at')
+